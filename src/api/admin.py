@@ -1,9 +1,9 @@
 from fastapi import APIRouter, Depends, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.utils.dependencies import AdminIdDep, DBDep
+from src.middleware.json_error_handler import JSONBodyRoute
+from src.utils.dependencies import AdminIdDep, AdminServiceDep, DBDep
 from src.schemas.admin import Admin, AdminRequestAdd, AdminRequestLogin, AdminResponse
-from src.services.admin import AdminService
 from src.exceptions import (
     AdminAlreadyExistsException,
     AdminEmailAlreadyExistsHTTPException,
@@ -16,11 +16,13 @@ from src.exceptions import (
     IncorrectPasswordException,
     IncorrectPasswordHTTPException,
     IncorrectTokenException,
+    PasswordHasherBusyException,
+    PasswordHasherBusyHTTPException,
     SuperadminPasswordException,
     SuperadminPasswordHTTPException
 )
 
-router = APIRouter(prefix="/admin", tags=["admin"])
+router = APIRouter(prefix="/admin", tags=["admin"], route_class=JSONBodyRoute)
 
 
 @router.post("/register", summary="Регистрация нового администратора")
@@ -28,21 +30,24 @@ async def register_admin(
     data: AdminRequestAdd,
     request: Request,
     db: DBDep,
+    admin_service: AdminServiceDep,
 ):
     token = request.cookies.get("access_token")
     if token:
         try:
-            AdminService(db).verify_token(token)
+            await admin_service.verify_token(token)
             raise AdminIsAlreadyAuthenticatedHTTPException()
         except (ExpiredTokenException, IncorrectTokenException):
             pass
 
     try:
-        await AdminService(db).register_admin(data)
+        await admin_service.register_admin(db, data)
     except AdminAlreadyExistsException:
         raise AdminEmailAlreadyExistsHTTPException()
     except SuperadminPasswordException:
         raise SuperadminPasswordHTTPException()
+    except PasswordHasherBusyException:
+        raise PasswordHasherBusyHTTPException()
     return {"detail": "Вы успешно зарегистрировались!"}
 
 
@@ -52,21 +57,24 @@ async def login_admin(
     response: Response,
     request: Request,
     db: DBDep,
+    admin_service: AdminServiceDep,
 ):
     token = request.cookies.get("access_token")
     if token:
         try:
-            AdminService(db).verify_token(token)
+            await admin_service.verify_token(token)
             raise AdminIsAlreadyAuthenticatedHTTPException()
         except (ExpiredTokenException, IncorrectTokenException):
             pass
 
     try:
-        access_token = await AdminService(db).login_admin(data)
+        access_token = await admin_service.login_admin(db, data)
     except EmailNotRegisteredException:
         raise EmailNotRegisteredHTTPException()
     except IncorrectPasswordException:
         raise IncorrectPasswordHTTPException()
+    except PasswordHasherBusyException:
+        raise PasswordHasherBusyHTTPException()
 
     response.set_cookie("access_token", access_token)
     return {"detail": "Успешный вход в систему!", "access_token": access_token}
@@ -76,19 +84,20 @@ async def login_admin(
 async def get_me(
     admin_id: AdminIdDep,
     db: DBDep,
+    admin_service: AdminServiceDep,
 ):
-    return await AdminService(db).get_one_or_none_admin(admin_id)
+    return await admin_service.get_one_or_none_admin(db, admin_id)
 
 
 @router.post("/logout", summary="Выход из системы", response_model=dict)
 async def logout_admin(
     response: Response,
     request: Request,
-    db: DBDep
+    admin_service: AdminServiceDep,
 ):
     token = request.cookies.get("access_token")
     try:
-        await AdminService(db).logout_admin(token)
+        await admin_service.logout_admin(token)
     except AdminNotAuthenticatedException:
         raise AdminNotAuthenticatedHTTPException()
 
@@ -1,46 +1,72 @@
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.schemas.category import (
     CategoryCreate, CategoryUpdate, CategoryResponse,
     CategoryWithProducts, CategoryWithChildren
 )
+from src.middleware.json_error_handler import JSONBodyRoute
 from src.services.category import CategoryService
-from src.utils.dependencies import get_db, get_category_service
+from src.utils.conditional import not_modified, set_validators
+from src.utils.dependencies import CursorDep, get_db, get_category_service
+from src.utils.pagination import set_next_cursor
+from src.utils.responses import ModelListResponse
 
-router = APIRouter(prefix="/categories", tags=["categories"])
+router = APIRouter(prefix="/categories", tags=["categories"], route_class=JSONBodyRoute)
+
+
+def _category_list_response(request: Request, categories: List[CategoryResponse]) -> Response:
+    """Списки из снимка дерева: ETag считается в памяти, 304 - без сериализации"""
+    version = CategoryService.version_of(*categories)
+    unchanged = not_modified(request, version)
+    if unchanged is not None:
+        return unchanged
+    response = ModelListResponse(categories, CategoryResponse)
+    set_validators(response, version)
+    return response
 
 
 @router.get("/", response_model=List[CategoryResponse])
 async def get_categories(
+    request: Request,
+    cursor: CursorDep,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     category_service: CategoryService = Depends(get_category_service),
     db: AsyncSession = Depends(get_db)
 ):
-    return await category_service.get_multi(db, skip, limit)
+    categories = await category_service.get_multi(db, skip, limit, cursor)
+    response = _category_list_response(request, categories)
+    set_next_cursor(request, response, categories, limit)
+    return response
 
 
 @router.get("/active", response_model=List[CategoryResponse])
 async def get_active_categories(
+    request: Request,
     category_service: CategoryService = Depends(get_category_service),
     db: AsyncSession = Depends(get_db)
 ):
-    return await category_service.get_active_categories(db)
+    categories = await category_service.get_active_categories(db)
+    return _category_list_response(request, categories)
 
 
 @router.get("/root", response_model=List[CategoryResponse])
 async def get_root_categories(
+    request: Request,
     category_service: CategoryService = Depends(get_category_service),
     db: AsyncSession = Depends(get_db)
 ):
-    return await category_service.get_root_categories(db)
+    categories = await category_service.get_root_categories(db)
+    return _category_list_response(request, categories)
 
 
 @router.get("/{category_id}", response_model=CategoryResponse)
 async def get_category(
     category_id: int,
+    request: Request,
+    response: Response,
     category_service: CategoryService = Depends(get_category_service),
     db: AsyncSession = Depends(get_db)
 ):
@@ -48,6 +74,11 @@ async def get_category(
     if not category:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Category not found")
+    version = CategoryService.version_of(category)
+    unchanged = not_modified(request, version)
+    if unchanged is not None:
+        return unchanged
+    set_validators(response, version)
     return category
 
 
@@ -93,10 +124,12 @@ async def get_category_by_slug(
 @router.get("/{parent_id}/children", response_model=List[CategoryResponse])
 async def get_category_children(
     parent_id: int,
+    request: Request,
     category_service: CategoryService = Depends(get_category_service),
     db: AsyncSession = Depends(get_db)
 ):
-    return await category_service.get_children(db, parent_id)
+    categories = await category_service.get_children(db, parent_id)
+    return _category_list_response(request, categories)
 
 
 @router.post("/", response_model=CategoryResponse)
@@ -0,0 +1,13 @@
+from fastapi import APIRouter
+
+from src.utils.database import engine
+from src.utils.dependencies import AdminIdDep
+from src.utils.pool_metrics import pool_metrics
+
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+
+@router.get("/db-pool", response_model=dict)
+async def get_db_pool_metrics(admin_id: AdminIdDep):
+    """Состояние пула соединений с БД (только для администраторов)"""
+    return pool_metrics.snapshot(engine)
@@ -1,54 +1,144 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from datetime import date
+from typing import List, Literal, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response, status, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.exceptions import (
+    IdempotencyKeyInProgressException,
+    IdempotencyKeyInProgressHTTPException,
+    IdempotencyKeyMismatchException,
+    IdempotencyKeyMismatchHTTPException,
+)
+
 from src.schemas.order import (
     OrderCreate, OrderUpdate, OrderResponse, OrderWithItems, OrderFull,
-    OrderStatusUpdate, PaymentStatusUpdate, OrderStats
+    OrderStatusUpdate, PaymentStatusUpdate, OrderStats, OrderDailyStats,
+    OrderBulkStatusUpdate, OrderBulkStatusResult, OrderSummary
 )
+from src.middleware.json_error_handler import JSONBodyRoute
+from src.services.idempotency import IdempotencyService
 from src.services.order import OrderService
-from src.utils.dependencies import get_db, get_order_service
+from src.utils.dependencies import (
+    AdminIdDep, CursorDep, get_db, get_idempotency_service, get_order_service
+)
+from src.utils.export import ndjson_chunks, orders_csv_chunks
+from src.utils.pagination import set_next_cursor
+from src.utils.responses import ModelListResponse
 
-router = APIRouter(prefix="/orders", tags=["orders"])
+router = APIRouter(prefix="/orders", tags=["orders"], route_class=JSONBodyRoute)
 
 
 @router.post("/", response_model=OrderWithItems)
 async def create_order(
     order_data: OrderCreate,
+    idempotency_key: Optional[str] = Header(
+        None,
+        alias="Idempotency-Key",
+        min_length=1,
+        max_length=255,
+        description="Повтор с тем же ключом вернёт уже созданный заказ",
+    ),
     order_service: OrderService = Depends(get_order_service),
+    idempotency_service: IdempotencyService = Depends(get_idempotency_service),
     db: AsyncSession = Depends(get_db)
 ):
     """Создать новый заказ"""
     try:
-        return await order_service.create(db, order_data)
+        if idempotency_key is None:
+            return await order_service.create(db, order_data)
+        result = await idempotency_service.execute(
+            db,
+            "orders:create",
+            idempotency_key,
+            order_data,
+            lambda complete: order_service.create(db, order_data, before_commit=complete),
+        )
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
         )
+    except IdempotencyKeyMismatchException:
+        raise IdempotencyKeyMismatchHTTPException()
+    except IdempotencyKeyInProgressException:
+        raise IdempotencyKeyInProgressHTTPException()
+    return Response(
+        content=result.body,
+        status_code=result.status_code,
+        media_type="application/json",
+        headers={"Idempotent-Replayed": "true"} if result.replayed else None,
+    )
 
 
 @router.get("/", response_model=List[OrderResponse])
 async def get_orders(
+    request: Request,
+    cursor: CursorDep,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     order_service: OrderService = Depends(get_order_service),
     db: AsyncSession = Depends(get_db)
 ):
     """Получить список заказов (только для администраторов)"""
-    return await order_service.get_multi(db, skip, limit)
+    orders = await order_service.get_multi(db, skip, limit, cursor)
+    response = ModelListResponse(orders, OrderResponse)
+    set_next_cursor(request, response, orders, limit)
+    return response
 
 
-@router.get("/customer/{email}", response_model=List[OrderResponse])
+@router.get("/export")
+async def export_orders(
+    admin_id: AdminIdDep,
+    format: Literal["ndjson", "csv"] = Query("ndjson"),
+    order_status: Optional[str] = Query(None, alias="status"),
+    payment_status: Optional[str] = Query(None),
+    date_from: Optional[date] = Query(None, description="Начало периода (UTC, включительно)"),
+    date_to: Optional[date] = Query(None, description="Конец периода (UTC, включительно)"),
+    include_items: bool = Query(False),
+    order_service: OrderService = Depends(get_order_service),
+    db: AsyncSession = Depends(get_db)
+):
+    """Выгрузить заказы потоком в NDJSON или CSV (только для администраторов)"""
+    try:
+        orders = await order_service.export(
+            db, order_status, payment_status, date_from, date_to, include_items
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    if format == "csv":
+        body = orders_csv_chunks(orders, include_items)
+        media_type = "text/csv"
+    else:
+        body = ndjson_chunks(orders)
+        media_type = "application/x-ndjson"
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="orders.{format}"'},
+    )
+
+
+@router.get("/customer/{email}", response_model=List[OrderSummary])
 async def get_customer_orders(
     email: str,
+    request: Request,
+    cursor: CursorDep,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    case_insensitive: bool = Query(False, description="Искать email без учёта регистра"),
     order_service: OrderService = Depends(get_order_service),
     db: AsyncSession = Depends(get_db)
 ):
-    """Получить заказы по email клиента"""
-    return await order_service.get_by_customer_email(db, email, skip, limit)
+    """Получить историю заказов клиента по email"""
+    orders = await order_service.get_by_customer_email(
+        db, email, skip, limit, cursor, case_insensitive)
+    response = ModelListResponse(orders, OrderSummary)
+    set_next_cursor(request, response, orders, limit)
+    return response
 
 
 @router.get("/{order_id}", response_model=OrderResponse)
@@ -86,6 +176,8 @@ async def get_order_full(
 @router.get("/status/{status}", response_model=List[OrderResponse])
 async def get_orders_by_status(
     status: str,
+    request: Request,
+    cursor: CursorDep,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     order_service: OrderService = Depends(get_order_service),
@@ -93,7 +185,27 @@ async def get_orders_by_status(
 ):
     """Получить заказы по статусу (только для администраторов)"""
     try:
-        return await order_service.get_by_status(db, status, skip, limit)
+        orders = await order_service.get_by_status(db, status, skip, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=400,
+            detail=str(e)
+        )
+    response = ModelListResponse(orders, OrderResponse)
+    set_next_cursor(request, response, orders, limit)
+    return response
+
+
+@router.post("/status/bulk", response_model=OrderBulkStatusResult)
+async def bulk_update_order_status(
+    bulk_update: OrderBulkStatusUpdate,
+    admin_id: AdminIdDep,
+    order_service: OrderService = Depends(get_order_service),
+    db: AsyncSession = Depends(get_db)
+):
+    """Перевести несколько заказов в новый статус (только для администраторов)"""
+    try:
+        return await order_service.transition_status(db, bulk_update.order_ids, bulk_update.status)
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -157,7 +269,13 @@ async def update_order(
     db: AsyncSession = Depends(get_db)
 ):
     """Обновить заказ"""
-    updated_order = await order_service.update(db, order_id, order_update)
+    try:
+        updated_order = await order_service.update(db, order_id, order_update)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     if not updated_order:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -168,8 +286,34 @@ async def update_order(
 
 @router.get("/admin/stats", response_model=OrderStats)
 async def get_order_stats(
+    date_from: Optional[date] = Query(None, description="Начало периода (UTC, включительно)"),
+    date_to: Optional[date] = Query(None, description="Конец периода (UTC, включительно)"),
     order_service: OrderService = Depends(get_order_service),
     db: AsyncSession = Depends(get_db)
 ):
     """Получить статистику по заказам (только для администраторов)"""
-    return await order_service.get_order_stats(db)
+    try:
+        return await order_service.get_order_stats(db, date_from, date_to)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+
+@router.get("/admin/stats/daily", response_model=List[OrderDailyStats])
+async def get_daily_order_stats(
+    date_from: date = Query(..., description="Начало периода (UTC, включительно)"),
+    date_to: date = Query(..., description="Конец периода (UTC, включительно)"),
+    order_service: OrderService = Depends(get_order_service),
+    db: AsyncSession = Depends(get_db)
+):
+    """Получить статистику по заказам по дням (только для администраторов)"""
+    try:
+        stats = await order_service.get_daily_stats(db, date_from, date_to)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    return ModelListResponse(stats, OrderDailyStats)
@@ -1,38 +1,69 @@
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.exceptions import (
+    ImageTooLargeException,
+    ImageTooLargeHTTPException,
+    InvalidImageException,
+    InvalidImageHTTPException,
+)
+
 from src.schemas.product import (
     ProductCreate, ProductUpdate, ProductResponse,
     ProductFull,
     ProductImageCreate, ProductImageResponse
 )
+from src.middleware.json_error_handler import JSONBodyRoute
 from src.services.product import ProductService
-from src.utils.dependencies import get_db, get_product_service
+from src.utils.conditional import not_modified, set_validators
+from src.utils.dependencies import CursorDep, get_db, get_product_service
+from src.utils.pagination import set_next_cursor
+from src.utils.responses import ModelListResponse
 
-router = APIRouter(prefix="/products", tags=["products"])
+router = APIRouter(prefix="/products", tags=["products"], route_class=JSONBodyRoute)
 
 
 @router.get("/", response_model=List[ProductResponse])
 async def get_products(
+    request: Request,
+    cursor: CursorDep,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     product_service: ProductService = Depends(get_product_service),
     db: AsyncSession = Depends(get_db)
 ):
     """Получить список товаров"""
-    return await product_service.get_multi(db, skip, limit)
+    products = await product_service.get_multi(db, skip, limit, cursor)
+    version = ProductService.version_of(*products)
+    unchanged = not_modified(request, version)
+    if unchanged is not None:
+        return unchanged
+    response = ModelListResponse(products, ProductResponse)
+    set_next_cursor(request, response, products, limit)
+    set_validators(response, version)
+    return response
 
 
 @router.get("/available", response_model=List[ProductResponse])
 async def get_available_products(
+    request: Request,
+    cursor: CursorDep,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     product_service: ProductService = Depends(get_product_service),
     db: AsyncSession = Depends(get_db)
 ):
     """Получить доступные товары (в наличии)"""
-    return await product_service.get_available_products(db, skip, limit)
+    version = await product_service.get_available_version(db, skip, limit, cursor)
+    unchanged = not_modified(request, version)
+    if unchanged is not None:
+        return unchanged
+    products = await product_service.get_available_products(db, skip, limit, cursor)
+    response = ModelListResponse(products, ProductResponse)
+    set_next_cursor(request, response, products, limit)
+    set_validators(response, version)
+    return response
 
 
 @router.get("/search", response_model=List[ProductResponse])
@@ -43,53 +74,82 @@ async def search_products(
     product_service: ProductService = Depends(get_product_service),
     db: AsyncSession = Depends(get_db)
 ):
-    """Поиск товаров"""
+    """Поиск товаров, отсортированных по релевантности"""
     try:
-        return await product_service.search_products(db, query, skip, limit)
+        products = await product_service.search_products(db, query, skip, limit)
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
         )
+    return ModelListResponse(products, ProductResponse)
 
 
 @router.get("/category/{category_id}", response_model=List[ProductResponse])
 async def get_products_by_category(
     category_id: int,
+    request: Request,
+    cursor: CursorDep,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    include_subcategories: bool = Query(
+        False, description="Включить товары всех подкатегорий"),
     product_service: ProductService = Depends(get_product_service),
     db: AsyncSession = Depends(get_db)
 ):
     """Получить товары по категории"""
     try:
-        return await product_service.get_by_category(db, category_id, skip, limit)
+        version = await product_service.get_by_category_version(
+            db, category_id, skip, limit, cursor, include_subcategories)
+        unchanged = not_modified(request, version)
+        if unchanged is not None:
+            return unchanged
+        products = await product_service.get_by_category(
+            db, category_id, skip, limit, cursor, include_subcategories)
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=str(e)
         )
+    response = ModelListResponse(products, ProductResponse)
+    set_next_cursor(request, response, products, limit)
+    set_validators(response, version)
+    return response
 
 
 @router.get("/{product_id}", response_model=ProductResponse)
 async def get_product(
     product_id: int,
+    request: Request,
+    response: Response,
     product_service: ProductService = Depends(get_product_service),
     db: AsyncSession = Depends(get_db)
 ):
     """Получить товар по ID"""
+    version = await product_service.get_version(db, product_id)
+    if version is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Product not found"
+        )
+    unchanged = not_modified(request, version)
+    if unchanged is not None:
+        return unchanged
     product = await product_service.get(db, product_id)
     if not product:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Product not found"
         )
+    set_validators(response, version)
     return product
 
 
 @router.get("/{product_id}/full", response_model=ProductFull)
 async def get_product_full(
     product_id: int,
+    request: Request,
+    response: Response,
     product_service: ProductService = Depends(get_product_service),
     db: AsyncSession = Depends(get_db)
 ):
@@ -100,17 +160,30 @@ async def get_product_full(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Product not found"
         )
+    version = ProductService.full_version_of(product)
+    unchanged = not_modified(request, version)
+    if unchanged is not None:
+        return unchanged
+    set_validators(response, version)
     return product
 
 
 @router.get("/{product_id}/images", response_model=List[ProductImageResponse])
 async def get_product_images(
     product_id: int,
+    request: Request,
     product_service: ProductService = Depends(get_product_service),
     db: AsyncSession = Depends(get_db)
 ):
     """Получить изображения товара"""
-    return await product_service.get_product_images(db, product_id)
+    version = await product_service.get_product_images_version(db, product_id)
+    unchanged = not_modified(request, version)
+    if unchanged is not None:
+        return unchanged
+    images = await product_service.get_product_images(db, product_id)
+    response = ModelListResponse(images, ProductImageResponse)
+    set_validators(response, version)
+    return response
 
 
 @router.post("/", response_model=ProductResponse)
@@ -209,6 +282,42 @@ async def add_product_image(
         )
 
 
+@router.post(
+    "/{product_id}/images/upload",
+    response_model=ProductImageResponse,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {"image/*": {"schema": {"type": "string", "format": "binary"}}},
+        }
+    },
+)
+async def upload_product_image(
+    product_id: int,
+    request: Request,
+    alt_text: str = Query(None, max_length=200),
+    is_main: bool = Query(False),
+    sort_order: int = Query(0, ge=0),
+    product_service: ProductService = Depends(get_product_service),
+    db: AsyncSession = Depends(get_db)
+):
+    """Загрузить файл изображения товара (тело запроса - сам файл)"""
+    if not request.headers.get("content-type", "").lower().startswith("image/"):
+        raise InvalidImageHTTPException()
+    try:
+        return await product_service.upload_image(
+            db, product_id, request.stream(), alt_text, is_main, sort_order)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+    except ImageTooLargeException:
+        raise ImageTooLargeHTTPException()
+    except InvalidImageException:
+        raise InvalidImageHTTPException()
+
+
 @router.put("/images/{image_id}/set-main")
 async def set_main_image(
     image_id: int,
@@ -1,4 +1,5 @@
-from typing import Literal
+from pathlib import Path
+from typing import List, Literal, Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -11,34 +12,89 @@ class Settings(BaseSettings):
     DB_PASS: str
     DB_NAME: str
 
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_TIMEOUT_MS: int = 0
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    # Лимит SQL-запросов на HTTP-запрос в режимах TEST/LOCAL/DEV, 0 - без лимита
+    DB_QUERY_LIMIT: int = 30
+
+    # Без REDIS_HOST приложение работает без кэша ответов и общего состояния воркеров
+    REDIS_HOST: Optional[str] = None
+    REDIS_PORT: int = 6379
+    REDIS_MAX_CONNECTIONS: int = 50
+
+    JSON_MAX_BODY_SIZE: int = 1024 * 1024
+
+    CACHE_ENABLED: bool = True
+    CACHE_TTL_PRODUCT_LIST: int = 60
+    CACHE_TTL_PRODUCT: int = 300
+    CACHE_TTL_CATEGORIES: int = 600
+
+    CATEGORY_TREE_MAX_AGE: int = 300
+
+    ORDER_NUMBER_BLOCK_SIZE: int = 100
+    ORDER_EXPORT_BATCH_SIZE: int = 500
+
+    IDEMPOTENCY_KEY_TTL: int = 86400
+    IDEMPOTENCY_LOCK_TIMEOUT: int = 60
+    IDEMPOTENCY_WAIT_TIMEOUT: float = 10
+
+    CELERY_BROKER_URL: Optional[str] = None
+    OUTBOX_RELAY_INTERVAL: float = 2
+    OUTBOX_BATCH_SIZE: int = 100
+    OUTBOX_MAX_ATTEMPTS: int = 5
+    ORDER_STATS_COMPACT_INTERVAL: float = 60
+    LOW_STOCK_THRESHOLD: int = 3
+    LOW_STOCK_ALERT_EMAIL: Optional[str] = None
+
+    SMTP_HOST: Optional[str] = None
+    SMTP_PORT: int = 587
+    SMTP_USER: Optional[str] = None
+    SMTP_PASSWORD: Optional[str] = None
+    SMTP_FROM: str = "noreply@localhost"
+    SMTP_STARTTLS: bool = True
+
     JWT_PRIVATE_KEY_PATH: str
     JWT_PUBLIC_KEY_PATH: str
     JWT_ALGORITHM: str
+    JWT_PREVIOUS_PUBLIC_KEY_PATHS: List[str] = []
+    JWT_KEYS_CHECK_INTERVAL: int = 30
     ACCESS_TOKEN_EXPIRE_MINUTES: int
+    TOKEN_CACHE_SIZE: int = 10000
 
     SUPERADMIN_PASSWORD: str
+    # Без него ключ подписи курсоров выводится из приватного ключа JWT
+    CURSOR_SECRET: Optional[str] = None
+
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_QUEUE_LIMIT: int = 16
+
+    # Наружу раздаются только public и media; uploads - буфер загрузок, не раздаётся
+    STATIC_ROOT: str = str(Path(__file__).parent / "static" / "public")
+    MEDIA_ROOT: str = str(Path(__file__).parent / "static" / "media")
+    UPLOAD_TMP_ROOT: str = str(Path(__file__).parent / "static" / "uploads")
+    MEDIA_URL: str = "http://localhost:8000/static/media"
+    # Префиксы internal-location nginx: тело файла отдаёт nginx через sendfile
+    STATIC_ACCEL_REDIRECT_PREFIX: Optional[str] = None
+    MEDIA_ACCEL_REDIRECT_PREFIX: Optional[str] = None
+    IMAGE_PROCESS_WORKERS: int = 2
+    IMAGE_MAX_UPLOAD_SIZE: int = 20 * 1024 * 1024
+    IMAGE_MAX_PIXELS: int = 40_000_000
+    IMAGE_FORMATS: List[Literal["webp", "avif"]] = ["webp", "avif"]
 
     @property
     def DB_URL(self):
         return f"postgresql+asyncpg://{self.DB_USER}:{self.DB_PASS}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
 
     @property
-    def JWT_PRIVATE_KEY(self):
-        try:
-            with open(self.JWT_PRIVATE_KEY_PATH, "r") as key_file:
-                return key_file.read()
-        except FileNotFoundError:
-            raise Exception(
-                f"Приватный ключ не найден: {self.JWT_PRIVATE_KEY_PATH}")
-
-    @property
-    def JWT_PUBLIC_KEY(self):
-        try:
-            with open(self.JWT_PUBLIC_KEY_PATH, "r") as key_file:
-                return key_file.read()
-        except FileNotFoundError:
-            raise Exception(
-                f"Публичный ключ не найден: {self.JWT_PUBLIC_KEY_PATH}")
+    def REDIS_URL(self) -> Optional[str]:
+        if not self.REDIS_HOST:
+            return None
+        return f"redis://{self.REDIS_HOST}:{self.REDIS_PORT}"
 
     model_config = SettingsConfigDict(env_file=".env")
 
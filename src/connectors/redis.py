@@ -0,0 +1,48 @@
+import logging
+from typing import Optional
+
+from redis.asyncio import Redis
+
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class RedisManager:
+    def __init__(self, url: Optional[str], max_connections: int = 50):
+        self.url = url
+        self.max_connections = max_connections
+        self.client: Optional[Redis] = None
+
+    @property
+    def connected(self) -> bool:
+        return self.client is not None
+
+    async def connect(self) -> None:
+        """Создаёт клиент с общим пулом соединений
+
+        Если Redis не задан или недоступен, приложение работает без него.
+        """
+        if self.url is None:
+            logger.info("Redis is not configured, continuing without it")
+            return
+        client = Redis.from_url(
+            self.url,
+            max_connections=self.max_connections,
+            health_check_interval=30,
+        )
+        try:
+            await client.ping()
+        except Exception:
+            logger.exception("Redis is unavailable at %s, continuing without it", self.url)
+            await client.aclose()
+            return
+        self.client = client
+
+    async def close(self) -> None:
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+
+
+redis_manager = RedisManager(settings.REDIS_URL, settings.REDIS_MAX_CONNECTIONS)
@@ -24,6 +24,14 @@ class IncorrectTokenException(HandmadeException):
     detail = "Некорректный токен!"
 
 
+class RevokedTokenException(IncorrectTokenException):
+    detail = "Токен доступа отозван!"
+
+
+class JWTKeyNotFoundException(HandmadeException):
+    detail = "Ключ JWT не найден!"
+
+
 class AdminAlreadyExistsException(HandmadeException):
     detail = "Администратор уже существует!"
 
@@ -44,12 +52,49 @@ class SuperadminPasswordException(HandmadeException):
     detail = "Пароль суперадмина неверный!"
 
 
+class InvalidCursorException(HandmadeException):
+    detail = "Некорректный курсор пагинации!"
+
+
+class PasswordHasherBusyException(HandmadeException):
+    detail = "Сервис проверки паролей перегружен!"
+
+
+class IdempotencyKeyMismatchException(HandmadeException):
+    detail = "Ключ идемпотентности уже использован с другим запросом!"
+
+
+class IdempotencyKeyInProgressException(HandmadeException):
+    detail = "Запрос с этим ключом идемпотентности ещё выполняется!"
+
+
+class IdempotencyKeyLostException(IdempotencyKeyInProgressException):
+    detail = "Ключ идемпотентности перезанят другим запросом!"
+
+
+class ImageTooLargeException(HandmadeException):
+    detail = "Файл изображения слишком большой!"
+
+
+class InvalidImageException(HandmadeException):
+    detail = "Файл не является поддерживаемым изображением!"
+
+
+class QueryLimitExceededException(HandmadeException):
+    detail = "Слишком много SQL-запросов за один HTTP-запрос!"
+
+
+class LazyLoadException(HandmadeException):
+    detail = "Ленивая загрузка связи ORM во время запроса!"
+
+
 class HandmadeHTTPException(HTTPException):
     status_code = 500
     detail = None
+    headers = None
 
     def __init__(self):
-        super().__init__(status_code=self.status_code, detail=self.detail)
+        super().__init__(status_code=self.status_code, detail=self.detail, headers=self.headers)
 
 
 class AdminIsAlreadyAuthenticatedHTTPException(HandmadeHTTPException):
@@ -82,6 +127,11 @@ class IncorrectTokenHTTPException(HandmadeHTTPException):
     detail = "Некорректный токен!"
 
 
+class RevokedTokenHTTPException(HandmadeHTTPException):
+    status_code = 401
+    detail = "Токен доступа отозван!"
+
+
 class NoAccessTokenHTTPException(HandmadeHTTPException):
     status_code = 401
     detail = "Вы не предоставили токен доступа!"
@@ -95,3 +145,35 @@ class AdminNotAuthenticatedHTTPException(HandmadeHTTPException):
 class SuperadminPasswordHTTPException(HandmadeHTTPException):
     status_code = 403
     detail = "Неверный пароль суперадмина!"
+
+
+class PasswordHasherBusyHTTPException(HandmadeHTTPException):
+    status_code = 503
+    detail = "Слишком много попыток входа, повторите позже!"
+    headers = {"Retry-After": "1"}
+
+
+class InvalidCursorHTTPException(HandmadeHTTPException):
+    status_code = 400
+    detail = "Некорректный курсор пагинации!"
+
+
+class IdempotencyKeyMismatchHTTPException(HandmadeHTTPException):
+    status_code = 422
+    detail = "Ключ идемпотентности уже использован с другим запросом!"
+
+
+class IdempotencyKeyInProgressHTTPException(HandmadeHTTPException):
+    status_code = 409
+    detail = "Запрос с этим ключом идемпотентности ещё выполняется, повторите позже!"
+    headers = {"Retry-After": "1"}
+
+
+class ImageTooLargeHTTPException(HandmadeHTTPException):
+    status_code = 413
+    detail = "Файл изображения слишком большой!"
+
+
+class InvalidImageHTTPException(HandmadeHTTPException):
+    status_code = 415
+    detail = "Файл не является поддерживаемым изображением!"
@@ -1,26 +1,55 @@
 # fmt: off
 import sys
 import uvicorn
+from contextlib import asynccontextmanager
 from pathlib import Path
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from fastapi.exceptions import RequestValidationError
 
 sys.path.append(str(Path(__file__).parent.parent))
 
 from src.middleware.json_error_handler import JSONErrorHandlerMiddleware
+from src.middleware.query_stats import QueryStatsMiddleware
 from src.api.product import router as router_products
 from src.api.order import router as router_orders
 from src.api.category import router as router_categories
 from src.api.admin import router as router_admins
+from src.api.metrics import router as router_metrics
+from src.config import settings
 from src.exception_handlers import validation_exception_handler
+from src.utils.jwt_keys import jwt_keys
+from src.connectors.redis import redis_manager
+from src.utils.cache import init_cache
+from src.utils.pagination import NEXT_CURSOR_HEADER
+from src.utils.static import StaticAssets
+from src.services.category_tree import category_tree
+from src.utils.container import Container
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    jwt_keys.load()
+    jwt_keys.install_reload_signal()
+    await redis_manager.connect()
+    init_cache()
+    category_tree.start()
+    app.state.container = Container()
+    yield
+    app.state.container.shutdown()
+    await category_tree.stop()
+    await redis_manager.close()
+
 
 app = FastAPI(
     title="Handmade Store API",
     description="API для магазина handmade браслетов",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 app.add_middleware(
@@ -29,15 +58,38 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Без этого браузер не отдаст скрипту курсор пагинации и ETag
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag"],
 )
 
 app.add_exception_handler(RequestValidationError, validation_exception_handler)
 app.add_middleware(JSONErrorHandlerMiddleware)
+app.add_middleware(QueryStatsMiddleware)
 
 app.include_router(router_admins)
 app.include_router(router_categories)
 app.include_router(router_orders)
 app.include_router(router_products)
+app.include_router(router_metrics)
+
+Path(settings.MEDIA_ROOT).mkdir(parents=True, exist_ok=True)
+Path(settings.STATIC_ROOT).mkdir(parents=True, exist_ok=True)
+app.mount(
+    "/static/media",
+    StaticAssets(
+        directory=settings.MEDIA_ROOT,
+        accel_redirect_prefix=settings.MEDIA_ACCEL_REDIRECT_PREFIX,
+    ),
+    name="media",
+)
+app.mount(
+    "/static",
+    StaticAssets(
+        directory=settings.STATIC_ROOT,
+        accel_redirect_prefix=settings.STATIC_ACCEL_REDIRECT_PREFIX,
+    ),
+    name="static",
+)
 
 
 @app.get("/")
@@ -1,39 +1,120 @@
 import json
-from fastapi import Request
+from typing import Any, Callable, Coroutine
+
+from fastapi import Request, Response
 from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
-
-
-class JSONErrorHandlerMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        content_type = request.headers.get("content-type", "").lower()
-
-        if not content_type.startswith("application/json"):
-            return await call_next(request)
-
-        try:
-            if request.method in ["POST", "PUT", "PATCH"]:
-                body = await request.body()
-                if body:
-                    json.loads(body)
-
-            return await call_next(request)
-
-        except json.JSONDecodeError as exc:
-            error_message = "Неверный формат JSON данных!"
-
-            error_str = str(exc)
-            if "expecting value" in error_str or "Expecting value" in error_str:
-                error_message = "Неверный формат JSON данных: отсутствует значение!"
-            elif "Unterminated string" in error_str:
-                error_message = "Незавершенная строка в JSON данных!"
-            elif "Invalid numeric literal" in error_str:
-                error_message = "Неверный числовой формат в JSON данных!"
-            elif "Invalid \\u" in error_str:
-                error_message = "Неверная escape-последовательность в JSON данных!"
-            elif "Extra data" in error_str:
-                error_message = "Лишние данные в JSON!"
-
-            return JSONResponse(status_code=422, content={"detail": error_message})
-        except UnicodeDecodeError:
-            return await call_next(request)
+from fastapi.routing import APIRoute
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.config import settings
+
+# Разобранное тело запроса, которое JSONBodyRoute отдаёт FastAPI вместо повторного json.loads
+JSON_BODY_SCOPE_KEY = "handmade.json_body"
+
+_BODY_METHODS = {"POST", "PUT", "PATCH"}
+
+
+def _json_error_message(exc: json.JSONDecodeError) -> str:
+    error_str = str(exc)
+    if "expecting value" in error_str or "Expecting value" in error_str:
+        return "Неверный формат JSON данных: отсутствует значение!"
+    if "Unterminated string" in error_str:
+        return "Незавершенная строка в JSON данных!"
+    if "Invalid numeric literal" in error_str:
+        return "Неверный числовой формат в JSON данных!"
+    if "Invalid \\u" in error_str:
+        return "Неверная escape-последовательность в JSON данных!"
+    if "Extra data" in error_str:
+        return "Лишние данные в JSON!"
+    return "Неверный формат JSON данных!"
+
+
+class JSONErrorHandlerMiddleware:
+    """Проверяет JSON-тело запроса один раз и ограничивает его размер
+
+    Тело читается целиком (не больше max_body_size байт), разбирается
+    и передаётся дальше из буфера; результат разбора кладётся в scope,
+    откуда его берёт JSONBodyRoute, поэтому FastAPI не парсит тело заново.
+    """
+
+    def __init__(self, app: ASGIApp, max_body_size: int = settings.JSON_MAX_BODY_SIZE):
+        self.app = app
+        self.max_body_size = max_body_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] not in _BODY_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        if not headers.get("content-type", "").lower().startswith("application/json"):
+            await self.app(scope, receive, send)
+            return
+
+        content_length = headers.get("content-length")
+        if content_length and content_length.isdigit() and int(content_length) > self.max_body_size:
+            await self._too_large(scope, receive, send)
+            return
+
+        chunks = []
+        size = 0
+        more_body = True
+        while more_body:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+            chunk = message.get("body", b"")
+            size += len(chunk)
+            if size > self.max_body_size:
+                await self._too_large(scope, receive, send)
+                return
+            chunks.append(chunk)
+            more_body = message.get("more_body", False)
+        body = b"".join(chunks)
+
+        if body:
+            try:
+                scope[JSON_BODY_SCOPE_KEY] = json.loads(body)
+            except json.JSONDecodeError as exc:
+                response = JSONResponse(status_code=422, content={"detail": _json_error_message(exc)})
+                await response(scope, receive, send)
+                return
+            except UnicodeDecodeError:
+                # Решение о кодировке оставляем FastAPI
+                pass
+
+        body_sent = False
+
+        async def receive_buffered() -> Message:
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        await self.app(scope, receive_buffered, send)
+
+    @staticmethod
+    async def _too_large(scope: Scope, receive: Receive, send: Send) -> None:
+        response = JSONResponse(status_code=413, content={"detail": "Слишком большое тело запроса!"})
+        await response(scope, receive, send)
+
+
+class ParsedJSONRequest(Request):
+    async def json(self) -> Any:
+        if JSON_BODY_SCOPE_KEY in self.scope:
+            return self.scope[JSON_BODY_SCOPE_KEY]
+        return await super().json()
+
+
+class JSONBodyRoute(APIRoute):
+    """Маршрут, который берёт тело, уже разобранное JSONErrorHandlerMiddleware"""
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        handler = super().get_route_handler()
+
+        async def route_handler(request: Request) -> Response:
+            return await handler(ParsedJSONRequest(request.scope, request.receive))
+
+        return route_handler
@@ -0,0 +1,33 @@
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.utils import query_stats
+
+QUERY_COUNT_HEADER = "X-DB-Query-Count"
+
+
+class QueryStatsMiddleware:
+    """Считает SQL-запросы каждого HTTP-запроса и отдаёт их в заголовках ответа
+
+    X-DB-Query-Count - число запросов, Server-Timing - их суммарное время.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = query_stats.start_request()
+
+        async def send_with_stats(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                stats.response_started = True
+                headers = MutableHeaders(scope=message)
+                headers[QUERY_COUNT_HEADER] = str(stats.count)
+                headers.append("Server-Timing", stats.server_timing())
+            await send(message)
+
+        await self.app(scope, receive, send_with_stats)
@@ -0,0 +1,48 @@
+"""keyset pagination indexes
+
+Revision ID: 0d9e950b4a5c
+Revises: 024e81c1553e
+Create Date: 2026-10-17 10:10:41.218304
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0d9e950b4a5c"
+down_revision: Union[str, Sequence[str], None] = "024e81c1553e"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_products_created_at_id", "products", ["created_at", "id"], unique=False
+    )
+    op.create_index(
+        "ix_products_category_id_created_at_id",
+        "products",
+        ["category_id", "created_at", "id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_orders_created_at_id", "orders", ["created_at", "id"], unique=False
+    )
+    op.create_index(
+        "ix_orders_status_created_at_id",
+        "orders",
+        ["status", "created_at", "id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_orders_status_created_at_id", table_name="orders")
+    op.drop_index("ix_orders_created_at_id", table_name="orders")
+    op.drop_index("ix_products_category_id_created_at_id", table_name="products")
+    op.drop_index("ix_products_created_at_id", table_name="products")
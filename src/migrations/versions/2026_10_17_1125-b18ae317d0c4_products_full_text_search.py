@@ -0,0 +1,67 @@
+"""products full text search
+
+Revision ID: b18ae317d0c4
+Revises: 0d9e950b4a5c
+Create Date: 2026-10-17 11:25:09.553172
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b18ae317d0c4"
+down_revision: Union[str, Sequence[str], None] = "0d9e950b4a5c"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+SEARCH_VECTOR_EXPRESSION = (
+    "setweight(to_tsvector('russian', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('russian', coalesce(short_description, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(short_description, '')), 'B') || "
+    "setweight(to_tsvector('russian', coalesce(description, '')), 'C') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'C')"
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # STORED-колонка заполняется для существующих строк при добавлении
+    op.add_column(
+        "products",
+        sa.Column(
+            "search_vector",
+            postgresql.TSVECTOR(),
+            sa.Computed(SEARCH_VECTOR_EXPRESSION, persisted=True),
+            nullable=False,
+        ),
+    )
+    op.create_index(
+        "ix_products_search_vector",
+        "products",
+        ["search_vector"],
+        unique=False,
+        postgresql_using="gin",
+    )
+    op.create_index(
+        "ix_products_name_trgm",
+        "products",
+        ["name"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"name": "gin_trgm_ops"},
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_products_name_trgm", table_name="products")
+    op.drop_index("ix_products_search_vector", table_name="products")
+    op.drop_column("products", "search_vector")
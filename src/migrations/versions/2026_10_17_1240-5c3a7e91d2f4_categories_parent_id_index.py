@@ -0,0 +1,31 @@
+"""categories parent_id index
+
+Revision ID: 5c3a7e91d2f4
+Revises: b18ae317d0c4
+Create Date: 2026-10-17 12:40:27.904615
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5c3a7e91d2f4"
+down_revision: Union[str, Sequence[str], None] = "b18ae317d0c4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Рекурсивный обход дерева категорий идёт от родителя к детям
+    op.create_index(
+        op.f("ix_categories_parent_id"), "categories", ["parent_id"], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_categories_parent_id"), table_name="categories")
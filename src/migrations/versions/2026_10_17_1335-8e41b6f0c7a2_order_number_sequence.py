@@ -0,0 +1,29 @@
+"""order number sequence
+
+Revision ID: 8e41b6f0c7a2
+Revises: 5c3a7e91d2f4
+Create Date: 2026-10-17 13:35:52.118406
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "8e41b6f0c7a2"
+down_revision: Union[str, Sequence[str], None] = "5c3a7e91d2f4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(sa.schema.CreateSequence(sa.Sequence("order_number_seq")))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute(sa.schema.DropSequence(sa.Sequence("order_number_seq")))
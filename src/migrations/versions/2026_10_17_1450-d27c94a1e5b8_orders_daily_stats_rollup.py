@@ -0,0 +1,90 @@
+"""orders daily stats rollup
+
+Revision ID: d27c94a1e5b8
+Revises: 8e41b6f0c7a2
+Create Date: 2026-10-17 14:50:06.731259
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d27c94a1e5b8"
+down_revision: Union[str, Sequence[str], None] = "8e41b6f0c7a2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Триггер переносит заказ между корзинами (день, статус, статус оплаты)
+# при любой записи в orders, в той же транзакции
+SYNC_FUNCTION = """
+CREATE FUNCTION orders_daily_stats_sync() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        UPDATE orders_daily_stats
+        SET orders_count = orders_count - 1,
+            total_amount = total_amount - OLD.total_amount
+        WHERE day = (OLD.created_at AT TIME ZONE 'UTC')::date
+          AND status = OLD.status
+          AND payment_status = OLD.payment_status;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO orders_daily_stats AS s
+            (day, status, payment_status, orders_count, total_amount)
+        VALUES (
+            (NEW.created_at AT TIME ZONE 'UTC')::date,
+            NEW.status, NEW.payment_status, 1, NEW.total_amount
+        )
+        ON CONFLICT (day, status, payment_status) DO UPDATE
+        SET orders_count = s.orders_count + 1,
+            total_amount = s.total_amount + EXCLUDED.total_amount;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "orders_daily_stats",
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("status", sa.String(length=50), nullable=False),
+        sa.Column("payment_status", sa.String(length=50), nullable=False),
+        sa.Column("orders_count", sa.Integer(), nullable=False),
+        sa.Column("total_amount", sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint("day", "status", "payment_status"),
+    )
+    # Заказы, созданные между заполнением и созданием триггера, иначе потерялись бы
+    op.execute("LOCK TABLE orders IN SHARE ROW EXCLUSIVE MODE")
+    op.execute(
+        """
+        INSERT INTO orders_daily_stats
+            (day, status, payment_status, orders_count, total_amount)
+        SELECT (created_at AT TIME ZONE 'UTC')::date, status, payment_status,
+               count(*), coalesce(sum(total_amount), 0)
+        FROM orders
+        GROUP BY 1, 2, 3
+        """
+    )
+    op.execute(SYNC_FUNCTION)
+    op.execute(
+        """
+        CREATE TRIGGER orders_daily_stats_sync
+        AFTER INSERT OR DELETE OR UPDATE OF status, payment_status, total_amount, created_at
+        ON orders
+        FOR EACH ROW EXECUTE FUNCTION orders_daily_stats_sync()
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER orders_daily_stats_sync ON orders")
+    op.execute("DROP FUNCTION orders_daily_stats_sync()")
+    op.drop_table("orders_daily_stats")
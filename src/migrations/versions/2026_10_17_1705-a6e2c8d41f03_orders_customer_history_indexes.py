@@ -0,0 +1,47 @@
+"""orders customer history indexes
+
+Revision ID: a6e2c8d41f03
+Revises: 3f9d0b6a4c1e
+Create Date: 2026-10-17 17:05:13.660947
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a6e2c8d41f03"
+down_revision: Union[str, Sequence[str], None] = "3f9d0b6a4c1e"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_orders_customer_email_created_at_id",
+        "orders",
+        ["customer_email", sa.text("created_at DESC"), sa.text("id DESC")],
+        unique=False,
+        postgresql_include=["order_number", "status", "payment_status", "total_amount", "updated_at"],
+    )
+    op.create_index(
+        "ix_orders_lower_customer_email_created_at_id",
+        "orders",
+        [sa.text("lower(customer_email)"), sa.text("created_at DESC"), sa.text("id DESC")],
+        unique=False,
+    )
+    # Покрывается префиксом составного индекса
+    op.drop_index(op.f("ix_orders_customer_email"), table_name="orders")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index(
+        op.f("ix_orders_customer_email"), "orders", ["customer_email"], unique=False
+    )
+    op.drop_index("ix_orders_lower_customer_email_created_at_id", table_name="orders")
+    op.drop_index("ix_orders_customer_email_created_at_id", table_name="orders")
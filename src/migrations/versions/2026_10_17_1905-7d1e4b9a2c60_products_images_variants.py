@@ -0,0 +1,47 @@
+"""products images variants
+
+Revision ID: 7d1e4b9a2c60
+Revises: c5b7f3e08a94
+Create Date: 2026-10-17 19:05:12.604913
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "7d1e4b9a2c60"
+down_revision: Union[str, Sequence[str], None] = "c5b7f3e08a94"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "products_images", sa.Column("content_hash", sa.String(length=64), nullable=True)
+    )
+    op.add_column("products_images", sa.Column("width", sa.Integer(), nullable=True))
+    op.add_column("products_images", sa.Column("height", sa.Integer(), nullable=True))
+    op.add_column(
+        "products_images",
+        sa.Column("variants", sa.JSON(), server_default=sa.text("'{}'"), nullable=False),
+    )
+    op.create_index(
+        op.f("ix_products_images_content_hash"),
+        "products_images",
+        ["content_hash"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_products_images_content_hash"), table_name="products_images")
+    op.drop_column("products_images", "variants")
+    op.drop_column("products_images", "height")
+    op.drop_column("products_images", "width")
+    op.drop_column("products_images", "content_hash")
@@ -0,0 +1,112 @@
+"""orders daily stats deltas
+
+Revision ID: e4a7c1d9b2f6
+Revises: 7d1e4b9a2c60
+Create Date: 2026-10-17 21:30:41.218377
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e4a7c1d9b2f6"
+down_revision: Union[str, Sequence[str], None] = "7d1e4b9a2c60"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Триггер только дописывает строки-дельты: параллельные заказы не ждут
+# друг друга на общей строке сводки и не могут взаимно заблокироваться.
+# Дельты сворачивает в orders_daily_stats периодическая задача.
+DELTA_FUNCTION = """
+CREATE OR REPLACE FUNCTION orders_daily_stats_sync() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        INSERT INTO orders_daily_stats_delta
+            (day, status, payment_status, orders_count, total_amount)
+        VALUES (
+            (OLD.created_at AT TIME ZONE 'UTC')::date,
+            OLD.status, OLD.payment_status, -1, -OLD.total_amount
+        );
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO orders_daily_stats_delta
+            (day, status, payment_status, orders_count, total_amount)
+        VALUES (
+            (NEW.created_at AT TIME ZONE 'UTC')::date,
+            NEW.status, NEW.payment_status, 1, NEW.total_amount
+        );
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+UPSERT_FUNCTION = """
+CREATE OR REPLACE FUNCTION orders_daily_stats_sync() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        UPDATE orders_daily_stats
+        SET orders_count = orders_count - 1,
+            total_amount = total_amount - OLD.total_amount
+        WHERE day = (OLD.created_at AT TIME ZONE 'UTC')::date
+          AND status = OLD.status
+          AND payment_status = OLD.payment_status;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO orders_daily_stats AS s
+            (day, status, payment_status, orders_count, total_amount)
+        VALUES (
+            (NEW.created_at AT TIME ZONE 'UTC')::date,
+            NEW.status, NEW.payment_status, 1, NEW.total_amount
+        )
+        ON CONFLICT (day, status, payment_status) DO UPDATE
+        SET orders_count = s.orders_count + 1,
+            total_amount = s.total_amount + EXCLUDED.total_amount;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+COMPACT = """
+WITH moved AS (
+    DELETE FROM orders_daily_stats_delta
+    RETURNING day, status, payment_status, orders_count, total_amount
+)
+INSERT INTO orders_daily_stats AS s (day, status, payment_status, orders_count, total_amount)
+SELECT day, status, payment_status, sum(orders_count), sum(total_amount)
+FROM moved
+GROUP BY day, status, payment_status
+ON CONFLICT (day, status, payment_status) DO UPDATE
+SET orders_count = s.orders_count + EXCLUDED.orders_count,
+    total_amount = s.total_amount + EXCLUDED.total_amount
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "orders_daily_stats_delta",
+        sa.Column("id", sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("status", sa.String(length=50), nullable=False),
+        sa.Column("payment_status", sa.String(length=50), nullable=False),
+        sa.Column("orders_count", sa.Integer(), nullable=False),
+        sa.Column("total_amount", sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.execute(DELTA_FUNCTION)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Транзакции, начавшиеся до смены функции, ещё могут дописать дельты
+    op.execute("LOCK TABLE orders IN SHARE ROW EXCLUSIVE MODE")
+    op.execute(UPSERT_FUNCTION)
+    op.execute(COMPACT)
+    op.drop_table("orders_daily_stats_delta")
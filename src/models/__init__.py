@@ -1,7 +1,11 @@
 from src.models.base import Base, BaseModel
 from src.models.admin import AdminsOrm
 from src.models.category import CategoriesOrm
-from src.models.order import OrdersOrm, OrdersItemsOrm
+from src.models.idempotency import IdempotencyKeysOrm
+from src.models.order import (
+    OrdersOrm, OrdersItemsOrm, OrdersDailyStatsOrm, OrdersDailyStatsDeltaOrm
+)
+from src.models.outbox import OutboxOrm
 from src.models.product import ProductsOrm, ProductsImagesOrm
 
 __all__ = [
@@ -12,5 +16,9 @@ __all__ = [
     "CategoriesOrm",
     "OrdersOrm",
     "OrdersItemsOrm",
+    "OrdersDailyStatsOrm",
+    "OrdersDailyStatsDeltaOrm",
     "AdminsOrm",
+    "IdempotencyKeysOrm",
+    "OutboxOrm",
 ]
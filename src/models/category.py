@@ -17,7 +17,8 @@ class CategoriesOrm(BaseModel):
 
     parent_id: Mapped[Optional[int]] = mapped_column(
         ForeignKey("categories.id"),
-        nullable=True
+        nullable=True,
+        index=True
     )
     sort_order: Mapped[int] = mapped_column(Integer, default=0)
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
@@ -1,20 +1,28 @@
+from datetime import date
 from typing import List, Optional
-from sqlalchemy import JSON, ForeignKey, Integer, String, Text
+from sqlalchemy import JSON, BigInteger, Date, ForeignKey, Index, Integer, Sequence, String, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.sql import func
 
-from src.models.base import BaseModel
+from src.models.base import Base, BaseModel
+
+# Источник уникальной части номера заказа, см. OrderNumberAllocator
+order_number_seq = Sequence("order_number_seq", metadata=Base.metadata)
 
 
 class OrdersOrm(BaseModel):
     __tablename__ = "orders"
+    __table_args__ = (
+        Index("ix_orders_created_at_id", "created_at", "id"),
+        Index("ix_orders_status_created_at_id", "status", "created_at", "id"),
+    )
 
     status: Mapped[str] = mapped_column(
         String(50), default="pending", index=True)
     order_number: Mapped[str] = mapped_column(
         String(100), unique=True, index=True)
 
-    customer_email: Mapped[str] = mapped_column(
-        String(200), nullable=False, index=True)
+    customer_email: Mapped[str] = mapped_column(String(200), nullable=False)
     customer_phone: Mapped[str] = mapped_column(String(20), nullable=False)
     customer_name: Mapped[str] = mapped_column(String(200), nullable=False)
 
@@ -38,6 +46,23 @@ class OrdersOrm(BaseModel):
     )
 
 
+# История заказов клиента: фильтр по email и keyset-сортировка (created_at, id) DESC,
+# INCLUDE-колонки покрывают OrderSummary без чтения строк таблицы
+Index(
+    "ix_orders_customer_email_created_at_id",
+    OrdersOrm.customer_email,
+    OrdersOrm.created_at.desc(),
+    OrdersOrm.id.desc(),
+    postgresql_include=["order_number", "status", "payment_status", "total_amount", "updated_at"],
+)
+Index(
+    "ix_orders_lower_customer_email_created_at_id",
+    func.lower(OrdersOrm.customer_email),
+    OrdersOrm.created_at.desc(),
+    OrdersOrm.id.desc(),
+)
+
+
 class OrdersItemsOrm(BaseModel):
     __tablename__ = "order_items"
 
@@ -56,3 +81,37 @@ class OrdersItemsOrm(BaseModel):
         "OrdersOrm", back_populates="items")
     product: Mapped["ProductsOrm"] = relationship(  # type: ignore
         "ProductsOrm", back_populates="orders")
+
+
+class OrdersDailyStatsOrm(Base):
+    """Сводка заказов по дням, статусам и статусам оплаты
+
+    Триггер orders_daily_stats_sync на таблице orders пишет изменения
+    в orders_daily_stats_delta, периодическая задача сворачивает их сюда
+    (OrderRepository.compact_daily_stats). Актуальная сводка - сумма обеих таблиц.
+    """
+    __tablename__ = "orders_daily_stats"
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    status: Mapped[str] = mapped_column(String(50), primary_key=True)
+    payment_status: Mapped[str] = mapped_column(String(50), primary_key=True)
+
+    orders_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    total_amount: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+
+
+class OrdersDailyStatsDeltaOrm(Base):
+    """Изменения сводки заказов, ещё не свёрнутые в orders_daily_stats
+
+    Таблица только дополняется (без уникального ключа), поэтому параллельные
+    заказы не конкурируют за одну строку сводки.
+    """
+    __tablename__ = "orders_daily_stats_delta"
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    day: Mapped[date] = mapped_column(Date, nullable=False)
+    status: Mapped[str] = mapped_column(String(50), nullable=False)
+    payment_status: Mapped[str] = mapped_column(String(50), nullable=False)
+
+    orders_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    total_amount: Mapped[int] = mapped_column(BigInteger, nullable=False)
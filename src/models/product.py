@@ -1,12 +1,34 @@
-from typing import List, Optional
-from sqlalchemy import JSON, Boolean, ForeignKey, Integer, String, Text
+from typing import Dict, List, Optional
+from sqlalchemy import JSON, Boolean, Computed, ForeignKey, Index, Integer, String, Text
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from src.models.base import BaseModel
 
+# Название весит больше краткого описания, краткое описание - больше полного
+SEARCH_VECTOR_EXPRESSION = (
+    "setweight(to_tsvector('russian', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('russian', coalesce(short_description, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(short_description, '')), 'B') || "
+    "setweight(to_tsvector('russian', coalesce(description, '')), 'C') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'C')"
+)
+
 
 class ProductsOrm(BaseModel):
     __tablename__ = "products"
+    __table_args__ = (
+        Index("ix_products_created_at_id", "created_at", "id"),
+        Index("ix_products_category_id_created_at_id", "category_id", "created_at", "id"),
+        Index("ix_products_search_vector", "search_vector", postgresql_using="gin"),
+        Index(
+            "ix_products_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ),
+    )
 
     name: Mapped[str] = mapped_column(String(200), nullable=False, index=True)
     description: Mapped[Optional[str]] = mapped_column(Text)
@@ -27,6 +49,12 @@ class ProductsOrm(BaseModel):
     is_customizable: Mapped[bool] = mapped_column(Boolean, default=False)
     customizable_options: Mapped[List] = mapped_column(JSON, default=list)
 
+    search_vector: Mapped[str] = mapped_column(
+        TSVECTOR,
+        Computed(SEARCH_VECTOR_EXPRESSION, persisted=True),
+        deferred=True,
+    )
+
     category_id: Mapped[int] = mapped_column(
         ForeignKey("categories.id"), nullable=False)
 
@@ -48,5 +76,11 @@ class ProductsImagesOrm(BaseModel):
     is_main: Mapped[bool] = mapped_column(Boolean, default=False)
     sort_order: Mapped[int] = mapped_column(Integer, default=0)
 
+    # sha256 исходника для загруженных файлов, варианты - {имя: {формат: url}}
+    content_hash: Mapped[Optional[str]] = mapped_column(String(64), index=True)
+    width: Mapped[Optional[int]] = mapped_column(Integer)
+    height: Mapped[Optional[int]] = mapped_column(Integer)
+    variants: Mapped[Dict[str, Dict[str, str]]] = mapped_column(JSON, default=dict)
+
     product: Mapped["ProductsOrm"] = relationship(
         "ProductsOrm", back_populates="images")
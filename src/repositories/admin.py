@@ -1,3 +1,4 @@
+from typing import Optional
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -21,9 +22,13 @@ class AdminRepository(BaseRepository[AdminsOrm]):
             return AdminWithHashedPassword.model_validate(model)
         return None
 
-    async def update_last_login(self, db: AsyncSession, admin_id: int):
+    async def update_last_login(
+        self, db: AsyncSession, admin_id: int, hashed_password: Optional[str] = None
+    ):
         from datetime import datetime
         admin = await self.get(db, admin_id)
         if admin:
             admin.last_login = datetime.utcnow()
+            if hashed_password:
+                admin.hashed_password = hashed_password
             await db.commit()
@@ -1,11 +1,16 @@
-from typing import List, Optional, TypeVar, Generic, Type
-from sqlalchemy import select, delete
+from datetime import datetime
+from typing import List, Optional, Tuple, TypeVar, Generic, Type
+from sqlalchemy import Select, func, select, delete, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.models.base import BaseModel
+from src.utils.pagination import Cursor
 
 ModelType = TypeVar("ModelType", bound=BaseModel)
 
+# (число строк, последнее изменение, сумма id) - меняется при любой правке выборки
+Fingerprint = Tuple[int, Optional[datetime], int]
+
 
 class BaseRepository(Generic[ModelType]):
     def __init__(self, model: Type[ModelType]):
@@ -15,10 +20,50 @@ class BaseRepository(Generic[ModelType]):
         result = await db.execute(select(self.model).where(self.model.id == id))
         return result.scalar_one_or_none()
 
-    async def get_multi(self, db: AsyncSession, skip: int = 0, limit: int = 100) -> List[ModelType]:
-        result = await db.execute(select(self.model).offset(skip).limit(limit))
+    def _version_column(self):
+        # updated_at заполняется только при первом UPDATE
+        return func.coalesce(self.model.updated_at, self.model.created_at)
+
+    async def get_version(self, db: AsyncSession, id: int) -> Optional[datetime]:
+        result = await db.execute(select(self._version_column()).where(self.model.id == id))
+        return result.scalar_one_or_none()
+
+    async def fingerprint(self, db: AsyncSession, query: Select) -> Fingerprint:
+        """Отпечаток выборки одним агрегирующим запросом, без загрузки строк"""
+        page = query.with_only_columns(
+            self.model.id, self._version_column().label("version")
+        ).subquery()
+        result = await db.execute(
+            select(
+                func.count(),
+                func.max(page.c.version),
+                func.coalesce(func.sum(page.c.id), 0),
+            ).select_from(page)
+        )
+        return tuple(result.one())
+
+    def _paginate(self, query: Select, skip: int, limit: int, cursor: Optional[Cursor] = None) -> Select:
+        """Сортировка (created_at, id) DESC; с курсором - keyset вместо OFFSET"""
+        query = query.order_by(self.model.created_at.desc(), self.model.id.desc())
+        if cursor is not None:
+            query = query.where(
+                tuple_(self.model.created_at, self.model.id) < (cursor.created_at, cursor.id)
+            )
+        else:
+            query = query.offset(skip)
+        return query.limit(limit)
+
+    async def get_multi(
+        self, db: AsyncSession, skip: int = 0, limit: int = 100, cursor: Optional[Cursor] = None
+    ) -> List[ModelType]:
+        result = await db.execute(self._paginate(select(self.model), skip, limit, cursor))
         return result.scalars().all()
 
+    async def get_multi_fingerprint(
+        self, db: AsyncSession, skip: int = 0, limit: int = 100, cursor: Optional[Cursor] = None
+    ) -> Fingerprint:
+        return await self.fingerprint(db, self._paginate(select(self.model), skip, limit, cursor))
+
     async def create(self, db: AsyncSession, obj_in: dict) -> ModelType:
         db_obj = self.model(**obj_in)
         db.add(db_obj)
@@ -26,6 +71,13 @@ class BaseRepository(Generic[ModelType]):
         await db.refresh(db_obj)
         return db_obj
 
+    async def add(self, db: AsyncSession, obj_in: dict) -> ModelType:
+        """Добавить объект в текущую транзакцию без commit (id доступен после flush)"""
+        db_obj = self.model(**obj_in)
+        db.add(db_obj)
+        await db.flush()
+        return db_obj
+
     async def update(self, db: AsyncSession, db_obj: ModelType, obj_in: dict) -> ModelType:
         for field, value in obj_in.items():
             if value is not None:
@@ -49,6 +49,10 @@ class CategoryRepository(BaseRepository[CategoriesOrm]):
         )
         return result.scalar_one_or_none()
 
+    async def get_all(self, db: AsyncSession) -> List[CategoriesOrm]:
+        result = await db.execute(select(self.model).order_by(self.model.sort_order, self.model.id))
+        return result.scalars().all()
+
     async def get_active_categories(self, db: AsyncSession) -> List[CategoriesOrm]:
         result = await db.execute(
             select(self.model)
@@ -0,0 +1,103 @@
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy import delete, func, or_, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.exceptions import IdempotencyKeyLostException
+from src.models.idempotency import IdempotencyKeysOrm
+
+IN_PROGRESS = "in_progress"
+COMPLETED = "completed"
+
+
+class IdempotencyKeyRepository:
+    model = IdempotencyKeysOrm
+
+    async def claim(
+        self,
+        db: AsyncSession,
+        scope: str,
+        key: str,
+        request_hash: str,
+        ttl: int,
+        lock_timeout: int,
+    ) -> Optional[datetime]:
+        """Занять ключ; истёкший ключ или брошенный упавшим воркером перезанимается
+
+        Возвращает locked_at занятого ключа - по нему complete и release
+        проверяют, что ключ не перезанят другим запросом; None, если ключ занят.
+        """
+        now = func.now()
+        values = {
+            "scope": scope,
+            "key": key,
+            "request_hash": request_hash,
+            "status": IN_PROGRESS,
+            "response_status": None,
+            "response_body": None,
+            "locked_at": now,
+            "expires_at": now + timedelta(seconds=ttl),
+        }
+        stmt = insert(self.model).values(**values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[self.model.scope, self.model.key],
+            set_={k: v for k, v in values.items() if k not in ("scope", "key")},
+            where=or_(
+                self.model.expires_at < now,
+                (self.model.status == IN_PROGRESS)
+                & (self.model.locked_at < now - timedelta(seconds=lock_timeout)),
+            ),
+        ).returning(self.model.locked_at)
+        result = await db.execute(stmt)
+        locked_at = result.scalar_one_or_none()
+        await db.commit()
+        return locked_at
+
+    def _owned(self, scope: str, key: str, locked_at: datetime):
+        return (
+            (self.model.scope == scope)
+            & (self.model.key == key)
+            & (self.model.status == IN_PROGRESS)
+            & (self.model.locked_at == locked_at)
+        )
+
+    async def get(self, db: AsyncSession, scope: str, key: str) -> Optional[IdempotencyKeysOrm]:
+        result = await db.execute(
+            select(self.model)
+            .where(self.model.scope == scope)
+            .where(self.model.key == key)
+            .execution_options(populate_existing=True)
+        )
+        return result.scalar_one_or_none()
+
+    async def complete(
+        self,
+        db: AsyncSession,
+        scope: str,
+        key: str,
+        locked_at: datetime,
+        response_status: int,
+        response_body: str,
+    ) -> None:
+        """Сохранить ответ без commit - в транзакции, которая создаёт результат
+
+        Если ключ за это время перезанят (истёк lock_timeout), бросает
+        IdempotencyKeyLostException, и транзакция результата откатывается.
+        """
+        result = await db.execute(
+            update(self.model)
+            .where(self._owned(scope, key, locked_at))
+            .values(status=COMPLETED, response_status=response_status, response_body=response_body)
+        )
+        if result.rowcount == 0:
+            raise IdempotencyKeyLostException()
+
+    async def release(self, db: AsyncSession, scope: str, key: str, locked_at: datetime) -> None:
+        await db.execute(delete(self.model).where(self._owned(scope, key, locked_at)))
+        await db.commit()
+
+    async def purge_expired(self, db: AsyncSession) -> int:
+        result = await db.execute(delete(self.model).where(self.model.expires_at < func.now()))
+        await db.commit()
+        return result.rowcount
@@ -1,15 +1,29 @@
-from typing import List, Optional, Dict, Any
-from sqlalchemy import select, update, func
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional, Set
+from sqlalchemy import Row, delete, insert, select, union_all, update, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from src.models.order import OrdersOrm, OrdersItemsOrm
+from src.config import settings
+from src.models.order import (
+    OrdersOrm, OrdersItemsOrm, OrdersDailyStatsOrm, OrdersDailyStatsDeltaOrm
+)
 from src.repositories.base import BaseRepository
+from src.utils.pagination import Cursor
+
+
+# Ключ pg_advisory_xact_lock: сворачивать дельты сводки одновременно может только один процесс
+STATS_COMPACTION_LOCK_KEY = 0x6F7264657273
+
+
+def _utc_midnight(day: date) -> datetime:
+    return datetime.combine(day, time.min, tzinfo=timezone.utc)
 
 
 class OrderRepository(BaseRepository[OrdersOrm]):
-    def __init__(self, session: AsyncSession):
-        super().__init__(OrdersOrm, session)
+    def __init__(self):
+        super().__init__(OrdersOrm)
 
     async def get_with_items(self, db: AsyncSession, id: int) -> Optional[OrdersOrm]:
         """Получить заказ с позициями"""
@@ -24,7 +38,7 @@ class OrderRepository(BaseRepository[OrdersOrm]):
         """Получить заказ с позициями и товарами"""
         result = await db.execute(
             select(OrdersOrm)
-            .options(selectinload(OrdersOrm.items).selectinload(OrdersItemsOrm.product))
+            .options(selectinload(OrdersOrm.items).joinedload(OrdersItemsOrm.product))
             .where(OrdersOrm.id == id)
         )
         return result.scalar_one_or_none()
@@ -34,42 +48,62 @@ class OrderRepository(BaseRepository[OrdersOrm]):
         db: AsyncSession,
         email: str,
         skip: int = 0,
-        limit: int = 100
-    ) -> List[OrdersOrm]:
-        result = await db.execute(
-            select(OrdersOrm)
-            .where(OrdersOrm.customer_email == email)
-            .order_by(OrdersOrm.created_at.desc())
-            .offset(skip)
-            .limit(limit)
+        limit: int = 100,
+        cursor: Optional[Cursor] = None,
+        case_insensitive: bool = False
+    ) -> List[Row]:
+        """Краткие данные заказов клиента, без адреса и прочих тяжёлых полей"""
+        query = select(
+            OrdersOrm.id,
+            OrdersOrm.order_number,
+            OrdersOrm.status,
+            OrdersOrm.payment_status,
+            OrdersOrm.total_amount,
+            OrdersOrm.created_at,
+            OrdersOrm.updated_at,
         )
-        return result.scalars().all()
+        if case_insensitive:
+            query = query.where(func.lower(OrdersOrm.customer_email) == email.lower())
+        else:
+            query = query.where(OrdersOrm.customer_email == email)
+        result = await db.execute(self._paginate(query, skip, limit, cursor))
+        return result.all()
 
     async def get_by_status(
         self,
         db: AsyncSession,
         status: str,
         skip: int = 0,
-        limit: int = 100
+        limit: int = 100,
+        cursor: Optional[Cursor] = None
     ) -> List[OrdersOrm]:
-        result = await db.execute(
-            select(OrdersOrm)
-            .where(OrdersOrm.status == status)
-            .order_by(OrdersOrm.created_at.desc())
-            .offset(skip)
-            .limit(limit)
-        )
+        query = select(OrdersOrm).where(OrdersOrm.status == status)
+        result = await db.execute(self._paginate(query, skip, limit, cursor))
         return result.scalars().all()
 
-    async def update_status(self, db: AsyncSession, order_id: int, status: str) -> bool:
-        """Обновить статус заказа"""
+    async def transition_status(
+        self, db: AsyncSession, order_ids: List[int], status: str, from_statuses: List[str]
+    ) -> Set[int]:
+        """Сменить статус заказам, которые сейчас в одном из from_statuses, без commit"""
+        if not order_ids or not from_statuses:
+            return set()
         result = await db.execute(
             update(OrdersOrm)
-            .where(OrdersOrm.id == order_id)
+            .where(OrdersOrm.id == func.any(order_ids))
+            .where(OrdersOrm.status.in_(from_statuses))
             .values(status=status)
+            .returning(OrdersOrm.id)
+            .execution_options(synchronize_session=False)
         )
-        await db.commit()
-        return result.rowcount > 0
+        return set(result.scalars().all())
+
+    async def get_statuses(self, db: AsyncSession, order_ids: List[int]) -> Dict[int, str]:
+        if not order_ids:
+            return {}
+        result = await db.execute(
+            select(OrdersOrm.id, OrdersOrm.status).where(OrdersOrm.id == func.any(order_ids))
+        )
+        return dict(result.all())
 
     async def update_payment_status(
         self,
@@ -78,7 +112,7 @@ class OrderRepository(BaseRepository[OrdersOrm]):
         payment_status: str,
         payment_id: Optional[str] = None
     ) -> bool:
-        """Обновить статус оплаты"""
+        """Обновить статус оплаты без commit"""
         values = {"payment_status": payment_status}
         if payment_id:
             values["payment_id"] = payment_id
@@ -88,30 +122,122 @@ class OrderRepository(BaseRepository[OrdersOrm]):
             .where(OrdersOrm.id == order_id)
             .values(**values)
         )
-        await db.commit()
         return result.rowcount > 0
 
-    async def get_order_stats(self, db: AsyncSession) -> Dict[str, Any]:
-        """Получить статистику по заказам"""
-        total_orders = (await db.execute(select(func.count(OrdersOrm.id)))).scalar() or 0
-        pending_orders = (await db.execute(select(func.count(OrdersOrm.id)).where(OrdersOrm.status == "pending"))).scalar() or 0
-        completed_orders = (await db.execute(select(func.count(OrdersOrm.id)).where(OrdersOrm.status == "completed"))).scalar() or 0
-        total_revenue = (await db.execute(
-            select(func.coalesce(func.sum(OrdersOrm.total_amount), 0))
-            .where(OrdersOrm.payment_status == "paid")
-        )).scalar() or 0
+    async def stream_for_export(
+        self,
+        db: AsyncSession,
+        status: Optional[str] = None,
+        payment_status: Optional[str] = None,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+        with_items: bool = False,
+    ) -> AsyncIterator[OrdersOrm]:
+        """Заказы через серверный курсор, пачками по ORDER_EXPORT_BATCH_SIZE строк"""
+        query = select(OrdersOrm).order_by(OrdersOrm.created_at, OrdersOrm.id)
+        if status is not None:
+            query = query.where(OrdersOrm.status == status)
+        if payment_status is not None:
+            query = query.where(OrdersOrm.payment_status == payment_status)
+        if date_from is not None:
+            query = query.where(OrdersOrm.created_at >= _utc_midnight(date_from))
+        if date_to is not None:
+            query = query.where(OrdersOrm.created_at < _utc_midnight(date_to + timedelta(days=1)))
+        if with_items:
+            # selectinload догружает позиции на каждую пачку yield_per
+            query = query.options(selectinload(OrdersOrm.items))
+        return await db.stream_scalars(
+            query.execution_options(yield_per=settings.ORDER_EXPORT_BATCH_SIZE)
+        )
+
+    async def get_order_stats(
+        self,
+        db: AsyncSession,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None
+    ) -> Dict[str, Any]:
+        """Получить статистику по заказам одним запросом к сводке и её дельтам"""
+        stats = self._stats_source()
+        query = select(*self._stats_columns(stats))
+        if date_from is not None:
+            query = query.where(stats.c.day >= date_from)
+        if date_to is not None:
+            query = query.where(stats.c.day <= date_to)
+        return dict((await db.execute(query)).one()._mapping)
+
+    async def get_daily_stats(
+        self, db: AsyncSession, date_from: date, date_to: date
+    ) -> List[Dict[str, Any]]:
+        """Получить статистику по дням за период"""
+        stats = self._stats_source()
+        result = await db.execute(
+            select(stats.c.day, *self._stats_columns(stats))
+            .where(stats.c.day >= date_from)
+            .where(stats.c.day <= date_to)
+            .group_by(stats.c.day)
+            .order_by(stats.c.day)
+        )
+        return [dict(row._mapping) for row in result]
 
-        return {
-            "total_orders": total_orders,
-            "pending_orders": pending_orders,
-            "completed_orders": completed_orders,
-            "total_revenue": total_revenue
-        }
+    async def compact_daily_stats(self, db: AsyncSession) -> int:
+        """Свернуть дельты в orders_daily_stats одним запросом без commit
+
+        Строки сводки обновляются в порядке ключа, а параллельный вызов
+        сразу возвращает 0, поэтому взаимных блокировок нет. Возвращает
+        число затронутых строк сводки.
+        """
+        if not await db.scalar(select(func.pg_try_advisory_xact_lock(STATS_COMPACTION_LOCK_KEY))):
+            return 0
+        delta, stats = OrdersDailyStatsDeltaOrm, OrdersDailyStatsOrm
+        moved = delete(delta).returning(
+            delta.day, delta.status, delta.payment_status, delta.orders_count, delta.total_amount
+        ).cte("moved")
+        key = (moved.c.day, moved.c.status, moved.c.payment_status)
+        query = pg_insert(stats).from_select(
+            ["day", "status", "payment_status", "orders_count", "total_amount"],
+            select(*key, func.sum(moved.c.orders_count), func.sum(moved.c.total_amount))
+            .group_by(*key)
+            .order_by(*key),
+        )
+        query = query.on_conflict_do_update(
+            index_elements=[stats.day, stats.status, stats.payment_status],
+            set_={
+                "orders_count": stats.orders_count + query.excluded.orders_count,
+                "total_amount": stats.total_amount + query.excluded.total_amount,
+            },
+        )
+        result = await db.execute(query)
+        return result.rowcount
+
+    @staticmethod
+    def _stats_source():
+        """Сводка вместе с ещё не свёрнутыми дельтами"""
+        columns = ("day", "status", "payment_status", "orders_count", "total_amount")
+        return union_all(
+            select(*(getattr(OrdersDailyStatsOrm, name) for name in columns)),
+            select(*(getattr(OrdersDailyStatsDeltaOrm, name) for name in columns)),
+        ).subquery("stats")
+
+    @staticmethod
+    def _stats_columns(stats):
+        def total(column, *conditions):
+            value = func.sum(column)
+            if conditions:
+                value = value.filter(*conditions)
+            return func.coalesce(value, 0)
+
+        return (
+            total(stats.c.orders_count).label("total_orders"),
+            total(stats.c.orders_count, stats.c.status == "pending").label("pending_orders"),
+            # Статуса "completed" в ORDER_STATUSES нет: завершённый заказ - "delivered"
+            total(stats.c.orders_count, stats.c.status == "delivered").label("completed_orders"),
+            total(stats.c.total_amount, stats.c.payment_status == "paid").label("total_revenue"),
+        )
 
 
 class OrderItemRepository(BaseRepository[OrdersItemsOrm]):
-    def __init__(self, session: AsyncSession):
-        super().__init__(OrdersItemsOrm, session)
+    def __init__(self):
+        super().__init__(OrdersItemsOrm)
 
     async def get_by_order(self, db: AsyncSession, order_id: int) -> List[OrdersItemsOrm]:
         """Получить позиции заказа"""
@@ -128,3 +254,7 @@ class OrderItemRepository(BaseRepository[OrdersItemsOrm]):
             .where(OrdersItemsOrm.product_id == product_id)
         )
         return result.scalars().all()
+
+    async def add_many(self, db: AsyncSession, items: List[Dict[str, Any]]) -> None:
+        """Вставить позиции одним пакетным INSERT в текущей транзакции без commit"""
+        await db.execute(insert(OrdersItemsOrm), items)
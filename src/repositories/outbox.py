@@ -0,0 +1,48 @@
+from typing import Any, Dict, List, Tuple
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.models.outbox import OutboxOrm
+
+
+class OutboxRepository:
+    model = OutboxOrm
+
+    async def add_many(self, db: AsyncSession, events: List[Tuple[str, Dict[str, Any]]]) -> None:
+        """Записать события в текущую транзакцию без commit"""
+        if not events:
+            return
+        await db.execute(
+            insert(self.model),
+            [{"event_type": event_type, "payload": payload} for event_type, payload in events],
+        )
+
+    async def claim_batch(self, db: AsyncSession, limit: int, max_attempts: int) -> List[OutboxOrm]:
+        """Необработанные события; SKIP LOCKED позволяет запускать несколько релеев параллельно"""
+        result = await db.execute(
+            select(self.model)
+            .where(self.model.processed_at.is_(None))
+            .where(self.model.attempts < max_attempts)
+            .order_by(self.model.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        return result.scalars().all()
+
+    async def mark_processed(self, db: AsyncSession, ids: List[int]) -> None:
+        if not ids:
+            return
+        await db.execute(
+            update(self.model)
+            .where(self.model.id == func.any(ids))
+            .values(processed_at=func.now())
+            .execution_options(synchronize_session=False)
+        )
+
+    async def mark_failed(self, db: AsyncSession, id: int, error: str) -> None:
+        await db.execute(
+            update(self.model)
+            .where(self.model.id == id)
+            .values(attempts=self.model.attempts + 1, last_error=error)
+            .execution_options(synchronize_session=False)
+        )
@@ -1,16 +1,33 @@
-from typing import List, Optional
-from sqlalchemy import select, or_, update
+from typing import Dict, Iterable, List, Optional, Set
+from sqlalchemy import Integer, Select, cast, column, func, select, or_, update, values
+from sqlalchemy.dialects.postgresql import REGCONFIG
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from src.repositories.base import BaseRepository
+from src.repositories.base import BaseRepository, Fingerprint
+from src.models.category import CategoriesOrm
 from src.models.product import ProductsOrm, ProductsImagesOrm
+from src.utils.pagination import Cursor
 
 
 class ProductRepository(BaseRepository[ProductsOrm]):
     def __init__(self):
         super().__init__(ProductsOrm)
 
+    async def get_many(
+        self, db: AsyncSession, ids: Iterable[int], for_update: bool = False
+    ) -> List[ProductsOrm]:
+        """Товары по списку id; for_update блокирует строки в порядке id, чтобы не ловить дедлоки"""
+        query = (
+            select(self.model)
+            .where(self.model.id == func.any(sorted(ids)))
+            .order_by(self.model.id)
+        )
+        if for_update:
+            query = query.with_for_update().execution_options(populate_existing=True)
+        result = await db.execute(query)
+        return result.scalars().all()
+
     async def get_with_images(self, db: AsyncSession, id: int) -> Optional[ProductsOrm]:
         result = await db.execute(
             select(self.model)
@@ -27,43 +44,105 @@ class ProductRepository(BaseRepository[ProductsOrm]):
         )
         return result.scalar_one_or_none()
 
-    async def get_by_category(self, db: AsyncSession, category_id: int, skip=0, limit=100) -> List[ProductsOrm]:
-        result = await db.execute(
+    def _by_category_query(self, category_id: int) -> Select:
+        return (
             select(self.model)
             .where(self.model.category_id == category_id)
             .where(self.model.is_active == True)
-            .offset(skip).limit(limit)
-            .order_by(self.model.created_at.desc())
         )
+
+    async def get_by_category(
+        self, db: AsyncSession, category_id: int, skip=0, limit=100, cursor: Optional[Cursor] = None
+    ) -> List[ProductsOrm]:
+        query = self._by_category_query(category_id)
+        result = await db.execute(self._paginate(query, skip, limit, cursor))
         return result.scalars().all()
 
+    async def get_by_category_fingerprint(
+        self, db: AsyncSession, category_id: int, skip=0, limit=100, cursor: Optional[Cursor] = None
+    ) -> Fingerprint:
+        query = self._by_category_query(category_id)
+        return await self.fingerprint(db, self._paginate(query, skip, limit, cursor))
+
+    def _by_category_subtree_query(self, category_id: int) -> Select:
+        """Товары категории и всех её активных подкатегорий одним запросом (WITH RECURSIVE)"""
+        subtree = (
+            select(CategoriesOrm.id)
+            .where(CategoriesOrm.id == category_id)
+            .cte("category_subtree", recursive=True)
+        )
+        # UNION, а не UNION ALL: защищает от зацикливания на битых parent_id
+        subtree = subtree.union(
+            select(CategoriesOrm.id)
+            .where(CategoriesOrm.parent_id == subtree.c.id)
+            .where(CategoriesOrm.is_active.is_(True))
+        )
+        return (
+            select(self.model)
+            .where(self.model.category_id.in_(select(subtree.c.id)))
+            .where(self.model.is_active.is_(True))
+        )
+
+    async def get_by_category_subtree(
+        self, db: AsyncSession, category_id: int, skip=0, limit=100, cursor: Optional[Cursor] = None
+    ) -> List[ProductsOrm]:
+        query = self._by_category_subtree_query(category_id)
+        result = await db.execute(self._paginate(query, skip, limit, cursor))
+        return result.scalars().all()
+
+    async def get_by_category_subtree_fingerprint(
+        self, db: AsyncSession, category_id: int, skip=0, limit=100, cursor: Optional[Cursor] = None
+    ) -> Fingerprint:
+        query = self._by_category_subtree_query(category_id)
+        return await self.fingerprint(db, self._paginate(query, skip, limit, cursor))
+
     async def search_products(self, db: AsyncSession, query: str, skip=0, limit=100) -> List[ProductsOrm]:
-        search_term = f"%{query}%"
+        """Полнотекстовый поиск (russian + english) с ранжированием и триграммами для опечаток"""
+        ts_query = func.websearch_to_tsquery(
+            cast("russian", REGCONFIG), query
+        ).op("||")(func.websearch_to_tsquery(cast("english", REGCONFIG), query))
+        rank = func.ts_rank(self.model.search_vector, ts_query)
+        similarity = func.word_similarity(query, self.model.name)
         result = await db.execute(
             select(self.model)
             .where(
                 or_(
-                    self.model.name.ilike(search_term),
-                    self.model.description.ilike(search_term),
-                    self.model.short_description.ilike(search_term)
+                    self.model.search_vector.op("@@")(ts_query),
+                    self.model.name.op("%>")(query),
                 )
             )
             .where(self.model.is_active == True)
+            .order_by(rank.desc(), similarity.desc(), self.model.id.desc())
             .offset(skip).limit(limit)
-            .order_by(self.model.created_at.desc())
         )
         return result.scalars().all()
 
-    async def get_available_products(self, db: AsyncSession, skip=0, limit=100) -> List[ProductsOrm]:
-        result = await db.execute(
+    def _available_query(self) -> Select:
+        return (
             select(self.model)
             .where(self.model.is_active == True)
             .where(self.model.in_stock == True)
-            .offset(skip).limit(limit)
-            .order_by(self.model.created_at.desc())
         )
+
+    async def get_available_products(
+        self, db: AsyncSession, skip=0, limit=100, cursor: Optional[Cursor] = None
+    ) -> List[ProductsOrm]:
+        result = await db.execute(self._paginate(self._available_query(), skip, limit, cursor))
         return result.scalars().all()
 
+    async def get_available_fingerprint(
+        self, db: AsyncSession, skip=0, limit=100, cursor: Optional[Cursor] = None
+    ) -> Fingerprint:
+        return await self.fingerprint(
+            db, self._paginate(self._available_query(), skip, limit, cursor))
+
+    async def count_by_category(self, db: AsyncSession) -> Dict[int, int]:
+        result = await db.execute(
+            select(self.model.category_id, func.count(self.model.id))
+            .group_by(self.model.category_id)
+        )
+        return dict(result.all())
+
     async def update_stock(self, db: AsyncSession, product_id: int, new_quantity: int) -> bool:
         result = await db.execute(
             update(self.model)
@@ -73,18 +152,43 @@ class ProductRepository(BaseRepository[ProductsOrm]):
         await db.commit()
         return result.rowcount > 0
 
+    async def reserve_stock(self, db: AsyncSession, quantities: Dict[int, int]) -> Set[int]:
+        """Атомарно списать остатки одним UPDATE ... FROM (VALUES ...) без commit
+
+        Строка меняется, только если остатка хватает (stock_quantity >= quantity),
+        поэтому параллельные заказы не уводят склад в минус. Возвращает id
+        товаров, по которым списание прошло.
+        """
+        delta = values(
+            column("product_id", Integer), column("quantity", Integer), name="delta"
+        ).data(sorted(quantities.items()))
+        new_quantity = self.model.stock_quantity - delta.c.quantity
+        result = await db.execute(
+            update(self.model)
+            .where(self.model.id == delta.c.product_id)
+            .where(self.model.stock_quantity >= delta.c.quantity)
+            .values(stock_quantity=new_quantity, in_stock=new_quantity > 0)
+            .returning(self.model.id)
+            .execution_options(synchronize_session=False)
+        )
+        return set(result.scalars().all())
+
 
 class ProductImageRepository(BaseRepository[ProductsImagesOrm]):
     def __init__(self):
         super().__init__(ProductsImagesOrm)
 
+    def _by_product_query(self, product_id: int) -> Select:
+        return select(self.model).where(self.model.product_id == product_id).order_by(
+            self.model.sort_order, self.model.id)
+
     async def get_by_product(self, db: AsyncSession, product_id: int) -> List[ProductsImagesOrm]:
-        result = await db.execute(
-            select(self.model).where(self.model.product_id == product_id).order_by(
-                self.model.sort_order, self.model.id)
-        )
+        result = await db.execute(self._by_product_query(product_id))
         return result.scalars().all()
 
+    async def get_by_product_fingerprint(self, db: AsyncSession, product_id: int) -> Fingerprint:
+        return await self.fingerprint(db, self._by_product_query(product_id))
+
     async def get_main_image(self, db: AsyncSession, product_id: int) -> Optional[ProductsImagesOrm]:
         result = await db.execute(
             select(self.model)
@@ -1,4 +1,5 @@
-from typing import List, Optional, Dict, Any
+from datetime import date
+from typing import List, Literal, Optional, Dict, Any
 from pydantic import Field, EmailStr
 
 from src.schemas.base import BaseSchema, TimestampSchema, IDSchema
@@ -59,6 +60,13 @@ class OrderResponse(OrderBase, IDSchema, TimestampSchema):
     admin_notes: Optional[str] = None
 
 
+class OrderSummary(IDSchema, TimestampSchema):
+    order_number: str
+    status: str
+    payment_status: str
+    total_amount: int
+
+
 class OrderWithItems(OrderResponse):
     items: List[OrderItemResponse] = []
 
@@ -71,6 +79,22 @@ class OrderStatusUpdate(BaseSchema):
     status: str = Field(..., max_length=50)
 
 
+class OrderBulkStatusUpdate(BaseSchema):
+    order_ids: List[int] = Field(..., min_length=1, max_length=1000)
+    status: str = Field(..., max_length=50)
+
+
+class OrderStatusTransition(BaseSchema):
+    order_id: int
+    result: Literal["updated", "unchanged", "not_found", "invalid_transition"]
+    status: Optional[str] = None
+
+
+class OrderBulkStatusResult(BaseSchema):
+    updated: int
+    results: List[OrderStatusTransition]
+
+
 class PaymentStatusUpdate(BaseSchema):
     payment_status: str = Field(..., max_length=50)
     payment_id: Optional[str] = Field(None, max_length=200)
@@ -81,3 +105,7 @@ class OrderStats(BaseSchema):
     pending_orders: int
     completed_orders: int
     total_revenue: int
+
+
+class OrderDailyStats(OrderStats):
+    day: date
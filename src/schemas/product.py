@@ -81,6 +81,10 @@ class ProductImageUpdate(BaseSchema):
 
 class ProductImageResponse(ProductImageBase, IDSchema, TimestampSchema):
     product_id: int
+    content_hash: Optional[str] = None
+    width: Optional[int] = None
+    height: Optional[int] = None
+    variants: Dict[str, Dict[str, str]] = Field(default_factory=dict)
 
 
 class CustomizationRequest(BaseSchema):
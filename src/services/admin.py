@@ -1,11 +1,14 @@
 import jwt
+from typing import Optional
 from datetime import datetime, timedelta, timezone
-from passlib.context import CryptContext
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.repositories.admin import AdminRepository
 from src.schemas.admin import AdminRequestAdd, AdminResponse
 from src.config import settings
+from src.utils.jwt_keys import jwt_keys
+from src.utils.password_hasher import PasswordHasher, password_hasher
+from src.utils.token_cache import token_cache
 from src.exceptions import (
     AdminAlreadyExistsException,
     AdminNotAuthenticatedException,
@@ -13,15 +16,19 @@ from src.exceptions import (
     ExpiredTokenException,
     IncorrectPasswordException,
     IncorrectTokenException,
+    RevokedTokenException,
     SuperadminPasswordException
 )
 
 
 class AdminService:
-    def __init__(self, db: AsyncSession):
-        self.repository = AdminRepository()
-        self.db = db
-        self.pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+    def __init__(
+        self,
+        repository: Optional[AdminRepository] = None,
+        hasher: Optional[PasswordHasher] = None,
+    ):
+        self.repository = repository or AdminRepository()
+        self.password_hasher = hasher or password_hasher
 
     def _verify_superadmin_password(self, provided_password: str) -> bool:
         return provided_password == settings.SUPERADMIN_PASSWORD
@@ -31,66 +38,79 @@ class AdminService:
         expire = datetime.now(
             timezone.utc) + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
         to_encode.update({"exp": expire})
-        return jwt.encode(to_encode, settings.JWT_PRIVATE_KEY, algorithm=settings.JWT_ALGORITHM)
+        return jwt_keys.encode(to_encode)
 
-    def hash_password(self, password: str) -> str:
-        return self.pwd_context.hash(password)
+    async def hash_password(self, password: str) -> str:
+        return await self.password_hasher.hash(password)
 
-    def verify_password(self, plain_password, hashed_password):
-        return self.pwd_context.verify(plain_password, hashed_password)
+    async def verify_password(self, plain_password, hashed_password) -> tuple[bool, str | None]:
+        return await self.password_hasher.verify_and_update(plain_password, hashed_password)
 
-    def verify_token(self, token: str) -> int:
-        """Проверяет токен и возвращает admin_id"""
-        if not token:
-            raise AdminNotAuthenticatedException()
+    def _decode_token(self, token: str) -> tuple[int, int]:
         try:
-            payload = jwt.decode(token, settings.JWT_PUBLIC_KEY, algorithms=[
-                                 settings.JWT_ALGORITHM])
+            payload = jwt_keys.decode(token)
         except jwt.ExpiredSignatureError:
             raise ExpiredTokenException()
         except jwt.InvalidTokenError:
             raise IncorrectTokenException()
 
         admin_id = payload.get("admin_id")
-        if not admin_id:
+        exp = payload.get("exp")
+        if not admin_id or not exp:
             raise IncorrectTokenException()
+        return admin_id, exp
+
+    async def verify_token(self, token: str) -> int:
+        """Проверяет токен и возвращает admin_id; отзыв сверяется и для кэшированных токенов"""
+        if not token:
+            raise AdminNotAuthenticatedException()
+        admin_id = token_cache.get(token)
+        exp = None
+        if admin_id is None:
+            admin_id, exp = self._decode_token(token)
+        if await token_cache.is_revoked(token):
+            raise RevokedTokenException()
+        if exp is not None:
+            token_cache.set(token, admin_id, exp)
         return admin_id
 
-    async def get_one_or_none_admin(self, admin_id: int) -> AdminResponse:
-        admin = await self.repository.get(self.db, admin_id)
+    async def get_one_or_none_admin(self, db: AsyncSession, admin_id: int) -> AdminResponse:
+        admin = await self.repository.get(db, admin_id)
         if not admin:
             raise AdminNotAuthenticatedException()
         return AdminResponse.model_validate(admin)
 
-    async def register_admin(self, data: AdminRequestAdd) -> AdminResponse:
+    async def register_admin(self, db: AsyncSession, data: AdminRequestAdd) -> AdminResponse:
         if not self._verify_superadmin_password(data.superadmin_password):
             raise SuperadminPasswordException()
 
-        existing_admin = await self.repository.get_by_email(self.db, data.email)
+        existing_admin = await self.repository.get_by_email(db, data.email)
         if existing_admin:
             raise AdminAlreadyExistsException()
 
         admin_dict = {
             "email": data.email,
-            "hashed_password": self.hash_password(data.password),
+            "hashed_password": await self.hash_password(data.password),
             "updated_at": datetime.utcnow()
         }
-        admin = await self.repository.create(self.db, admin_dict)
+        admin = await self.repository.create(db, admin_dict)
         return AdminResponse.model_validate(admin)
 
-    async def login_admin(self, data: AdminRequestAdd) -> str:
-        admin = await self.repository.get_admin_with_hashed_password(self.db, data.email)
+    async def login_admin(self, db: AsyncSession, data: AdminRequestAdd) -> str:
+        admin = await self.repository.get_admin_with_hashed_password(db, data.email)
         if not admin:
             raise EmailNotRegisteredException()
-        if not self.verify_password(data.password, admin.hashed_password):
+        verified, new_hash = await self.verify_password(data.password, admin.hashed_password)
+        if not verified:
             raise IncorrectPasswordException()
-        await self.repository.update_last_login(self.db, admin.id)
+        await self.repository.update_last_login(db, admin.id, new_hash)
         return self.create_access_token({"admin_id": admin.id, "sub": admin.email})
 
     async def logout_admin(self, token: str):
         if not token:
             raise AdminNotAuthenticatedException()
         try:
-            self.verify_token(token)
+            _, exp = self._decode_token(token)
         except (IncorrectTokenException, ExpiredTokenException):
-            pass
+            return
+        await token_cache.revoke(token, exp)
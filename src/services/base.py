@@ -1,6 +1,9 @@
 from typing import TypeVar, Generic, List, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.utils.conditional import ResourceVersion, make_etag
+from src.utils.pagination import Cursor
+
 ModelType = TypeVar("ModelType")
 CreateSchemaType = TypeVar("CreateSchemaType")
 UpdateSchemaType = TypeVar("UpdateSchemaType")
@@ -9,6 +12,7 @@ ResponseSchemaType = TypeVar("ResponseSchemaType")
 
 class BaseService(Generic[ModelType, CreateSchemaType, UpdateSchemaType, ResponseSchemaType]):
     repository: any
+    response_schema: type
 
     def __init__(self, repository):
         self.repository = repository
@@ -16,17 +20,33 @@ class BaseService(Generic[ModelType, CreateSchemaType, UpdateSchemaType, Respons
     async def get(self, db: AsyncSession, id: int) -> Optional[ResponseSchemaType]:
         db_obj = await self.repository.get(db, id)
         if db_obj:
-            return ResponseSchemaType.model_validate(db_obj)
+            return self.response_schema.model_validate(db_obj)
         return None
 
-    async def get_multi(self, db: AsyncSession, skip: int = 0, limit: int = 100) -> List[ResponseSchemaType]:
-        db_objs = await self.repository.get_multi(db, skip, limit)
-        return [ResponseSchemaType.model_validate(obj) for obj in db_objs]
+    async def get_version(self, db: AsyncSession, id: int) -> Optional[ResourceVersion]:
+        """ETag и Last-Modified объекта по id и updated_at, без загрузки строки"""
+        version = await self.repository.get_version(db, id)
+        if version is None:
+            return None
+        return ResourceVersion(make_etag(self.response_schema.__name__, id, version), version)
+
+    async def get_multi(
+        self, db: AsyncSession, skip: int = 0, limit: int = 100, cursor: Optional[Cursor] = None
+    ) -> List[ResponseSchemaType]:
+        db_objs = await self.repository.get_multi(db, skip, limit, cursor)
+        return [self.response_schema.model_validate(obj) for obj in db_objs]
+
+    async def get_multi_version(
+        self, db: AsyncSession, skip: int = 0, limit: int = 100, cursor: Optional[Cursor] = None
+    ) -> ResourceVersion:
+        fingerprint = await self.repository.get_multi_fingerprint(db, skip, limit, cursor)
+        return ResourceVersion(
+            make_etag(self.response_schema.__name__, skip, limit, cursor, *fingerprint))
 
     async def create(self, db: AsyncSession, obj_in: CreateSchemaType) -> ResponseSchemaType:
         obj_data = obj_in.model_dump()
         db_obj = await self.repository.create(db, obj_data)
-        return ResponseSchemaType.model_validate(db_obj)
+        return self.response_schema.model_validate(db_obj)
 
     async def update(self, db: AsyncSession, id: int, obj_in: UpdateSchemaType) -> Optional[ResponseSchemaType]:
         db_obj = await self.repository.get(db, id)
@@ -34,7 +54,7 @@ class BaseService(Generic[ModelType, CreateSchemaType, UpdateSchemaType, Respons
             return None
         update_data = obj_in.model_dump(exclude_unset=True)
         updated_obj = await self.repository.update(db, db_obj, update_data)
-        return ResponseSchemaType.model_validate(updated_obj)
+        return self.response_schema.model_validate(updated_obj)
 
     async def delete(self, db: AsyncSession, id: int) -> bool:
         return await self.repository.delete(db, id)
@@ -3,21 +3,56 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.repositories.category import CategoryRepository
 from src.schemas.category import (
-    CategoryCreate, CategoryResponse,
+    CategoryCreate, CategoryUpdate, CategoryResponse,
     CategoryWithChildren, CategoryWithProducts
 )
 from src.services.base import BaseService
+from src.services.category_tree import CategoryTreeManager, category_tree
+from src.utils.cache import CATEGORIES_TAG, invalidate_tags
+from src.utils.conditional import ResourceVersion, make_etag
+from src.utils.pagination import Cursor
 
 
 class CategoryService(BaseService):
-    def __init__(self):
-        super().__init__(CategoryRepository())
+    response_schema = CategoryResponse
+
+    def __init__(
+        self,
+        repository: Optional[CategoryRepository] = None,
+        tree: Optional[CategoryTreeManager] = None,
+    ):
+        super().__init__(repository or CategoryRepository())
+        self.tree = tree or category_tree
+
+    async def get(self, db: AsyncSession, id: int) -> Optional[CategoryResponse]:
+        tree = await self.tree.get(db)
+        return tree.get(id)
+
+    async def get_version(self, db: AsyncSession, id: int) -> Optional[ResourceVersion]:
+        category = await self.get(db, id)
+        return self.version_of(category) if category else None
+
+    @staticmethod
+    def version_of(*categories: CategoryResponse) -> ResourceVersion:
+        """ETag категорий из снимка дерева; products_count не меняет updated_at, поэтому входит в ключ"""
+        return ResourceVersion(make_etag(*(
+            (c.id, c.updated_at or c.created_at, c.products_count) for c in categories
+        )))
+
+    async def get_multi(
+        self, db: AsyncSession, skip: int = 0, limit: int = 100, cursor: Optional[Cursor] = None
+    ) -> List[CategoryResponse]:
+        tree = await self.tree.get(db)
+        return tree.page(skip, limit, cursor)
+
+    async def get_multi_version(
+        self, db: AsyncSession, skip: int = 0, limit: int = 100, cursor: Optional[Cursor] = None
+    ) -> ResourceVersion:
+        return self.version_of(*await self.get_multi(db, skip, limit, cursor))
 
     async def get_by_slug(self, db: AsyncSession, slug: str) -> Optional[CategoryResponse]:
-        category = await self.repository.get_by_slug(db, slug)
-        if category:
-            return CategoryResponse.model_validate(category)
-        return None
+        tree = await self.tree.get(db)
+        return tree.get_by_slug(slug)
 
     async def get_with_products(self, db: AsyncSession, id: int) -> Optional[CategoryWithProducts]:
         category = await self.repository.get_with_products(db, id)
@@ -26,29 +61,46 @@ class CategoryService(BaseService):
         return None
 
     async def get_with_children(self, db: AsyncSession, id: int) -> Optional[CategoryWithChildren]:
-        category = await self.repository.get_with_children(db, id)
+        tree = await self.tree.get(db)
+        category = tree.get(id)
         if category:
-            cat_data = CategoryWithChildren.model_validate(category)
-            cat_data.products_count = len(
-                category.products) if category.products else 0
-            return cat_data
+            return CategoryWithChildren(
+                **dict(category),
+                children=tree.children(id, active_only=False),
+            )
         return None
 
     async def get_root_categories(self, db: AsyncSession) -> List[CategoryResponse]:
-        categories = await self.repository.get_root_categories(db)
-        return [CategoryResponse.model_validate(cat) for cat in categories]
+        tree = await self.tree.get(db)
+        return tree.roots()
 
     async def get_children(self, db: AsyncSession, parent_id: int) -> List[CategoryResponse]:
-        categories = await self.repository.get_children(db, parent_id)
-        return [CategoryResponse.model_validate(cat) for cat in categories]
+        tree = await self.tree.get(db)
+        return tree.children(parent_id)
 
     async def get_active_categories(self, db: AsyncSession) -> List[CategoryResponse]:
-        categories = await self.repository.get_active_categories(db)
-        return [CategoryResponse.model_validate(cat) for cat in categories]
+        tree = await self.tree.get(db)
+        return tree.active()
+
+    async def _invalidate(self) -> None:
+        await self.tree.invalidate()
+        await invalidate_tags(CATEGORIES_TAG)
 
     async def create(self, db: AsyncSession, obj_in: CategoryCreate) -> CategoryResponse:
         existing = await self.repository.get_by_slug(db, obj_in.slug)
         if existing:
             raise ValueError(
                 f"Category with slug '{obj_in.slug}' already exists")
-        return await super().create(db, obj_in)
+        category = await super().create(db, obj_in)
+        await self._invalidate()
+        return category
+
+    async def update(self, db: AsyncSession, id: int, obj_in: CategoryUpdate) -> Optional[CategoryResponse]:
+        category = await super().update(db, id, obj_in)
+        await self._invalidate()
+        return category
+
+    async def delete(self, db: AsyncSession, id: int) -> bool:
+        success = await super().delete(db, id)
+        await self._invalidate()
+        return success
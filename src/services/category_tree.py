@@ -0,0 +1,228 @@
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Dict, FrozenSet, List, Mapping, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.config import settings
+from src.connectors.redis import redis_manager
+from src.repositories.category import CategoryRepository
+from src.repositories.product import ProductRepository
+from src.schemas.category import CategoryResponse
+from src.utils.pagination import Cursor
+
+logger = logging.getLogger(__name__)
+
+CATEGORY_TREE_CHANNEL = "category_tree:version"
+
+
+@dataclass(frozen=True)
+class CategoryNode:
+    category: CategoryResponse
+    children_ids: Tuple[int, ...]
+    ancestor_ids: Tuple[int, ...]
+    descendant_ids: FrozenSet[int]
+
+
+class CategoryTree:
+    """Неизменяемый снимок дерева категорий с индексами по id и slug
+
+    Модели CategoryResponse внутри снимка общие для всех запросов,
+    их нельзя изменять.
+    """
+
+    def __init__(self, categories: List[CategoryResponse], version: int = 0):
+        self.version = version
+        self.built_at = time.monotonic()
+
+        children: Dict[Optional[int], List[CategoryResponse]] = {}
+        for category in categories:
+            children.setdefault(category.parent_id, []).append(category)
+        for siblings in children.values():
+            siblings.sort(key=lambda c: (c.sort_order, c.id))
+
+        by_id = {c.id: c for c in categories}
+        nodes: Dict[int, CategoryNode] = {}
+
+        def build(category: CategoryResponse, ancestors: Tuple[int, ...]) -> FrozenSet[int]:
+            child_ids = tuple(c.id for c in children.get(category.id, []))
+            descendants = set(child_ids)
+            for child in children.get(category.id, []):
+                if child.id not in nodes:
+                    descendants |= build(child, ancestors + (category.id,))
+            nodes[category.id] = CategoryNode(
+                category=category,
+                children_ids=child_ids,
+                ancestor_ids=ancestors,
+                descendant_ids=frozenset(descendants),
+            )
+            return nodes[category.id].descendant_ids
+
+        for root in children.get(None, []):
+            build(root, ())
+        # Категории с несуществующим родителем считаем корневыми
+        for category in categories:
+            if category.id not in nodes and category.parent_id not in by_id:
+                build(category, ())
+
+        self._nodes: Mapping[int, CategoryNode] = MappingProxyType(nodes)
+        self._by_slug: Mapping[str, CategoryNode] = MappingProxyType(
+            {node.category.slug: node for node in nodes.values()}
+        )
+        self._roots: Tuple[int, ...] = tuple(c.id for c in children.get(None, []))
+        self._active: Tuple[CategoryResponse, ...] = tuple(
+            sorted((c for c in categories if c.is_active), key=lambda c: (c.sort_order, c.name))
+        )
+        self._newest: Tuple[CategoryResponse, ...] = tuple(
+            sorted(categories, key=lambda c: (c.created_at, c.id), reverse=True)
+        )
+
+    def node(self, id: int) -> Optional[CategoryNode]:
+        return self._nodes.get(id)
+
+    def get(self, id: int) -> Optional[CategoryResponse]:
+        node = self._nodes.get(id)
+        return node.category if node else None
+
+    def get_by_slug(self, slug: str) -> Optional[CategoryResponse]:
+        node = self._by_slug.get(slug)
+        return node.category if node else None
+
+    def children(self, id: int, active_only: bool = True) -> List[CategoryResponse]:
+        node = self._nodes.get(id)
+        if node is None:
+            return []
+        result = [self._nodes[child_id].category for child_id in node.children_ids]
+        return [c for c in result if c.is_active] if active_only else result
+
+    def roots(self, active_only: bool = True) -> List[CategoryResponse]:
+        result = [self._nodes[id].category for id in self._roots]
+        return [c for c in result if c.is_active] if active_only else result
+
+    def active(self) -> List[CategoryResponse]:
+        return list(self._active)
+
+    def page(self, skip: int = 0, limit: int = 100, cursor: Optional[Cursor] = None) -> List[CategoryResponse]:
+        """Страница в порядке (created_at, id) DESC, как у репозитория"""
+        if cursor is None:
+            return list(self._newest[skip:skip + limit])
+        after = (cursor.created_at, cursor.id)
+        return [c for c in self._newest if (c.created_at, c.id) < after][:limit]
+
+    def ancestors(self, id: int) -> List[CategoryResponse]:
+        node = self._nodes.get(id)
+        if node is None:
+            return []
+        return [self._nodes[ancestor_id].category for ancestor_id in node.ancestor_ids]
+
+    def descendant_ids(self, id: int) -> FrozenSet[int]:
+        node = self._nodes.get(id)
+        return node.descendant_ids if node else frozenset()
+
+
+class CategoryTreeManager:
+    """Держит актуальный снимок дерева категорий в памяти воркера
+
+    Снимок перестраивается одним запросом и подменяется целиком. Запись
+    в категории (или товары - из-за products_count) помечает снимок
+    устаревшим и публикует новую версию в Redis, чтобы остальные воркеры
+    тоже перестроили свой. Без Redis снимок живёт не дольше max_age секунд.
+    """
+
+    def __init__(
+        self,
+        category_repo: Optional[CategoryRepository] = None,
+        product_repo: Optional[ProductRepository] = None,
+        max_age: float = 300,
+    ):
+        self.category_repo = category_repo or CategoryRepository()
+        self.product_repo = product_repo or ProductRepository()
+        self.max_age = max_age
+        self.instance_id = f"{os.getpid()}:{id(self)}"
+        self._tree: Optional[CategoryTree] = None
+        self._stale = True
+        self._version = 0
+        self._lock = asyncio.Lock()
+        self._listener: Optional[asyncio.Task] = None
+
+    def _is_fresh(self) -> bool:
+        return (
+            self._tree is not None
+            and not self._stale
+            and time.monotonic() - self._tree.built_at < self.max_age
+        )
+
+    async def get(self, db: AsyncSession) -> CategoryTree:
+        if self._is_fresh():
+            return self._tree
+        async with self._lock:
+            if not self._is_fresh():
+                await self.rebuild(db)
+        return self._tree
+
+    async def rebuild(self, db: AsyncSession) -> CategoryTree:
+        self._stale = False
+        try:
+            categories = await self.category_repo.get_all(db)
+            counts = await self.product_repo.count_by_category(db)
+        except Exception:
+            self._stale = True
+            raise
+        self._version += 1
+        self._tree = CategoryTree(
+            [
+                CategoryResponse.model_validate(category).model_copy(
+                    update={"products_count": counts.get(category.id, 0)}
+                )
+                for category in categories
+            ],
+            version=self._version,
+        )
+        return self._tree
+
+    async def invalidate(self) -> None:
+        """Пометить снимок устаревшим здесь и во всех остальных воркерах"""
+        self._stale = True
+        if not redis_manager.connected:
+            return
+        try:
+            await redis_manager.client.publish(CATEGORY_TREE_CHANNEL, self.instance_id)
+        except Exception:
+            logger.warning("Could not publish category tree version", exc_info=True)
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                pubsub = redis_manager.client.pubsub()
+                await pubsub.subscribe(CATEGORY_TREE_CHANNEL)
+                async for message in pubsub.listen():
+                    if message["type"] != "message":
+                        continue
+                    if message["data"].decode() != self.instance_id:
+                        self._stale = True
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.warning("Category tree listener failed, reconnecting", exc_info=True)
+                self._stale = True
+                await asyncio.sleep(1)
+
+    def start(self) -> None:
+        if redis_manager.connected and self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+
+
+category_tree = CategoryTreeManager(max_age=settings.CATEGORY_TREE_MAX_AGE)
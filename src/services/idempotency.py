@@ -0,0 +1,197 @@
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.config import settings
+from src.connectors.redis import redis_manager
+from src.exceptions import IdempotencyKeyInProgressException, IdempotencyKeyMismatchException
+from src.repositories.idempotency import COMPLETED, IdempotencyKeyRepository
+
+logger = logging.getLogger(__name__)
+
+# Обработчик вызывает его с результатом до своего commit
+CompleteCallback = Callable[[BaseModel], Awaitable[None]]
+
+REDIS_PREFIX = "idempotency"
+POLL_INTERVAL = 0.1
+PURGE_INTERVAL = 3600
+
+
+@dataclass(frozen=True)
+class IdempotentResponse:
+    status_code: int
+    body: str
+    replayed: bool = False
+
+
+class IdempotencyService:
+    """Выполняет запрос с Idempotency-Key не больше одного раза
+
+    Ключ занимается в Postgres до выполнения обработчика. Повтор с тем же
+    ключом получает сохранённый ответ; пока первый запрос выполняется,
+    повтор ждёт его результата (в пределах воркера - по событию, между
+    воркерами - опросом таблицы). Обработчик получает callback и вызывает
+    его с результатом внутри своей транзакции: ключ помечается выполненным
+    тем же commit, что и результат, поэтому после сбоя повтор не выполнит
+    запрос второй раз. Если ключ перезанят после lock_timeout, результат
+    медленного запроса откатывается, а не перезаписывает чужой. Готовые ответы дублируются в Redis, если он есть,
+    чтобы повторы не ходили в БД. При ошибке обработчика ключ освобождается
+    и запрос можно повторить.
+    """
+
+    def __init__(
+        self,
+        repository: Optional[IdempotencyKeyRepository] = None,
+        ttl: int = 86400,
+        lock_timeout: int = 60,
+        wait_timeout: float = 10,
+    ):
+        self.repository = repository or IdempotencyKeyRepository()
+        self.ttl = ttl
+        self.lock_timeout = lock_timeout
+        self.wait_timeout = wait_timeout
+        self._events: Dict[Tuple[str, str], asyncio.Event] = {}
+        self._purged_at = time.monotonic()
+
+    @staticmethod
+    def request_hash(payload: BaseModel) -> str:
+        return hashlib.sha256(
+            json.dumps(payload.model_dump(mode="json"), sort_keys=True).encode()
+        ).hexdigest()
+
+    async def execute(
+        self,
+        db: AsyncSession,
+        scope: str,
+        key: str,
+        payload: BaseModel,
+        handler: Callable[[CompleteCallback], Awaitable[BaseModel]],
+        status_code: int = 200,
+    ) -> IdempotentResponse:
+        request_hash = self.request_hash(payload)
+        cached = await self._get_cached(scope, key, request_hash)
+        if cached is not None:
+            return cached
+
+        deadline = time.monotonic() + self.wait_timeout
+        while True:
+            locked_at = await self.repository.claim(
+                db, scope, key, request_hash, self.ttl, self.lock_timeout
+            )
+            if locked_at is not None:
+                return await self._run(
+                    db, scope, key, locked_at, request_hash, handler, status_code
+                )
+
+            row = await self.repository.get(db, scope, key)
+            if row is None:
+                # Первый запрос упал и освободил ключ - пробуем занять снова
+                continue
+            if row.request_hash != request_hash:
+                raise IdempotencyKeyMismatchException()
+            if row.status == COMPLETED:
+                return IdempotentResponse(row.response_status, row.response_body, replayed=True)
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise IdempotencyKeyInProgressException()
+            # Чтение ключа открыло транзакцию: без rollback соединение простаивало бы
+            # "idle in transaction" всё время ожидания
+            await db.rollback()
+            await self._wait(scope, key, min(POLL_INTERVAL, remaining))
+
+    async def _run(
+        self,
+        db: AsyncSession,
+        scope: str,
+        key: str,
+        locked_at: datetime,
+        request_hash: str,
+        handler: Callable[[CompleteCallback], Awaitable[BaseModel]],
+        status_code: int,
+    ) -> IdempotentResponse:
+        event = self._events.setdefault((scope, key), asyncio.Event())
+        body: Optional[str] = None
+
+        async def complete(result: BaseModel) -> None:
+            nonlocal body
+            body = result.model_dump_json()
+            await self.repository.complete(db, scope, key, locked_at, status_code, body)
+
+        try:
+            try:
+                await handler(complete)
+                if body is None:
+                    raise RuntimeError("Idempotent handler did not complete the key")
+            except BaseException:
+                # Удаляет только свой незавершённый ключ: если commit обработчика
+                # прошёл, ответ уже сохранён и будет отдан повтору
+                await self.repository.release(db, scope, key, locked_at)
+                raise
+            await self._set_cached(scope, key, request_hash, status_code, body)
+        finally:
+            event.set()
+            self._events.pop((scope, key), None)
+        await self._maybe_purge(db)
+        return IdempotentResponse(status_code, body)
+
+    async def _wait(self, scope: str, key: str, timeout: float) -> None:
+        event = self._events.get((scope, key))
+        if event is None:
+            await asyncio.sleep(timeout)
+            return
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _maybe_purge(self, db: AsyncSession) -> None:
+        if time.monotonic() - self._purged_at < PURGE_INTERVAL:
+            return
+        self._purged_at = time.monotonic()
+        try:
+            await self.repository.purge_expired(db)
+        except Exception:
+            logger.warning("Could not purge expired idempotency keys", exc_info=True)
+
+    async def _get_cached(
+        self, scope: str, key: str, request_hash: str
+    ) -> Optional[IdempotentResponse]:
+        if not redis_manager.connected:
+            return None
+        try:
+            raw = await redis_manager.client.get(f"{REDIS_PREFIX}:{scope}:{key}")
+        except Exception:
+            logger.warning("Could not read idempotency key from Redis", exc_info=True)
+            return None
+        if raw is None:
+            return None
+        stored = json.loads(raw)
+        if stored["request_hash"] != request_hash:
+            raise IdempotencyKeyMismatchException()
+        return IdempotentResponse(stored["status_code"], stored["body"], replayed=True)
+
+    async def _set_cached(
+        self, scope: str, key: str, request_hash: str, status_code: int, body: str
+    ) -> None:
+        if not redis_manager.connected:
+            return
+        value = json.dumps({"request_hash": request_hash, "status_code": status_code, "body": body})
+        try:
+            await redis_manager.client.set(f"{REDIS_PREFIX}:{scope}:{key}", value, ex=self.ttl)
+        except Exception:
+            logger.warning("Could not store idempotency key in Redis", exc_info=True)
+
+
+idempotency_service = IdempotencyService(
+    ttl=settings.IDEMPOTENCY_KEY_TTL,
+    lock_timeout=settings.IDEMPOTENCY_LOCK_TIMEOUT,
+    wait_timeout=settings.IDEMPOTENCY_WAIT_TIMEOUT,
+)
@@ -1,20 +1,54 @@
-from typing import List, Optional
+from datetime import date
+from typing import AsyncIterator, Awaitable, Callable, Dict, FrozenSet, List, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.repositories.order import OrderRepository, OrderItemRepository
+from src.repositories.outbox import OutboxRepository
 from src.repositories.product import ProductRepository
 from src.schemas.order import (
-    OrderCreate, OrderResponse, OrderWithItems, OrderFull,
-    OrderStats
+    OrderCreate, OrderUpdate, OrderResponse, OrderWithItems, OrderFull,
+    OrderItemResponse, OrderStats, OrderDailyStats,
+    OrderBulkStatusResult, OrderStatusTransition, OrderSummary
 )
 from src.services.base import BaseService
+from src.services.order_number import OrderNumberAllocator, order_number_allocator
+from src.services.outbox import ORDER_CREATED, ORDER_PAYMENT_STATUS_CHANGED, ORDER_STATUS_CHANGED
+from src.utils.pagination import Cursor
+
+ORDER_STATUSES = ["pending", "processing", "shipped", "delivered", "cancelled"]
+PAYMENT_STATUSES = ["pending", "paid", "failed", "refunded"]
+
+# Допустимые переходы статуса заказа; отменить можно только до отправки
+ORDER_TRANSITIONS: Dict[str, FrozenSet[str]] = {
+    "pending": frozenset({"processing", "cancelled"}),
+    "processing": frozenset({"shipped", "cancelled"}),
+    "shipped": frozenset({"delivered"}),
+    "delivered": frozenset(),
+    "cancelled": frozenset(),
+}
+
+
+def allowed_sources(status: str) -> List[str]:
+    """Статусы, из которых можно перейти в status"""
+    return [source for source, targets in ORDER_TRANSITIONS.items() if status in targets]
 
 
 class OrderService(BaseService):
-    def __init__(self):
-        super().__init__(OrderRepository())
-        self.item_repo = OrderItemRepository()
-        self.product_repo = ProductRepository()
+    response_schema = OrderResponse
+
+    def __init__(
+        self,
+        repository: Optional[OrderRepository] = None,
+        item_repo: Optional[OrderItemRepository] = None,
+        product_repo: Optional[ProductRepository] = None,
+        order_numbers: Optional[OrderNumberAllocator] = None,
+        outbox_repo: Optional[OutboxRepository] = None,
+    ):
+        super().__init__(repository or OrderRepository())
+        self.item_repo = item_repo or OrderItemRepository()
+        self.product_repo = product_repo or ProductRepository()
+        self.order_numbers = order_numbers or order_number_allocator
+        self.outbox_repo = outbox_repo or OutboxRepository()
 
     async def get_with_items(self, db: AsyncSession, id: int) -> Optional[OrderWithItems]:
         order = await self.repository.get_with_items(db, id)
@@ -33,90 +67,197 @@ class OrderService(BaseService):
         db: AsyncSession,
         email: str,
         skip: int = 0,
-        limit: int = 100
-    ) -> List[OrderResponse]:
-        orders = await self.repository.get_by_customer_email(db, email, skip, limit)
-        return [OrderResponse.model_validate(order) for order in orders]
+        limit: int = 100,
+        cursor: Optional[Cursor] = None,
+        case_insensitive: bool = False
+    ) -> List[OrderSummary]:
+        orders = await self.repository.get_by_customer_email(
+            db, email, skip, limit, cursor, case_insensitive
+        )
+        return [OrderSummary.model_validate(order) for order in orders]
 
     async def get_by_status(
         self,
         db: AsyncSession,
         status: str,
         skip: int = 0,
-        limit: int = 100
+        limit: int = 100,
+        cursor: Optional[Cursor] = None
     ) -> List[OrderResponse]:
-        valid_statuses = ["pending", "processing",
-                          "shipped", "delivered", "cancelled"]
-        if status not in valid_statuses:
+        if status not in ORDER_STATUSES:
             raise ValueError(
-                f"Invalid status. Must be one of: {valid_statuses}")
+                f"Invalid status. Must be one of: {ORDER_STATUSES}")
 
-        orders = await self.repository.get_by_status(db, status, skip, limit)
+        orders = await self.repository.get_by_status(db, status, skip, limit, cursor)
         return [OrderResponse.model_validate(order) for order in orders]
 
-    async def create(self, db: AsyncSession, obj_in: OrderCreate) -> OrderResponse:
-        subtotal = 0
-        order_items_data = []
+    async def create(
+        self,
+        db: AsyncSession,
+        obj_in: OrderCreate,
+        before_commit: Optional[Callable[[OrderWithItems], Awaitable[None]]] = None,
+    ) -> OrderWithItems:
+        """Оформить заказ одной транзакцией
 
-        # Проверка наличия товаров и подсчет стоимости
+        Товары читаются и блокируются одним запросом, позиции вставляются
+        пакетно, остатки списываются одним условным UPDATE, commit - один
+        на весь заказ. before_commit получает готовый заказ и может дописать
+        свои изменения в ту же транзакцию.
+        """
+        quantities: Dict[int, int] = {}
         for item in obj_in.items:
-            product = await self.product_repo.get(db, item.product_id)
-            if not product:
-                raise ValueError(
-                    f"Product with id {item.product_id} not found")
-            if not product.in_stock:
-                raise ValueError(f"Product {product.name} is out of stock")
-            if item.quantity > product.stock_quantity:
+            quantities[item.product_id] = quantities.get(item.product_id, 0) + item.quantity
+
+        try:
+            # Блокировка строк товаров в порядке id: параллельные заказы
+            # с пересекающимися корзинами ждут друг друга, а не дедлочат
+            products = {
+                product.id: product
+                for product in await self.product_repo.get_many(
+                    db, quantities.keys(), for_update=True
+                )
+            }
+
+            # Проверка наличия товаров и подсчет стоимости
+            for product_id, quantity in quantities.items():
+                product = products.get(product_id)
+                if not product:
+                    raise ValueError(f"Product with id {product_id} not found")
+                if not product.in_stock:
+                    raise ValueError(f"Product {product.name} is out of stock")
+                if quantity > product.stock_quantity:
+                    raise ValueError(
+                        f"Not enough stock for {product.name}. Available: {product.stock_quantity}"
+                    )
+
+            subtotal = sum(
+                products[item.product_id].price * item.quantity for item in obj_in.items
+            )
+
+            order_number = await self.order_numbers.next(db)
+            shipping_cost = 0
+            total_amount = subtotal + shipping_cost
+
+            order_data = obj_in.model_dump(exclude={"items"})
+            order_data.update({
+                "order_number": order_number,
+                "subtotal": subtotal,
+                "shipping_cost": shipping_cost,
+                "total_amount": total_amount,
+                "status": "pending",
+                "payment_status": "pending"
+            })
+            order = await self.repository.add(db, order_data)
+
+            # Создание позиций заказа и обновление складских остатков
+            await self.item_repo.add_many(db, [
+                {
+                    **item.model_dump(),
+                    "order_id": order.id,
+                    "product_name": products[item.product_id].name,
+                    "product_price": products[item.product_id].price,
+                }
+                for item in obj_in.items
+            ])
+            reserved = await self.product_repo.reserve_stock(db, quantities)
+            for product_id in quantities.keys() - reserved:
+                product = products[product_id]
                 raise ValueError(
                     f"Not enough stock for {product.name}. Available: {product.stock_quantity}"
                 )
+            # Письмо, сброс кэша товаров и проверку остатков сделает релей outbox
+            await self.outbox_repo.add_many(db, [(ORDER_CREATED, {
+                "order_id": order.id,
+                "order_number": order.order_number,
+                "customer_email": order.customer_email,
+                "customer_name": order.customer_name,
+                "total_amount": order.total_amount,
+                "product_ids": list(quantities),
+            })])
+            result = await self.get_with_items(db, order.id)
+            if before_commit is not None:
+                await before_commit(result)
+            await db.commit()
+        except BaseException:
+            await db.rollback()
+            raise
 
-            item_data = item.model_dump()
-            item_data.update({
-                "product_name": product.name,
-                "product_price": product.price
-            })
+        return result
 
-            order_items_data.append(item_data)
-            subtotal += product.price * item.quantity
-
-        from datetime import datetime
-        order_number = f"ORD-{datetime.utcnow().strftime('%Y%m%d-%H%M%S')}"
-        shipping_cost = 0
-        total_amount = subtotal + shipping_cost
-
-        order_data = obj_in.model_dump(exclude={"items"})
-        order_data.update({
-            "order_number": order_number,
-            "subtotal": subtotal,
-            "shipping_cost": shipping_cost,
-            "total_amount": total_amount,
-            "status": "pending",
-            "payment_status": "pending"
-        })
-
-        order = await self.repository.create(db, order_data)
-
-        # Создание позиций заказа и обновление складских остатков
-        for item_data in order_items_data:
-            item_data["order_id"] = order.id
-            await self.item_repo.create(db, item_data)
-            product = await self.product_repo.get(db, item_data["product_id"])
-            await self.product_repo.update_stock(
-                db,
-                item_data["product_id"],
-                product.stock_quantity - item_data["quantity"]
-            )
+    async def update(
+        self, db: AsyncSession, id: int, obj_in: OrderUpdate
+    ) -> Optional[OrderResponse]:
+        """Правка заказа одной транзакцией
 
-        return await self.get_with_items(db, order.id)
+        Смена статуса идёт только по ORDER_TRANSITIONS, смена статуса оплаты -
+        как в update_payment_status; обе пишут событие в outbox той же транзакцией.
+        """
+        db_obj = await self.repository.get(db, id)
+        if not db_obj:
+            return None
+        update_data = obj_in.model_dump(exclude_unset=True)
+        status = update_data.pop("status", None)
+        payment_status = update_data.pop("payment_status", None)
+        try:
+            if status is not None:
+                result = (await self._transition_status(db, [id], status)).results[0]
+                if result.result == "invalid_transition":
+                    raise ValueError(
+                        f"Cannot change order status from '{result.status}' to '{status}'")
+            if payment_status is not None and payment_status != db_obj.payment_status:
+                await self._set_payment_status(
+                    db, id, payment_status, update_data.pop("payment_id", None))
+            updated_obj = await self.repository.update(db, db_obj, update_data)
+        except BaseException:
+            await db.rollback()
+            raise
+        return OrderResponse.model_validate(updated_obj)
 
     async def update_status(self, db: AsyncSession, order_id: int, status: str) -> bool:
-        valid_statuses = ["pending", "processing",
-                          "shipped", "delivered", "cancelled"]
-        if status not in valid_statuses:
+        result = (await self.transition_status(db, [order_id], status)).results[0]
+        if result.result == "invalid_transition":
             raise ValueError(
-                f"Invalid status. Must be one of: {valid_statuses}")
-        return await self.repository.update_status(db, order_id, status)
+                f"Cannot change order status from '{result.status}' to '{status}'")
+        return result.result != "not_found"
+
+    async def transition_status(
+        self, db: AsyncSession, order_ids: List[int], status: str
+    ) -> OrderBulkStatusResult:
+        """Перевести заказы в status одним UPDATE с проверкой по ORDER_TRANSITIONS"""
+        result = await self._transition_status(db, order_ids, status)
+        await db.commit()
+        return result
+
+    async def _transition_status(
+        self, db: AsyncSession, order_ids: List[int], status: str
+    ) -> OrderBulkStatusResult:
+        if status not in ORDER_STATUSES:
+            raise ValueError(
+                f"Invalid status. Must be one of: {ORDER_STATUSES}")
+        order_ids = list(dict.fromkeys(order_ids))
+        updated = await self.repository.transition_status(
+            db, order_ids, status, allowed_sources(status)
+        )
+        current = await self.repository.get_statuses(
+            db, [id for id in order_ids if id not in updated]
+        )
+        await self.outbox_repo.add_many(db, [
+            (ORDER_STATUS_CHANGED, {"order_id": id, "status": status})
+            for id in order_ids if id in updated
+        ])
+
+        results = []
+        for id in order_ids:
+            if id in updated:
+                results.append(OrderStatusTransition(order_id=id, result="updated", status=status))
+            elif id not in current:
+                results.append(OrderStatusTransition(order_id=id, result="not_found"))
+            elif current[id] == status:
+                results.append(OrderStatusTransition(order_id=id, result="unchanged", status=status))
+            else:
+                results.append(OrderStatusTransition(
+                    order_id=id, result="invalid_transition", status=current[id]))
+        return OrderBulkStatusResult(updated=len(updated), results=results)
 
     async def update_payment_status(
         self,
@@ -125,17 +266,76 @@ class OrderService(BaseService):
         payment_status: str,
         payment_id: Optional[str] = None
     ) -> bool:
-        valid_statuses = ["pending", "paid", "failed", "refunded"]
-        if payment_status not in valid_statuses:
+        updated = await self._set_payment_status(db, order_id, payment_status, payment_id)
+        await db.commit()
+        return updated
+
+    async def _set_payment_status(
+        self,
+        db: AsyncSession,
+        order_id: int,
+        payment_status: str,
+        payment_id: Optional[str] = None
+    ) -> bool:
+        if payment_status not in PAYMENT_STATUSES:
             raise ValueError(
-                f"Invalid payment status. Must be one of: {valid_statuses}")
-        return await self.repository.update_payment_status(db, order_id, payment_status, payment_id)
+                f"Invalid payment status. Must be one of: {PAYMENT_STATUSES}")
+        updated = await self.repository.update_payment_status(
+            db, order_id, payment_status, payment_id
+        )
+        if updated:
+            await self.outbox_repo.add_many(db, [(ORDER_PAYMENT_STATUS_CHANGED, {
+                "order_id": order_id, "payment_status": payment_status,
+            })])
+        return updated
 
-    async def get_order_stats(self, db: AsyncSession) -> OrderStats:
-        stats = await self.repository.get_order_stats(db)
+    async def export(
+        self,
+        db: AsyncSession,
+        status: Optional[str] = None,
+        payment_status: Optional[str] = None,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+        include_items: bool = False,
+    ) -> AsyncIterator[OrderResponse]:
+        """Заказы для выгрузки, по одному, без загрузки всей выборки в память"""
+        if status is not None and status not in ORDER_STATUSES:
+            raise ValueError(
+                f"Invalid status. Must be one of: {ORDER_STATUSES}")
+        if payment_status is not None and payment_status not in PAYMENT_STATUSES:
+            raise ValueError(
+                f"Invalid payment status. Must be one of: {PAYMENT_STATUSES}")
+        if date_from and date_to and date_from > date_to:
+            raise ValueError("date_from must not be later than date_to")
+
+        schema = OrderWithItems if include_items else OrderResponse
+        orders = await self.repository.stream_for_export(
+            db, status, payment_status, date_from, date_to, include_items
+        )
+        return (schema.model_validate(order) async for order in orders)
+
+    async def get_order_stats(
+        self,
+        db: AsyncSession,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None
+    ) -> OrderStats:
+        if date_from and date_to and date_from > date_to:
+            raise ValueError("date_from must not be later than date_to")
+        stats = await self.repository.get_order_stats(db, date_from, date_to)
         return OrderStats(**stats)
 
+    async def get_daily_stats(
+        self, db: AsyncSession, date_from: date, date_to: date
+    ) -> List[OrderDailyStats]:
+        if date_from > date_to:
+            raise ValueError("date_from must not be later than date_to")
+        stats = await self.repository.get_daily_stats(db, date_from, date_to)
+        return [OrderDailyStats(**day) for day in stats]
+
 
 class OrderItemService(BaseService):
-    def __init__(self):
-        super().__init__(OrderItemRepository())
+    response_schema = OrderItemResponse
+
+    def __init__(self, repository: Optional[OrderItemRepository] = None):
+        super().__init__(repository or OrderItemRepository())
@@ -0,0 +1,44 @@
+import asyncio
+from collections import deque
+from datetime import datetime, timezone
+from typing import Deque
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.config import settings
+from src.models.order import order_number_seq
+
+
+class OrderNumberAllocator:
+    """Выдаёт номера заказов вида ORD-YYYYMMDD-00000042
+
+    Уникальная часть берётся из последовательности order_number_seq
+    блоками по block_size значений за один запрос, поэтому обычный заказ
+    не делает лишнего обращения к БД. Значения последовательности не
+    повторяются между воркерами, так что номера уникальны при любой
+    нагрузке; неиспользованный остаток блока при рестарте просто теряется.
+    """
+
+    def __init__(self, block_size: int = 100):
+        self.block_size = block_size
+        self._values: Deque[int] = deque()
+        self._lock = asyncio.Lock()
+
+    async def _fetch_block(self, db: AsyncSession) -> None:
+        result = await db.execute(
+            select(order_number_seq.next_value()).select_from(
+                func.generate_series(1, self.block_size)
+            )
+        )
+        self._values.extend(result.scalars().all())
+
+    async def next(self, db: AsyncSession) -> str:
+        async with self._lock:
+            if not self._values:
+                await self._fetch_block(db)
+            value = self._values.popleft()
+        return f"ORD-{datetime.now(timezone.utc):%Y%m%d}-{value:08d}"
+
+
+order_number_allocator = OrderNumberAllocator(block_size=settings.ORDER_NUMBER_BLOCK_SIZE)
@@ -0,0 +1,57 @@
+import logging
+from typing import Any, Callable, Dict, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.repositories.outbox import OutboxRepository
+
+logger = logging.getLogger(__name__)
+
+ORDER_CREATED = "order.created"
+ORDER_STATUS_CHANGED = "order.status_changed"
+ORDER_PAYMENT_STATUS_CHANGED = "order.payment_status_changed"
+
+Dispatch = Callable[[str, Dict[str, Any]], None]
+
+
+class OutboxRelay:
+    """Разбирает outbox пачками и передаёт события в dispatch
+
+    dispatch обычно ставит задачи Celery; событие помечается обработанным
+    в той же транзакции, в которой было захвачено. Упавшее событие
+    повторяется при следующем проходе, но не больше max_attempts раз.
+    """
+
+    def __init__(
+        self,
+        dispatch: Dispatch,
+        repository: Optional[OutboxRepository] = None,
+        batch_size: int = 100,
+        max_attempts: int = 5,
+    ):
+        self.dispatch = dispatch
+        self.repository = repository or OutboxRepository()
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+
+    async def drain(self, db: AsyncSession) -> int:
+        """Обработать все накопившиеся события, вернуть число успешно переданных"""
+        processed = 0
+        while True:
+            events = await self.repository.claim_batch(db, self.batch_size, self.max_attempts)
+            done, failed = [], 0
+            for event in events:
+                try:
+                    self.dispatch(event.event_type, event.payload)
+                except Exception as exc:
+                    logger.exception("Outbox event %s (%s) failed", event.id, event.event_type)
+                    await self.repository.mark_failed(db, event.id, repr(exc))
+                    failed += 1
+                else:
+                    done.append(event.id)
+            await self.repository.mark_processed(db, done)
+            await db.commit()
+            processed += len(done)
+            # Неполная пачка - очередь пуста; при ошибках не крутим те же события по кругу
+            if len(events) < self.batch_size or failed:
+                return processed
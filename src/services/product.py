@@ -1,21 +1,44 @@
-from typing import List, Optional
+from typing import AsyncIterator, List, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.repositories.product import ProductRepository, ProductImageRepository
 from src.repositories.category import CategoryRepository
+from src.config import settings
 from src.schemas.product import (
-    ProductCreate, ProductResponse,
+    ProductCreate, ProductUpdate, ProductResponse,
     ProductWithImages, ProductFull,
     ProductImageCreate, ProductImageResponse
 )
 from src.services.base import BaseService
+from src.services.category_tree import CategoryTreeManager, category_tree
+from src.utils.conditional import ResourceVersion, make_etag
+from src.utils.cache import CATEGORIES_TAG, PRODUCTS_TAG, cached, invalidate_tags
+from src.utils.images import ImageProcessor, image_processor
+from src.utils.pagination import Cursor
 
 
 class ProductService(BaseService):
-    def __init__(self):
-        super().__init__(ProductRepository())
-        self.category_repo = CategoryRepository()
-        self.image_repo = ProductImageRepository()
+    response_schema = ProductResponse
+
+    def __init__(
+        self,
+        repository: Optional[ProductRepository] = None,
+        category_repo: Optional[CategoryRepository] = None,
+        image_repo: Optional[ProductImageRepository] = None,
+        tree: Optional[CategoryTreeManager] = None,
+        images: Optional[ImageProcessor] = None,
+    ):
+        super().__init__(repository or ProductRepository())
+        self.category_repo = category_repo or CategoryRepository()
+        self.image_repo = image_repo or ProductImageRepository()
+        self.tree = tree or category_tree
+        self.images = images or image_processor
+
+    @cached("products", settings.CACHE_TTL_PRODUCT_LIST, tags=(PRODUCTS_TAG,))
+    async def get_multi(
+        self, db: AsyncSession, skip: int = 0, limit: int = 100, cursor: Optional[Cursor] = None
+    ) -> List[ProductResponse]:
+        return await super().get_multi(db, skip, limit, cursor)
 
     async def get_with_images(self, db: AsyncSession, id: int) -> Optional[ProductWithImages]:
         product = await self.repository.get_with_images(db, id)
@@ -23,40 +46,120 @@ class ProductService(BaseService):
             return ProductWithImages.model_validate(product)
         return None
 
+    @cached("products", settings.CACHE_TTL_PRODUCT, tags=(PRODUCTS_TAG, CATEGORIES_TAG))
     async def get_with_category_and_images(self, db: AsyncSession, id: int) -> Optional[ProductFull]:
         product = await self.repository.get_with_category_and_images(db, id)
         if product:
             return ProductFull.model_validate(product)
         return None
 
-    async def get_by_category(self, db: AsyncSession, category_id: int, skip=0, limit=100) -> List[ProductResponse]:
-        category = await self.category_repo.get(db, category_id)
-        if not category:
+    @staticmethod
+    def version_of(*products: ProductResponse) -> ResourceVersion:
+        """ETag по отданным данным: ответы get_multi и get_with_category_and_images
+        берутся из кэша Redis, и ETag из БД мог бы не совпасть с закэшированным телом"""
+        return ResourceVersion(make_etag(*((p.id, p.updated_at or p.created_at) for p in products)))
+
+    @staticmethod
+    def full_version_of(product: ProductFull) -> ResourceVersion:
+        return ResourceVersion(make_etag(
+            product.id,
+            product.updated_at or product.created_at,
+            product.category.id,
+            product.category.updated_at or product.category.created_at,
+            *((i.id, i.updated_at or i.created_at) for i in product.images),
+        ))
+
+    async def get_by_category(
+        self,
+        db: AsyncSession,
+        category_id: int,
+        skip=0,
+        limit=100,
+        cursor: Optional[Cursor] = None,
+        include_subcategories: bool = False,
+    ) -> List[ProductResponse]:
+        tree = await self.tree.get(db)
+        if not tree.get(category_id):
             raise ValueError(f"Category with id {category_id} not found")
-        products = await self.repository.get_by_category(db, category_id, skip, limit)
+        if include_subcategories:
+            products = await self.repository.get_by_category_subtree(
+                db, category_id, skip, limit, cursor
+            )
+        else:
+            products = await self.repository.get_by_category(db, category_id, skip, limit, cursor)
         return [ProductResponse.model_validate(prod) for prod in products]
 
+    async def get_by_category_version(
+        self,
+        db: AsyncSession,
+        category_id: int,
+        skip=0,
+        limit=100,
+        cursor: Optional[Cursor] = None,
+        include_subcategories: bool = False,
+    ) -> ResourceVersion:
+        tree = await self.tree.get(db)
+        if not tree.get(category_id):
+            raise ValueError(f"Category with id {category_id} not found")
+        if include_subcategories:
+            fingerprint = await self.repository.get_by_category_subtree_fingerprint(
+                db, category_id, skip, limit, cursor
+            )
+        else:
+            fingerprint = await self.repository.get_by_category_fingerprint(
+                db, category_id, skip, limit, cursor
+            )
+        return ResourceVersion(make_etag(
+            "products_by_category", category_id, include_subcategories, skip, limit, cursor,
+            *fingerprint,
+        ))
+
     async def search_products(self, db: AsyncSession, query: str, skip=0, limit=100) -> List[ProductResponse]:
         if not query or len(query.strip()) < 2:
             raise ValueError("Search query must be at least 2 characters long")
         products = await self.repository.search_products(db, query.strip(), skip, limit)
         return [ProductResponse.model_validate(prod) for prod in products]
 
-    async def get_available_products(self, db: AsyncSession, skip=0, limit=100) -> List[ProductResponse]:
-        products = await self.repository.get_available_products(db, skip, limit)
+    async def get_available_products(
+        self, db: AsyncSession, skip=0, limit=100, cursor: Optional[Cursor] = None
+    ) -> List[ProductResponse]:
+        products = await self.repository.get_available_products(db, skip, limit, cursor)
         return [ProductResponse.model_validate(prod) for prod in products]
 
+    async def get_available_version(
+        self, db: AsyncSession, skip=0, limit=100, cursor: Optional[Cursor] = None
+    ) -> ResourceVersion:
+        fingerprint = await self.repository.get_available_fingerprint(db, skip, limit, cursor)
+        return ResourceVersion(make_etag("available_products", skip, limit, cursor, *fingerprint))
+
     async def create(self, db: AsyncSession, obj_in: ProductCreate) -> ProductResponse:
         category = await self.category_repo.get(db, obj_in.category_id)
         if not category:
             raise ValueError(
                 f"Category with id {obj_in.category_id} not found")
-        return await super().create(db, obj_in)
+        product = await super().create(db, obj_in)
+        await self.tree.invalidate()
+        await invalidate_tags(PRODUCTS_TAG)
+        return product
+
+    async def update(self, db: AsyncSession, id: int, obj_in: ProductUpdate) -> Optional[ProductResponse]:
+        product = await super().update(db, id, obj_in)
+        await self.tree.invalidate()
+        await invalidate_tags(PRODUCTS_TAG)
+        return product
+
+    async def delete(self, db: AsyncSession, id: int) -> bool:
+        success = await super().delete(db, id)
+        await self.tree.invalidate()
+        await invalidate_tags(PRODUCTS_TAG)
+        return success
 
     async def update_stock(self, db: AsyncSession, product_id: int, new_quantity: int) -> bool:
         if new_quantity < 0:
             raise ValueError("Stock quantity cannot be negative")
-        return await self.repository.update_stock(db, product_id, new_quantity)
+        success = await self.repository.update_stock(db, product_id, new_quantity)
+        await invalidate_tags(PRODUCTS_TAG)
+        return success
 
     async def add_image(self, db: AsyncSession, image_data: ProductImageCreate) -> ProductImageResponse:
         product = await self.repository.get(db, image_data.product_id)
@@ -64,19 +167,58 @@ class ProductService(BaseService):
             raise ValueError(
                 f"Product with id {image_data.product_id} not found")
         db_image = await self.image_repo.create(db, image_data.model_dump())
+        await invalidate_tags(PRODUCTS_TAG)
+        return ProductImageResponse.model_validate(db_image)
+
+    async def upload_image(
+        self,
+        db: AsyncSession,
+        product_id: int,
+        chunks: AsyncIterator[bytes],
+        alt_text: Optional[str] = None,
+        is_main: bool = False,
+        sort_order: int = 0,
+    ) -> ProductImageResponse:
+        """Сохранить загруженный файл, построить варианты и привязать к товару"""
+        if not await self.repository.get(db, product_id):
+            raise ValueError(f"Product with id {product_id} not found")
+        # Завершаем транзакцию: соединение возвращается в пул, пока файл загружается
+        # и обрабатывается, а create() возьмёт новое в той же сессии
+        await db.commit()
+        processed = await self.images.ingest(chunks)
+        db_image = await self.image_repo.create(db, {
+            "product_id": product_id,
+            "image_url": processed.original_url,
+            "alt_text": alt_text,
+            "is_main": is_main,
+            "sort_order": sort_order,
+            "content_hash": processed.content_hash,
+            "width": processed.width,
+            "height": processed.height,
+            "variants": processed.variants,
+        })
+        await invalidate_tags(PRODUCTS_TAG)
         return ProductImageResponse.model_validate(db_image)
 
     async def get_product_images(self, db: AsyncSession, product_id: int) -> List[ProductImageResponse]:
         images = await self.image_repo.get_by_product(db, product_id)
         return [ProductImageResponse.model_validate(img) for img in images]
 
+    async def get_product_images_version(self, db: AsyncSession, product_id: int) -> ResourceVersion:
+        fingerprint = await self.image_repo.get_by_product_fingerprint(db, product_id)
+        return ResourceVersion(make_etag("product_images", product_id, *fingerprint))
+
     async def set_main_image(self, db: AsyncSession, image_id: int) -> bool:
-        return await self.image_repo.set_main_image(db, image_id)
+        success = await self.image_repo.set_main_image(db, image_id)
+        await invalidate_tags(PRODUCTS_TAG)
+        return success
 
 
 class ProductImageService(BaseService):
-    def __init__(self):
-        super().__init__(ProductImageRepository())
+    response_schema = ProductImageResponse
+
+    def __init__(self, repository: Optional[ProductImageRepository] = None):
+        super().__init__(repository or ProductImageRepository())
 
     async def get_by_product(
         self,
@@ -0,0 +1,24 @@
+from celery import Celery
+
+from src.config import settings
+
+celery_app = Celery(
+    "handmade",
+    broker=settings.CELERY_BROKER_URL or settings.REDIS_URL,
+    include=["src.tasks.task"],
+)
+celery_app.conf.update(
+    task_serializer="json",
+    accept_content=["json"],
+    task_acks_late=True,
+    beat_schedule={
+        "relay-outbox": {
+            "task": "outbox.relay",
+            "schedule": settings.OUTBOX_RELAY_INTERVAL,
+        },
+        "compact-order-stats": {
+            "task": "orders.compact_daily_stats",
+            "schedule": settings.ORDER_STATS_COMPACT_INTERVAL,
+        },
+    },
+)
@@ -0,0 +1,153 @@
+import asyncio
+import logging
+import smtplib
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+from redis import Redis
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from src.config import settings
+from src.models.order import OrdersOrm
+from src.models.product import ProductsOrm
+from src.repositories.order import OrderRepository
+from src.services.outbox import (
+    ORDER_CREATED,
+    ORDER_PAYMENT_STATUS_CHANGED,
+    ORDER_STATUS_CHANGED,
+    OutboxRelay,
+)
+from src.tasks.celery import celery_app
+from src.utils.cache import PRODUCTS_TAG, TAG_PREFIX
+from src.utils.mail import send_mail
+
+logger = logging.getLogger(__name__)
+
+STATUS_MAIL_SUBJECTS = {
+    "shipped": "Заказ {} отправлен",
+    "delivered": "Заказ {} доставлен",
+    "cancelled": "Заказ {} отменён",
+    "paid": "Оплата заказа {} получена",
+}
+
+
+@lru_cache(maxsize=None)
+def _session_maker() -> async_sessionmaker:
+    # Каждая задача крутит свой event loop, поэтому соединения не переиспользуем
+    engine = create_async_engine(settings.DB_URL, poolclass=NullPool)
+    return async_sessionmaker(bind=engine, expire_on_commit=False)
+
+
+def dispatch_event(event_type: str, payload: Dict[str, Any]) -> None:
+    """Поставить задачи Celery, соответствующие событию outbox"""
+    if event_type == ORDER_CREATED:
+        send_order_confirmation.delay(payload)
+        check_low_stock.delay(payload["product_ids"])
+        invalidate_cache_tags.delay([PRODUCTS_TAG])
+    elif event_type == ORDER_STATUS_CHANGED:
+        if payload["status"] in STATUS_MAIL_SUBJECTS:
+            send_order_status_mail.delay(payload["order_id"], payload["status"])
+    elif event_type == ORDER_PAYMENT_STATUS_CHANGED:
+        if payload["payment_status"] in STATUS_MAIL_SUBJECTS:
+            send_order_status_mail.delay(payload["order_id"], payload["payment_status"])
+    else:
+        raise ValueError(f"Unknown outbox event type: {event_type}")
+
+
+async def _relay_outbox() -> int:
+    relay = OutboxRelay(
+        dispatch_event,
+        batch_size=settings.OUTBOX_BATCH_SIZE,
+        max_attempts=settings.OUTBOX_MAX_ATTEMPTS,
+    )
+    async with _session_maker()() as db:
+        return await relay.drain(db)
+
+
+@celery_app.task(name="outbox.relay")
+def relay_outbox() -> int:
+    return asyncio.run(_relay_outbox())
+
+
+async def _compact_order_stats() -> int:
+    async with _session_maker()() as db:
+        compacted = await OrderRepository().compact_daily_stats(db)
+        await db.commit()
+        return compacted
+
+
+@celery_app.task(name="orders.compact_daily_stats")
+def compact_order_stats() -> int:
+    return asyncio.run(_compact_order_stats())
+
+
+@celery_app.task(
+    name="orders.send_confirmation",
+    autoretry_for=(smtplib.SMTPException, OSError),
+    retry_backoff=True,
+    max_retries=5,
+)
+def send_order_confirmation(order: Dict[str, Any]) -> None:
+    send_mail(
+        order["customer_email"],
+        f"Заказ {order['order_number']} оформлен",
+        f"{order['customer_name']}, спасибо за заказ!\n"
+        f"Номер заказа: {order['order_number']}\n"
+        f"Сумма: {order['total_amount']}",
+    )
+
+
+async def _get_order(order_id: int) -> Optional[OrdersOrm]:
+    async with _session_maker()() as db:
+        return await db.get(OrdersOrm, order_id)
+
+
+@celery_app.task(
+    name="orders.send_status_mail",
+    autoretry_for=(smtplib.SMTPException, OSError),
+    retry_backoff=True,
+    max_retries=5,
+)
+def send_order_status_mail(order_id: int, status: str) -> None:
+    order = asyncio.run(_get_order(order_id))
+    if order is None:
+        return
+    send_mail(
+        order.customer_email,
+        STATUS_MAIL_SUBJECTS[status].format(order.order_number),
+        f"{order.customer_name}, статус вашего заказа {order.order_number} обновлён.",
+    )
+
+
+async def _low_stock(product_ids: List[int]) -> List[ProductsOrm]:
+    async with _session_maker()() as db:
+        result = await db.execute(
+            select(ProductsOrm)
+            .where(ProductsOrm.id.in_(product_ids))
+            .where(ProductsOrm.stock_quantity <= settings.LOW_STOCK_THRESHOLD)
+        )
+        return result.scalars().all()
+
+
+@celery_app.task(name="products.check_low_stock")
+def check_low_stock(product_ids: List[int]) -> None:
+    products = asyncio.run(_low_stock(product_ids))
+    if not products:
+        return
+    lines = [f"{p.name} (id {p.id}): осталось {p.stock_quantity}" for p in products]
+    logger.warning("Low stock: %s", "; ".join(lines))
+    if settings.LOW_STOCK_ALERT_EMAIL:
+        send_mail(settings.LOW_STOCK_ALERT_EMAIL, "Заканчиваются товары", "\n".join(lines))
+
+
+@celery_app.task(name="cache.invalidate_tags")
+def invalidate_cache_tags(tags: List[str]) -> None:
+    if settings.REDIS_URL is None:
+        return
+    with Redis.from_url(settings.REDIS_URL) as client:
+        with client.pipeline(transaction=False) as pipe:
+            for tag in tags:
+                pipe.incr(f"{TAG_PREFIX}:{tag}")
+            pipe.execute()
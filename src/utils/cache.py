@@ -0,0 +1,131 @@
+import hashlib
+import json
+import logging
+from dataclasses import is_dataclass
+from functools import lru_cache, wraps
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+
+from fastapi_cache import FastAPICache
+from fastapi_cache.backends.redis import RedisBackend
+from fastapi_cache.coder import Coder
+from fastapi_cache.decorator import cache
+from pydantic import TypeAdapter
+from pydantic_core import to_json
+
+from src.config import settings
+from src.connectors.redis import redis_manager
+
+logger = logging.getLogger(__name__)
+
+CACHE_PREFIX = "cache"
+TAG_PREFIX = f"{CACHE_PREFIX}:tag"
+
+PRODUCTS_TAG = "products"
+CATEGORIES_TAG = "categories"
+
+
+@lru_cache(maxsize=None)
+def _type_adapter(type_: Any) -> TypeAdapter:
+    return TypeAdapter(type_)
+
+
+class ModelCoder(Coder):
+    """Хранит pydantic-модели в JSON и восстанавливает их по аннотации возвращаемого типа"""
+
+    @classmethod
+    def encode(cls, value: Any) -> bytes:
+        return to_json(value)
+
+    @classmethod
+    def decode(cls, value: bytes) -> Any:
+        return json.loads(value)
+
+    @classmethod
+    def decode_as_type(cls, value: bytes, *, type_: Optional[Any]) -> Any:
+        if type_ is None:
+            return cls.decode(value)
+        return _type_adapter(type_).validate_json(value)
+
+
+def _key_part(value: Any) -> bool:
+    return value is None or isinstance(value, (str, int, float, bool)) or is_dataclass(value)
+
+
+async def _tag_versions(tags: Sequence[str]) -> str:
+    if not tags:
+        return ""
+    try:
+        versions = await redis_manager.client.mget([f"{TAG_PREFIX}:{tag}" for tag in tags])
+    except Exception:
+        logger.warning("Could not read cache tag versions", exc_info=True)
+        return "-"
+    return ".".join((v or b"0").decode() for v in versions)
+
+
+def _key_builder(tags: Sequence[str]):
+    async def build(
+        func: Callable[..., Any],
+        namespace: str = "",
+        *,
+        args: Tuple[Any, ...],
+        kwargs: Dict[str, Any],
+        **_,
+    ) -> str:
+        # self, сессия БД и прочие объекты в ключ не попадают
+        parts = [repr(a) for a in args if _key_part(a)]
+        parts += [f"{k}={v!r}" for k, v in sorted(kwargs.items()) if _key_part(v)]
+        digest = hashlib.md5(
+            f"{func.__qualname__}:{':'.join(parts)}".encode(), usedforsecurity=False
+        ).hexdigest()
+        return f"{namespace}:{func.__qualname__}:{digest}:{await _tag_versions(tags)}"
+
+    return build
+
+
+def cached(namespace: str, expire: int, tags: Sequence[str] = ()):
+    """Кэширует результат метода сервиса в Redis
+
+    Ключ строится из аргументов-примитивов (и dataclass-курсоров) и текущих
+    версий тегов, поэтому invalidate_tags делает все старые ключи тега
+    недостижимыми без сканирования Redis. Без Redis метод вызывается напрямую.
+    """
+
+    def wrapper(func):
+        cached_func = cache(
+            expire=expire,
+            coder=ModelCoder,
+            key_builder=_key_builder(tuple(tags)),
+            namespace=namespace,
+        )(func)
+
+        @wraps(func)
+        async def inner(*args, **kwargs):
+            if not settings.CACHE_ENABLED or not redis_manager.connected:
+                return await func(*args, **kwargs)
+            return await cached_func(*args, **kwargs)
+
+        return inner
+
+    return wrapper
+
+
+async def invalidate_tags(*tags: str) -> None:
+    if not redis_manager.connected:
+        return
+    try:
+        async with redis_manager.client.pipeline(transaction=False) as pipe:
+            for tag in tags:
+                pipe.incr(f"{TAG_PREFIX}:{tag}")
+            await pipe.execute()
+    except Exception:
+        logger.warning("Could not invalidate cache tags %s", tags, exc_info=True)
+
+
+def init_cache() -> None:
+    if redis_manager.connected:
+        FastAPICache.init(
+            RedisBackend(redis_manager.client),
+            prefix=CACHE_PREFIX,
+            coder=ModelCoder,
+            enable=settings.CACHE_ENABLED,
+        )
@@ -0,0 +1,72 @@
+import hashlib
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Optional
+
+from fastapi import Request, Response
+
+# Клиент и CDN хранят ответ, но перед использованием сверяют ETag
+CONDITIONAL_CACHE_CONTROL = "no-cache"
+
+
+@dataclass(frozen=True)
+class ResourceVersion:
+    """Валидаторы ответа, посчитанные без загрузки самого ресурса"""
+
+    etag: str
+    last_modified: Optional[datetime] = None
+
+
+def make_etag(*parts: Any) -> str:
+    """Слабый ETag: одинаковые данные, но сериализация может отличаться побайтно"""
+    digest = hashlib.md5(repr(parts).encode(), usedforsecurity=False).hexdigest()
+    return f'W/"{digest}"'
+
+
+def _http_date(value: datetime) -> str:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+def _headers(version: ResourceVersion) -> dict:
+    headers = {"ETag": version.etag, "Cache-Control": CONDITIONAL_CACHE_CONTROL}
+    if version.last_modified is not None:
+        headers["Last-Modified"] = _http_date(version.last_modified)
+    return headers
+
+
+def is_not_modified(request: Request, version: ResourceVersion) -> bool:
+    """If-None-Match важнее If-Modified-Since (RFC 9110, 13.2.2)"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        etag = version.etag.removeprefix("W/")
+        return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is None or version.last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    last_modified = version.last_modified
+    if last_modified.tzinfo is None:
+        last_modified = last_modified.replace(tzinfo=timezone.utc)
+    return last_modified.replace(microsecond=0) <= since
+
+
+def not_modified(request: Request, version: ResourceVersion) -> Optional[Response]:
+    """Ответ 304, если у клиента актуальная версия, иначе None"""
+    if is_not_modified(request, version):
+        return Response(status_code=304, headers=_headers(version))
+    return None
+
+
+def set_validators(response: Response, version: ResourceVersion) -> None:
+    response.headers.update(_headers(version))
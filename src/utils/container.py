@@ -0,0 +1,66 @@
+from src.repositories.admin import AdminRepository
+from src.repositories.category import CategoryRepository
+from src.repositories.order import OrderItemRepository, OrderRepository
+from src.repositories.outbox import OutboxRepository
+from src.repositories.product import ProductImageRepository, ProductRepository
+from src.services.admin import AdminService
+from src.services.category import CategoryService
+from src.services.category_tree import category_tree
+from src.services.idempotency import idempotency_service
+from src.services.order import OrderItemService, OrderService
+from src.services.order_number import order_number_allocator
+from src.services.product import ProductImageService, ProductService
+from src.utils.images import ImageProcessor, image_processor
+from src.utils.password_hasher import PasswordHasher, password_hasher
+
+
+class Container:
+    """Репозитории и сервисы уровня приложения
+
+    Все объекты здесь не хранят состояния запроса: сессия БД передаётся
+    в методы явно, поэтому один экземпляр обслуживает все запросы воркера.
+    Создаётся один раз в lifespan и хранится в app.state.container.
+    """
+
+    def __init__(
+        self,
+        hasher: PasswordHasher = password_hasher,
+        images: ImageProcessor = image_processor,
+    ):
+        self.password_hasher = hasher
+        self.image_processor = images
+
+        self.admin_repository = AdminRepository()
+        self.category_repository = CategoryRepository()
+        self.product_repository = ProductRepository()
+        self.product_image_repository = ProductImageRepository()
+        self.order_repository = OrderRepository()
+        self.order_item_repository = OrderItemRepository()
+        self.outbox_repository = OutboxRepository()
+
+        self.category_tree = category_tree
+        self.order_number_allocator = order_number_allocator
+
+        self.admin_service = AdminService(self.admin_repository, self.password_hasher)
+        self.category_service = CategoryService(self.category_repository, self.category_tree)
+        self.product_service = ProductService(
+            self.product_repository,
+            self.category_repository,
+            self.product_image_repository,
+            self.category_tree,
+            self.image_processor,
+        )
+        self.product_image_service = ProductImageService(self.product_image_repository)
+        self.order_service = OrderService(
+            self.order_repository,
+            self.order_item_repository,
+            self.product_repository,
+            self.order_number_allocator,
+            self.outbox_repository,
+        )
+        self.order_item_service = OrderItemService(self.order_item_repository)
+        self.idempotency_service = idempotency_service
+
+    def shutdown(self) -> None:
+        self.password_hasher.shutdown()
+        self.image_processor.shutdown()
@@ -1,6 +1,27 @@
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 
 from src.config import settings
+from src.utils.pool_metrics import InstrumentedAsyncQueuePool, pool_metrics
+from src.utils.query_stats import instrument
 
-engine = create_async_engine(settings.DB_URL)
+server_settings = {}
+if settings.DB_STATEMENT_TIMEOUT_MS:
+    server_settings["statement_timeout"] = str(settings.DB_STATEMENT_TIMEOUT_MS)
+
+engine = create_async_engine(
+    settings.DB_URL,
+    poolclass=InstrumentedAsyncQueuePool,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+    connect_args={
+        "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        "server_settings": server_settings,
+    },
+)
+pool_metrics.attach(engine)
+instrument(engine.sync_engine)
 async_session_maker = async_sessionmaker(bind=engine, expire_on_commit=False)
@@ -3,9 +3,12 @@ from fastapi import Depends, Query, Request
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.utils.container import Container
 from src.utils.database import async_session_maker
+from src.utils.pagination import Cursor, cursor_scope, decode_cursor
 from src.services.admin import AdminService
 from src.services.category import CategoryService
+from src.services.idempotency import IdempotencyService
 from src.services.order import OrderService
 from src.services.product import ProductService
 from src.exceptions import (
@@ -13,7 +16,11 @@ from src.exceptions import (
     ExpiredTokenHTTPException,
     IncorrectTokenException,
     IncorrectTokenHTTPException,
-    NoAccessTokenHTTPException
+    InvalidCursorException,
+    InvalidCursorHTTPException,
+    NoAccessTokenHTTPException,
+    RevokedTokenException,
+    RevokedTokenHTTPException
 )
 
 
@@ -25,6 +32,24 @@ class PaginationParams(BaseModel):
 PaginationDep = Annotated[PaginationParams, Depends()]
 
 
+def get_cursor(
+    request: Request,
+    cursor: Annotated[
+        str | None,
+        Query(description="Курсор из заголовка X-Next-Cursor, при наличии skip игнорируется"),
+    ] = None,
+) -> Cursor | None:
+    if cursor is None:
+        return None
+    try:
+        return decode_cursor(cursor_scope(request), cursor)
+    except InvalidCursorException:
+        raise InvalidCursorHTTPException()
+
+
+CursorDep = Annotated[Cursor | None, Depends(get_cursor)]
+
+
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     async with async_session_maker() as session:
         yield session
@@ -33,20 +58,35 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
 DBDep = Annotated[AsyncSession, Depends(get_db)]
 
 
-def get_admin_service(db: DBDep) -> AdminService:
-    return AdminService(db)
+# Зависимости без ввода-вывода объявлены async: FastAPI вызывает sync-функции через threadpool
+async def get_container(request: Request) -> Container:
+    return request.app.state.container
+
+
+ContainerDep = Annotated[Container, Depends(get_container)]
+
+
+async def get_admin_service(container: ContainerDep) -> AdminService:
+    return container.admin_service
+
+
+async def get_category_service(container: ContainerDep) -> CategoryService:
+    return container.category_service
+
+
+async def get_product_service(container: ContainerDep) -> ProductService:
+    return container.product_service
 
 
-def get_category_service(db: DBDep) -> CategoryService:
-    return CategoryService(db)
+async def get_order_service(container: ContainerDep) -> OrderService:
+    return container.order_service
 
 
-def get_product_service(db: DBDep) -> ProductService:
-    return ProductService(db)
+async def get_idempotency_service(container: ContainerDep) -> IdempotencyService:
+    return container.idempotency_service
 
 
-def get_order_service(db: DBDep) -> OrderService:
-    return OrderService(db)
+AdminServiceDep = Annotated[AdminService, Depends(get_admin_service)]
 
 
 def get_token(request: Request) -> str:
@@ -56,15 +96,16 @@ def get_token(request: Request) -> str:
     return token
 
 
-def get_current_admin_id(
+async def get_current_admin_id(
+    admin_service: AdminServiceDep,
     token: str = Depends(get_token),
-    db: AsyncSession = Depends(get_db),
 ) -> int:
     try:
-        admin_service = AdminService(db)
-        admin_id = admin_service.verify_token(token)
+        admin_id = await admin_service.verify_token(token)
     except ExpiredTokenException:
         raise ExpiredTokenHTTPException()
+    except RevokedTokenException:
+        raise RevokedTokenHTTPException()
     except IncorrectTokenException:
         raise IncorrectTokenHTTPException()
 
@@ -0,0 +1,69 @@
+import csv
+import io
+import json
+from typing import AsyncIterator, List
+
+from pydantic import BaseModel
+
+from src.schemas.order import OrderResponse, OrderWithItems
+
+ORDER_CSV_FIELDS = [name for name in OrderResponse.model_fields]
+ITEM_CSV_FIELDS = ["product_id", "product_name", "product_price", "quantity", "customization_data"]
+
+# Сколько строк копить перед отправкой очередного куска ответа
+CHUNK_ROWS = 200
+
+
+def _csv_value(value):
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    return value
+
+
+async def ndjson_chunks(rows: AsyncIterator[BaseModel]) -> AsyncIterator[str]:
+    """Одна JSON-запись на строку, отправляется кусками по CHUNK_ROWS строк"""
+    chunk: List[str] = []
+    async for row in rows:
+        chunk.append(row.model_dump_json())
+        if len(chunk) >= CHUNK_ROWS:
+            yield "\n".join(chunk) + "\n"
+            chunk.clear()
+    if chunk:
+        yield "\n".join(chunk) + "\n"
+
+
+async def orders_csv_chunks(
+    orders: AsyncIterator[OrderResponse], include_items: bool = False
+) -> AsyncIterator[str]:
+    """CSV заказов; с позициями - строка на каждую позицию с повтором полей заказа"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    header = list(ORDER_CSV_FIELDS)
+    if include_items:
+        header += [f"item_{name}" for name in ITEM_CSV_FIELDS]
+    writer.writerow(header)
+
+    rows = 0
+    async for order in orders:
+        data = order.model_dump(mode="json", include=set(ORDER_CSV_FIELDS))
+        order_row = [_csv_value(data[name]) for name in ORDER_CSV_FIELDS]
+        if not include_items:
+            writer.writerow(order_row)
+            rows += 1
+        else:
+            items = order.items if isinstance(order, OrderWithItems) else []
+            if not items:
+                # Заказ без позиций - одна строка с пустыми полями позиции
+                writer.writerow(order_row + [None] * len(ITEM_CSV_FIELDS))
+                rows += 1
+            for item in items:
+                item_data = item.model_dump(mode="json")
+                writer.writerow(order_row + [_csv_value(item_data[name]) for name in ITEM_CSV_FIELDS])
+                rows += 1
+        if rows >= CHUNK_ROWS:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            rows = 0
+    if buffer.tell():
+        yield buffer.getvalue()
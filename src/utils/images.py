@@ -0,0 +1,225 @@
+import asyncio
+import hashlib
+import json
+import multiprocessing
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import AsyncIterator, Dict, Optional, Sequence, Tuple
+
+from PIL import Image, ImageOps
+
+from src.config import settings
+from src.exceptions import ImageTooLargeException, InvalidImageException
+
+# Размер большей стороны варианта в пикселях; меньше исходника не увеличиваем
+IMAGE_VARIANTS: Dict[str, int] = {
+    "thumbnail": 160,
+    "card": 480,
+    "zoom": 1600,
+}
+
+_SAVE_OPTIONS = {
+    "webp": {"format": "WEBP", "quality": 80, "method": 4},
+    "avif": {"format": "AVIF", "quality": 60, "speed": 6},
+}
+
+MANIFEST_NAME = "manifest.json"
+
+
+@dataclass(frozen=True)
+class ProcessedImage:
+    content_hash: str
+    width: int
+    height: int
+    original_url: str
+    variants: Dict[str, Dict[str, str]]
+
+
+def _atomic_save(image: Image.Image, path: Path, options: dict) -> None:
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    image.save(tmp, **options)
+    os.replace(tmp, path)
+
+
+def render_image(
+    source: str,
+    target_dir: str,
+    variants: Dict[str, int],
+    formats: Sequence[str],
+    max_pixels: int,
+) -> dict:
+    """Проверяет исходник и пишет варианты; выполняется в процессе пула
+
+    Возвращает манифест с именами файлов относительно target_dir.
+    """
+    Image.MAX_IMAGE_PIXELS = max_pixels
+    target = Path(target_dir)
+    try:
+        with Image.open(source) as opened:
+            original_format = (opened.format or "").lower()
+            image = ImageOps.exif_transpose(opened)
+            image.load()
+    except (OSError, SyntaxError, ValueError, Image.DecompressionBombError) as e:
+        raise ValueError(f"Unsupported or corrupted image: {e}") from None
+    if image.width * image.height > max_pixels:
+        raise ValueError("Image has too many pixels")
+
+    has_alpha = image.mode in ("RGBA", "LA") or (
+        image.mode == "P" and "transparency" in image.info
+    )
+    image = image.convert("RGBA" if has_alpha else "RGB")
+
+    target.mkdir(parents=True, exist_ok=True)
+    original_name = f"original.{original_format or 'bin'}"
+    shutil.move(source, target / original_name)
+
+    files: Dict[str, Dict[str, str]] = {}
+    for name, size in variants.items():
+        variant = image.copy()
+        variant.thumbnail((size, size), Image.Resampling.LANCZOS)
+        files[name] = {}
+        for fmt in formats:
+            filename = f"{name}.{fmt}"
+            _atomic_save(variant, target / filename, _SAVE_OPTIONS[fmt])
+            files[name][fmt] = filename
+
+    manifest = {
+        "width": image.width,
+        "height": image.height,
+        "original": original_name,
+        "variants": files,
+    }
+    # Манифест пишется последним: его наличие значит, что все файлы готовы
+    tmp = target / f".{MANIFEST_NAME}.{os.getpid()}.tmp"
+    tmp.write_text(json.dumps(manifest))
+    os.replace(tmp, target / MANIFEST_NAME)
+    return manifest
+
+
+class ImageProcessor:
+    """Принимает загрузку изображения и готовит варианты для витрины
+
+    Файл пишется на диск по частям, попутно считается sha256; исходник
+    и варианты хранятся в каталоге по этому хэшу, поэтому повторная
+    загрузка того же файла не пересчитывается. Pillow держит GIL при
+    ресайзе и кодировании, поэтому варианты строятся в пуле процессов.
+    """
+
+    def __init__(
+        self,
+        root: str,
+        base_url: str,
+        tmp_root: str,
+        workers: int = 2,
+        max_upload_size: int = 20 * 1024 * 1024,
+        max_pixels: int = 40_000_000,
+        formats: Sequence[str] = ("webp", "avif"),
+    ):
+        self.root = Path(root)
+        self.tmp_root = Path(tmp_root)
+        self.base_url = base_url.rstrip("/")
+        self.workers = workers
+        self.max_upload_size = max_upload_size
+        self.max_pixels = max_pixels
+        self.formats = tuple(formats)
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # fork из процесса с event loop и потоками копирует их состояние
+            # (в т.ч. захваченные блокировки), поэтому воркеры стартуют через forkserver
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("forkserver"),
+            )
+        return self._executor
+
+    def _dir(self, content_hash: str) -> Path:
+        return self.root / content_hash[:2] / content_hash
+
+    def _url(self, content_hash: str, filename: str) -> str:
+        return f"{self.base_url}/{content_hash[:2]}/{content_hash}/{filename}"
+
+    def _result(self, content_hash: str, manifest: dict) -> ProcessedImage:
+        return ProcessedImage(
+            content_hash=content_hash,
+            width=manifest["width"],
+            height=manifest["height"],
+            original_url=self._url(content_hash, manifest["original"]),
+            variants={
+                name: {fmt: self._url(content_hash, filename) for fmt, filename in files.items()}
+                for name, files in manifest["variants"].items()
+            },
+        )
+
+    def _read_manifest(self, content_hash: str) -> Optional[dict]:
+        try:
+            return json.loads((self._dir(content_hash) / MANIFEST_NAME).read_text())
+        except (FileNotFoundError, ValueError):
+            return None
+
+    async def save_upload(self, chunks: AsyncIterator[bytes]) -> Tuple[str, str]:
+        """Пишет поток во временный файл вне раздаваемого каталога, возвращает (sha256, путь)"""
+        await asyncio.to_thread(self.tmp_root.mkdir, parents=True, exist_ok=True)
+        fd, path = tempfile.mkstemp(dir=self.tmp_root)
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            with os.fdopen(fd, "wb") as file:
+                async for chunk in chunks:
+                    size += len(chunk)
+                    if size > self.max_upload_size:
+                        raise ImageTooLargeException()
+                    digest.update(chunk)
+                    await asyncio.to_thread(file.write, chunk)
+        except BaseException:
+            os.unlink(path)
+            raise
+        if size == 0:
+            os.unlink(path)
+            raise InvalidImageException()
+        return digest.hexdigest(), path
+
+    async def ingest(self, chunks: AsyncIterator[bytes]) -> ProcessedImage:
+        content_hash, path = await self.save_upload(chunks)
+        manifest = await asyncio.to_thread(self._read_manifest, content_hash)
+        if manifest is not None:
+            os.unlink(path)
+            return self._result(content_hash, manifest)
+        try:
+            manifest = await asyncio.get_running_loop().run_in_executor(
+                self.executor,
+                render_image,
+                path,
+                str(self._dir(content_hash)),
+                IMAGE_VARIANTS,
+                self.formats,
+                self.max_pixels,
+            )
+        except ValueError:
+            raise InvalidImageException() from None
+        finally:
+            if os.path.exists(path):
+                os.unlink(path)
+        return self._result(content_hash, manifest)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+image_processor = ImageProcessor(
+    root=settings.MEDIA_ROOT,
+    base_url=settings.MEDIA_URL,
+    tmp_root=settings.UPLOAD_TMP_ROOT,
+    workers=settings.IMAGE_PROCESS_WORKERS,
+    max_upload_size=settings.IMAGE_MAX_UPLOAD_SIZE,
+    max_pixels=settings.IMAGE_MAX_PIXELS,
+    formats=settings.IMAGE_FORMATS,
+)
@@ -0,0 +1,156 @@
+import asyncio
+import hashlib
+import logging
+import os
+import signal
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+import jwt
+from jwt.api_jws import get_algorithm_by_name
+
+from src.config import settings
+from src.exceptions import JWTKeyNotFoundException
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class JWTKeySet:
+    algorithm: str
+    signing_kid: str
+    signing_key: Any
+    verification_keys: Dict[str, Any] = field(default_factory=dict)
+    mtimes: Tuple[float, ...] = ()
+
+
+class JWTKeyStore:
+    """Хранит разобранные ключи JWT в памяти и перечитывает их при ротации"""
+
+    def __init__(
+        self,
+        private_key_path: str,
+        public_key_path: str,
+        algorithm: str,
+        previous_public_key_paths: Optional[List[str]] = None,
+        check_interval: float = 30,
+    ):
+        self.private_key_path = private_key_path
+        self.public_key_path = public_key_path
+        self.previous_public_key_paths = list(previous_public_key_paths or [])
+        self.algorithm = algorithm
+        self.check_interval = check_interval
+        self._keys: Optional[JWTKeySet] = None
+        self._next_check = 0.0
+
+    @property
+    def _paths(self) -> List[str]:
+        return [self.private_key_path, self.public_key_path, *self.previous_public_key_paths]
+
+    @staticmethod
+    def _read(path: str) -> bytes:
+        try:
+            with open(path, "rb") as key_file:
+                return key_file.read()
+        except FileNotFoundError:
+            raise JWTKeyNotFoundException(path)
+
+    @staticmethod
+    def _kid(pem: bytes) -> str:
+        return hashlib.sha256(pem.strip()).hexdigest()[:16]
+
+    def _mtimes(self) -> Tuple[float, ...]:
+        try:
+            return tuple(os.stat(path).st_mtime for path in self._paths)
+        except FileNotFoundError:
+            return ()
+
+    def load(self) -> JWTKeySet:
+        """Читает ключи с диска и атомарно заменяет текущий набор"""
+        algorithm = get_algorithm_by_name(self.algorithm)
+        mtimes = self._mtimes()
+
+        public_pem = self._read(self.public_key_path)
+        signing_kid = self._kid(public_pem)
+        verification_keys = {signing_kid: algorithm.prepare_key(public_pem)}
+        for path in self.previous_public_key_paths:
+            pem = self._read(path)
+            verification_keys.setdefault(self._kid(pem), algorithm.prepare_key(pem))
+
+        self._keys = JWTKeySet(
+            algorithm=self.algorithm,
+            signing_kid=signing_kid,
+            signing_key=algorithm.prepare_key(self._read(self.private_key_path)),
+            verification_keys=verification_keys,
+            mtimes=mtimes,
+        )
+        self._next_check = time.monotonic() + self.check_interval
+        logger.info("JWT keys loaded, active kid=%s, known kids=%s",
+                    signing_kid, list(verification_keys))
+        return self._keys
+
+    def reload(self) -> None:
+        try:
+            self.load()
+        except Exception:
+            logger.exception("JWT keys reload failed, keeping previous keys")
+
+    @property
+    def keys(self) -> JWTKeySet:
+        if self._keys is None:
+            return self.load()
+        now = time.monotonic()
+        if now >= self._next_check:
+            self._next_check = now + self.check_interval
+            mtimes = self._mtimes()
+            if mtimes and mtimes != self._keys.mtimes:
+                self.reload()
+        return self._keys
+
+    def encode(self, payload: dict) -> str:
+        keys = self.keys
+        return jwt.encode(
+            payload,
+            keys.signing_key,
+            algorithm=keys.algorithm,
+            headers={"kid": keys.signing_kid},
+        )
+
+    def decode(self, token: str) -> dict:
+        """Проверяет подпись ключом из заголовка kid, токены без kid - всеми известными ключами"""
+        keys = self.keys
+        kid = jwt.get_unverified_header(token).get("kid")
+        if kid is not None:
+            key = keys.verification_keys.get(kid)
+            if key is None:
+                raise jwt.InvalidTokenError(f"Unknown kid: {kid}")
+            return jwt.decode(token, key, algorithms=[keys.algorithm])
+
+        candidates = [keys.verification_keys[keys.signing_kid]] + [
+            key for kid, key in keys.verification_keys.items() if kid != keys.signing_kid
+        ]
+        for key in candidates[:-1]:
+            try:
+                return jwt.decode(token, key, algorithms=[keys.algorithm])
+            except jwt.InvalidSignatureError:
+                continue
+        return jwt.decode(token, candidates[-1], algorithms=[keys.algorithm])
+
+    def install_reload_signal(self, signum: Optional[int] = getattr(signal, "SIGHUP", None)) -> None:
+        """Перечитывать ключи по сигналу (по умолчанию SIGHUP)"""
+        if signum is None:
+            return
+        try:
+            asyncio.get_running_loop().add_signal_handler(signum, self.reload)
+        except (NotImplementedError, RuntimeError):
+            logger.warning("Signal-based JWT keys reload is not available")
+
+
+jwt_keys = JWTKeyStore(
+    private_key_path=settings.JWT_PRIVATE_KEY_PATH,
+    public_key_path=settings.JWT_PUBLIC_KEY_PATH,
+    algorithm=settings.JWT_ALGORITHM,
+    previous_public_key_paths=settings.JWT_PREVIOUS_PUBLIC_KEY_PATHS,
+    check_interval=settings.JWT_KEYS_CHECK_INTERVAL,
+)
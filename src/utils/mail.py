@@ -0,0 +1,27 @@
+import logging
+import smtplib
+from email.message import EmailMessage
+
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def send_mail(to: str, subject: str, body: str) -> None:
+    """Отправить письмо через SMTP; без SMTP_HOST письмо только пишется в лог"""
+    if not settings.SMTP_HOST:
+        logger.info("SMTP is not configured, skipping mail to %s: %s", to, subject)
+        return
+
+    message = EmailMessage()
+    message["From"] = settings.SMTP_FROM
+    message["To"] = to
+    message["Subject"] = subject
+    message.set_content(body)
+
+    with smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT, timeout=30) as smtp:
+        if settings.SMTP_STARTTLS:
+            smtp.starttls()
+        if settings.SMTP_USER:
+            smtp.login(settings.SMTP_USER, settings.SMTP_PASSWORD)
+        smtp.send_message(message)
@@ -0,0 +1,80 @@
+import base64
+import hashlib
+import hmac
+from dataclasses import dataclass
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional, Sequence
+
+from fastapi import Request, Response
+
+from src.config import settings
+from src.exceptions import InvalidCursorException
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+@dataclass(frozen=True)
+class Cursor:
+    """Позиция в выдаче, отсортированной по (created_at DESC, id DESC)"""
+
+    created_at: datetime
+    id: int
+
+
+@lru_cache(maxsize=None)
+def _derived_secret() -> bytes:
+    private_key = Path(settings.JWT_PRIVATE_KEY_PATH).read_bytes()
+    return hmac.new(private_key, b"cursor", hashlib.sha256).digest()
+
+
+def _secret() -> bytes:
+    if settings.CURSOR_SECRET:
+        return settings.CURSOR_SECRET.encode()
+    return _derived_secret()
+
+
+def _sign(scope: str, payload: bytes) -> bytes:
+    message = scope.encode() + b"\0" + payload
+    return hmac.new(_secret(), message, hashlib.sha256).digest()[:12]
+
+
+def cursor_scope(request: Request) -> str:
+    """Выдача, к которой привязан курсор: шаблон пути маршрута"""
+    route = request.scope.get("route")
+    return getattr(route, "path", request.url.path)
+
+
+def encode_cursor(scope: str, created_at: datetime, id: int) -> str:
+    payload = f"{created_at.isoformat()}|{id}".encode()
+    return base64.urlsafe_b64encode(_sign(scope, payload) + payload).rstrip(b"=").decode()
+
+
+def decode_cursor(scope: str, token: str) -> Cursor:
+    """Разобрать курсор; курсор другой выдачи или с чужой подписью не принимается"""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        signature, payload = raw[:12], raw[12:]
+        if not hmac.compare_digest(signature, _sign(scope, payload)):
+            raise InvalidCursorException()
+        created_at, id = payload.decode().split("|")
+        return Cursor(created_at=datetime.fromisoformat(created_at), id=int(id))
+    except InvalidCursorException:
+        raise
+    except ValueError:
+        raise InvalidCursorException()
+
+
+def next_cursor(scope: str, items: Sequence, limit: int) -> Optional[str]:
+    """Курсор следующей страницы, если текущая заполнена целиком"""
+    if len(items) < limit:
+        return None
+    last = items[-1]
+    return encode_cursor(scope, last.created_at, last.id)
+
+
+def set_next_cursor(request: Request, response: Response, items: Sequence, limit: int) -> None:
+    cursor = next_cursor(cursor_scope(request), items, limit)
+    if cursor:
+        response.headers[NEXT_CURSOR_HEADER] = cursor
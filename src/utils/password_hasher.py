@@ -0,0 +1,67 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, Tuple, TypeVar
+
+from passlib.context import CryptContext
+
+from src.config import settings
+from src.exceptions import PasswordHasherBusyException
+
+T = TypeVar("T")
+
+
+class PasswordHasher:
+    """Выполняет bcrypt в отдельном пуле потоков, не блокируя event loop
+
+    bcrypt отпускает GIL на время вычисления хэша, поэтому пула потоков
+    достаточно. Одновременно принимается не больше workers + queue_limit
+    операций, остальные сразу получают PasswordHasherBusyException.
+    """
+
+    def __init__(self, workers: int = 2, queue_limit: int = 16):
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self.pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending = 0
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix="password-hasher"
+            )
+        return self._executor
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    async def _run(self, func: Callable[..., T], *args) -> T:
+        if self._pending >= self.workers + self.queue_limit:
+            raise PasswordHasherBusyException()
+        self._pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+        finally:
+            self._pending -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run(self.pwd_context.hash, password)
+
+    async def verify_and_update(
+        self, password: str, hashed_password: str
+    ) -> Tuple[bool, Optional[str]]:
+        """Проверяет пароль и возвращает новый хэш, если текущий устарел"""
+        return await self._run(self.pwd_context.verify_and_update, password, hashed_password)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    queue_limit=settings.PASSWORD_HASH_QUEUE_LIMIT,
+)
@@ -0,0 +1,77 @@
+import time
+from typing import Any, Dict
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from src.config import settings
+
+
+class PoolMetrics:
+    """Счётчики пула соединений: ожидание выдачи соединения и возраст соединений"""
+
+    def __init__(self):
+        self.waits = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.timeouts = 0
+        self._connected_at: Dict[int, float] = {}
+
+    def record_wait(self, seconds: float) -> None:
+        self.waits += 1
+        self.wait_total += seconds
+        if seconds > self.wait_max:
+            self.wait_max = seconds
+
+    def attach(self, engine: AsyncEngine) -> None:
+        sync_engine = engine.sync_engine
+
+        @event.listens_for(sync_engine, "connect")
+        def on_connect(dbapi_connection, connection_record):
+            self._connected_at[id(dbapi_connection)] = time.monotonic()
+
+        @event.listens_for(sync_engine, "close")
+        def on_close(dbapi_connection, connection_record):
+            self._connected_at.pop(id(dbapi_connection), None)
+
+        @event.listens_for(sync_engine, "close_detached")
+        def on_close_detached(dbapi_connection):
+            self._connected_at.pop(id(dbapi_connection), None)
+
+    def snapshot(self, engine: AsyncEngine) -> Dict[str, Any]:
+        pool = engine.sync_engine.pool
+        now = time.monotonic()
+        ages = [now - connected_at for connected_at in self._connected_at.values()]
+        return {
+            "pool_size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+            "max_overflow": settings.DB_MAX_OVERFLOW,
+            "acquire_count": self.waits,
+            "acquire_timeouts": self.timeouts,
+            "acquire_wait_avg_ms": round(self.wait_total / self.waits * 1000, 3) if self.waits else 0.0,
+            "acquire_wait_max_ms": round(self.wait_max * 1000, 3),
+            "connections": len(ages),
+            "connection_age_max_s": round(max(ages), 1) if ages else 0.0,
+            "connection_age_avg_s": round(sum(ages) / len(ages), 1) if ages else 0.0,
+        }
+
+
+pool_metrics = PoolMetrics()
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool, замеряющий время ожидания свободного соединения"""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            pool_metrics.timeouts += 1
+            raise
+        finally:
+            pool_metrics.record_wait(time.perf_counter() - started)
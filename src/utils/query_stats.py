@@ -0,0 +1,89 @@
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import ORMExecuteState, Session
+
+from src.config import settings
+from src.exceptions import LazyLoadException, QueryLimitExceededException
+
+_current: ContextVar[Optional["QueryStats"]] = ContextVar("query_stats", default=None)
+
+
+@dataclass
+class QueryStats:
+    """Счётчик SQL-запросов одного HTTP-запроса"""
+
+    limit: int = 0
+    strict: bool = False
+    count: int = 0
+    duration: float = 0.0
+    lazy_loads: List[str] = field(default_factory=list)
+    # После отправки заголовков ответа (стриминг) лимит уже не проверяется
+    response_started: bool = False
+
+    def record(self, duration: float) -> None:
+        self.count += 1
+        self.duration += duration
+        if self.strict and self.limit and self.count > self.limit and not self.response_started:
+            raise QueryLimitExceededException(
+                f"{self.count} statements in one request, limit is {self.limit}"
+            )
+
+    def record_lazy_load(self, description: str) -> None:
+        self.lazy_loads.append(description)
+        if self.strict:
+            raise LazyLoadException(description)
+
+    def server_timing(self) -> str:
+        return f'db;dur={self.duration * 1000:.1f};desc="{self.count} queries"'
+
+
+def start_request() -> QueryStats:
+    stats = QueryStats(
+        limit=settings.DB_QUERY_LIMIT,
+        strict=settings.MODE in ("TEST", "LOCAL", "DEV"),
+    )
+    _current.set(stats)
+    return stats
+
+
+def current() -> Optional[QueryStats]:
+    return _current.get()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_stats_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_stats_start"].pop()
+    stats = _current.get()
+    if stats is not None:
+        stats.record(time.perf_counter() - started)
+
+
+def _handle_error(exception_context):
+    starts = exception_context.connection.info.get("query_stats_start") if exception_context.connection else None
+    if starts:
+        starts.pop()
+
+
+def _do_orm_execute(orm_execute_state: ORMExecuteState):
+    state = orm_execute_state.lazy_loaded_from
+    stats = _current.get()
+    if state is None or stats is None:
+        return
+    stats.record_lazy_load(f"lazy load from {state.class_.__name__} (identity {state.identity})")
+
+
+def instrument(engine: Engine) -> None:
+    """Подключить подсчёт запросов к движку и ловлю ленивых загрузок к сессиям ORM"""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+    if not event.contains(Session, "do_orm_execute", _do_orm_execute):
+        event.listen(Session, "do_orm_execute", _do_orm_execute)
@@ -0,0 +1,36 @@
+from functools import lru_cache
+from typing import Any, List, Mapping, Optional, Sequence, Type
+
+from fastapi import Response
+from pydantic import BaseModel, TypeAdapter
+
+
+@lru_cache(maxsize=None)
+def _list_adapter(schema: Type[BaseModel]) -> TypeAdapter[list[Any]]:
+    # Схема известна только во время выполнения, статически это список Any
+    list_type: Any = List[schema]
+    return TypeAdapter(list_type)
+
+
+class ModelListResponse(Response):
+    """Отдаёт список сразу в JSON через TypeAdapter.dump_json
+
+    ORM-объекты валидируются по схеме через from_attributes и сразу
+    сериализуются в байты Rust-ядром pydantic, минуя jsonable_encoder.
+    """
+
+    media_type = "application/json"
+
+    def __init__(
+        self,
+        items: Sequence[Any],
+        schema: Type[BaseModel],
+        status_code: int = 200,
+        headers: Optional[Mapping[str, str]] = None,
+    ):
+        adapter = _list_adapter(schema)
+        super().__init__(
+            content=adapter.dump_json(adapter.validate_python(items, from_attributes=True)),
+            status_code=status_code,
+            headers=headers,
+        )
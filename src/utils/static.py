@@ -0,0 +1,152 @@
+import hashlib
+import os
+import re
+from email.utils import parsedate
+from mimetypes import guess_type
+from typing import Dict, Optional, Tuple
+
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, PathLike, StaticFiles
+from starlette.types import Scope
+
+# Сегмент пути или часть имени из 16+ hex-символов - хэш содержимого
+CONTENT_HASH_PATTERN = re.compile(r"(?:^|[/.])[0-9a-f]{16,}(?:[/.]|$)")
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "public, no-cache"
+
+# Предсжатые копии ищутся рядом с файлом, в порядке предпочтения
+SIDECAR_ENCODINGS: Tuple[Tuple[str, str], ...] = (("br", ".br"), ("gzip", ".gz"))
+
+_COMPRESSIBLE_TYPES = {
+    "application/javascript",
+    "application/json",
+    "application/manifest+json",
+    "application/wasm",
+    "application/xml",
+    "image/svg+xml",
+}
+
+
+def _accepted_encodings(header: str) -> Dict[str, float]:
+    encodings = {}
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if name:
+            encodings[name.strip().lower()] = quality
+    return encodings
+
+
+def _is_compressible(media_type: str) -> bool:
+    return media_type.startswith("text/") or media_type in _COMPRESSIBLE_TYPES
+
+
+class StaticAssets(StaticFiles):
+    """Раздача статики с долгим кэшем для файлов с хэшем содержимого в пути
+
+    Для таких файлов ETag строится из пути (одинаков на всех серверах),
+    Cache-Control - immutable; остальные файлы получают ETag из stat
+    и ревалидацию. Range и If-Range обрабатывает FileResponse, а при
+    поддержке сервером http.response.pathsend тело отдаётся без чтения
+    в Python. С accel_redirect_prefix тело отдаёт nginx через
+    X-Accel-Redirect (sendfile). Для текстовых файлов ищутся .br/.gz рядом.
+    """
+
+    def __init__(self, *, directory: PathLike, accel_redirect_prefix: Optional[str] = None, **kwargs):
+        super().__init__(directory=directory, **kwargs)
+        self.root = os.path.realpath(directory)
+        self.accel_redirect_prefix = accel_redirect_prefix.rstrip("/") if accel_redirect_prefix else None
+
+    def _sidecar(
+        self, full_path: str, media_type: str, request_headers: Headers
+    ) -> Optional[Tuple[str, str, os.stat_result]]:
+        """(кодировка, суффикс, stat) предсжатой копии, которую принимает клиент"""
+        if not _is_compressible(media_type) or "range" in request_headers:
+            return None
+        accepted = _accepted_encodings(request_headers.get("accept-encoding", ""))
+        for encoding, suffix in SIDECAR_ENCODINGS:
+            if accepted.get(encoding, 0) <= 0:
+                continue
+            try:
+                sidecar_stat = os.stat(full_path + suffix)
+            except OSError:
+                continue
+            return encoding, suffix, sidecar_stat
+        return None
+
+    def file_response(
+        self,
+        full_path: PathLike,
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ) -> Response:
+        request_headers = Headers(scope=scope)
+        full_path = str(full_path)
+        relative = os.path.relpath(full_path, self.root).replace(os.sep, "/")
+        media_type = guess_type(full_path)[0] or "text/plain"
+
+        headers = {}
+        if _is_compressible(media_type):
+            headers["vary"] = "Accept-Encoding"
+            sidecar = self._sidecar(full_path, media_type, request_headers)
+            if sidecar is not None:
+                encoding, suffix, stat_result = sidecar
+                full_path += suffix
+                relative += suffix
+                headers["content-encoding"] = encoding
+
+        if CONTENT_HASH_PATTERN.search(relative):
+            digest = hashlib.md5(relative.encode(), usedforsecurity=False).hexdigest()
+            headers["cache-control"] = IMMUTABLE_CACHE_CONTROL
+        else:
+            digest = f"{stat_result.st_ino:x}-{stat_result.st_mtime_ns:x}-{stat_result.st_size:x}"
+            headers["cache-control"] = REVALIDATE_CACHE_CONTROL
+        headers["etag"] = f'"{digest}"'
+
+        response = FileResponse(
+            full_path,
+            status_code=status_code,
+            headers=headers,
+            media_type=media_type,
+            stat_result=stat_result,
+        )
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        if self.accel_redirect_prefix is not None:
+            return self._accel_redirect(relative, response)
+        return response
+
+    def _accel_redirect(self, relative: str, response: FileResponse) -> Response:
+        headers = {
+            name: value
+            for name, value in response.headers.items()
+            if name not in ("content-length", "accept-ranges")
+        }
+        headers["x-accel-redirect"] = f"{self.accel_redirect_prefix}/{relative}"
+        return Response(status_code=response.status_code, headers=headers)
+
+    def is_not_modified(self, response_headers: Headers, request_headers: Headers) -> bool:
+        """If-None-Match важнее If-Modified-Since (RFC 9110, 13.2.2)"""
+        if_none_match = request_headers.get("if-none-match")
+        if if_none_match is not None:
+            if if_none_match.strip() == "*":
+                return True
+            etag = response_headers.get("etag", "").removeprefix("W/")
+            return etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+
+        if_modified_since = parsedate(request_headers.get("if-modified-since", ""))
+        last_modified = parsedate(response_headers.get("last-modified", ""))
+        return (
+            if_modified_since is not None
+            and last_modified is not None
+            and if_modified_since >= last_modified
+        )
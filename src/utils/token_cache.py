@@ -0,0 +1,91 @@
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from src.config import settings
+from src.connectors.redis import redis_manager
+
+logger = logging.getLogger(__name__)
+
+REVOKED_PREFIX = "revoked_token"
+
+
+class VerifiedTokenCache:
+    """LRU-кэш проверенных токенов: sha256(token) -> (admin_id, exp)
+
+    Кэш только положительный и принадлежит процессу (воркеру); записи живут
+    не дольше срока действия самого токена. Отозванные токены хранятся в Redis
+    с TTL до их exp, поэтому выход на одном воркере виден всем остальным.
+    Без Redis отзыв действует только в процессе, где он сделан.
+    """
+
+    def __init__(self, maxsize: int = 10000):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[bytes, Tuple[int, float]]" = OrderedDict()
+        self._revoked: Dict[bytes, float] = {}
+
+    @staticmethod
+    def _digest(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    @staticmethod
+    def _key(digest: bytes) -> str:
+        return f"{REVOKED_PREFIX}:{digest.hex()}"
+
+    def get(self, token: str) -> Optional[int]:
+        digest = self._digest(token)
+        entry = self._entries.get(digest)
+        if entry is None:
+            return None
+        admin_id, exp = entry
+        if exp <= time.time():
+            del self._entries[digest]
+            return None
+        self._entries.move_to_end(digest)
+        return admin_id
+
+    def set(self, token: str, admin_id: int, exp: float) -> None:
+        digest = self._digest(token)
+        if digest in self._revoked:
+            return
+        self._entries[digest] = (admin_id, exp)
+        self._entries.move_to_end(digest)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    async def is_revoked(self, token: str) -> bool:
+        digest = self._digest(token)
+        if digest in self._revoked:
+            return True
+        if not redis_manager.connected:
+            return False
+        try:
+            revoked = bool(await redis_manager.client.exists(self._key(digest)))
+        except Exception:
+            logger.warning("Could not check token revocation in Redis", exc_info=True)
+            return False
+        if revoked:
+            self._entries.pop(digest, None)
+        return revoked
+
+    async def revoke(self, token: str, exp: float) -> None:
+        now = time.time()
+        self._revoked = {d: e for d, e in self._revoked.items() if e > now}
+        digest = self._digest(token)
+        self._revoked[digest] = exp
+        self._entries.pop(digest, None)
+        if not redis_manager.connected:
+            return
+        try:
+            await redis_manager.client.set(self._key(digest), 1, ex=max(int(exp - now), 1))
+        except Exception:
+            logger.warning("Could not store token revocation in Redis", exc_info=True)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._revoked.clear()
+
+
+token_cache = VerifiedTokenCache(maxsize=settings.TOKEN_CACHE_SIZE)
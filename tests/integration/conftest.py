@@ -0,0 +1,21 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
+from src.config import settings
+from src.utils.database import engine
+
+
+@pytest.fixture
+async def db_engine():
+    """Движок тестовой БД; без PostgreSQL (или вне MODE=TEST) тест пропускается"""
+    if settings.MODE != "TEST":
+        pytest.skip("integration tests run only with MODE=TEST")
+    try:
+        async with engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+    except (OSError, SQLAlchemyError) as e:
+        pytest.skip(f"PostgreSQL is unavailable: {e}")
+    yield engine
+    # Соединения asyncpg привязаны к event loop теста
+    await engine.dispose()
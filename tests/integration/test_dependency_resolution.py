@@ -0,0 +1,74 @@
+import statistics
+import time
+import tracemalloc
+
+import httpx
+import pytest
+from fastapi import Depends, FastAPI
+
+from src.services.order import OrderService
+from src.utils.container import Container
+from src.utils.dependencies import get_order_service
+
+REQUESTS = 2000
+WARMUP = 200
+
+
+def get_order_service_per_request() -> OrderService:
+    # Так зависимость разрешалась до Container: сервис маршрута и его репозитории на каждый запрос
+    return OrderService()
+
+
+def make_app() -> FastAPI:
+    app = FastAPI()
+    app.state.container = Container()
+
+    @app.get("/container")
+    async def from_container(order_service: OrderService = Depends(get_order_service)):
+        return None
+
+    @app.get("/per-request")
+    async def per_request(order_service: OrderService = Depends(get_order_service_per_request)):
+        return None
+
+    return app
+
+
+def allocated_bytes(resolve) -> int:
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    service = resolve()
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del service
+    return after - before
+
+
+@pytest.mark.benchmark
+async def test_dependency_resolution():
+    """Разрешение сервиса через Depends: из Container и сборкой на каждый запрос"""
+    app = make_app()
+    paths = ("/container", "/per-request")
+    samples = {path: [] for path in paths}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        for i in range(WARMUP + REQUESTS):
+            # Запросы чередуются, чтобы шум машины делился поровну
+            for path in paths:
+                started = time.perf_counter()
+                response = await client.get(path)
+                elapsed = time.perf_counter() - started
+                assert response.status_code == 200
+                if i >= WARMUP:
+                    samples[path].append(elapsed)
+
+    container = app.state.container
+    shared_bytes = allocated_bytes(lambda: container.order_service)
+    fresh_bytes = allocated_bytes(get_order_service_per_request)
+    print(
+        f"\nGET with OrderService dependency x{REQUESTS}: "
+        f"container p50 {statistics.median(samples['/container']) * 1e6:.0f}us, "
+        f"{shared_bytes} B per request; "
+        f"per-request p50 {statistics.median(samples['/per-request']) * 1e6:.0f}us, "
+        f"{fresh_bytes} B per request"
+    )
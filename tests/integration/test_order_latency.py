@@ -0,0 +1,115 @@
+import json
+import statistics
+import time
+from datetime import datetime, timezone
+
+import httpx
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, ORJSONResponse
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from src.api.order import router as router_orders
+from src.middleware.json_error_handler import JSONErrorHandlerMiddleware
+from src.schemas.order import OrderWithItems
+from src.utils.dependencies import get_db, get_idempotency_service, get_order_service
+
+REQUESTS = 1000
+WARMUP = 100
+
+ORDER = {
+    "customer_email": "buyer@example.com",
+    "customer_phone": "+70000000000",
+    "customer_name": "Buyer",
+    "shipping_method": "courier",
+    "shipping_address": {"city": "Moscow", "street": "Tverskaya", "house": "1"},
+    "payment_method": "card",
+    "items": [
+        {"product_id": id, "product_name": f"Bracelet {id}", "product_price": 1500, "quantity": 1}
+        for id in range(1, 6)
+    ],
+}
+
+
+class LegacyJSONErrorHandlerMiddleware(BaseHTTPMiddleware):
+    """Проверка JSON до перехода на чистый ASGI: тело разбирается дважды"""
+
+    async def dispatch(self, request: Request, call_next):
+        if not request.headers.get("content-type", "").lower().startswith("application/json"):
+            return await call_next(request)
+        try:
+            if request.method in ["POST", "PUT", "PATCH"]:
+                body = await request.body()
+                if body:
+                    json.loads(body)
+            return await call_next(request)
+        except json.JSONDecodeError:
+            return JSONResponse(status_code=422, content={"detail": "Неверный формат JSON данных!"})
+
+
+class FakeOrderService:
+    def __init__(self):
+        self.order = OrderWithItems(
+            id=1, order_number="ORD-20261017-00000001", subtotal=7500, shipping_cost=0,
+            total_amount=7500, created_at=datetime(2026, 10, 17, tzinfo=timezone.utc),
+            **{key: value for key, value in ORDER.items() if key != "items"},
+        )
+
+    async def create(self, db, obj_in, before_commit=None):
+        return self.order
+
+
+async def no_db():
+    yield None
+
+
+def make_app(middleware) -> FastAPI:
+    app = FastAPI(default_response_class=ORJSONResponse)
+    app.include_router(router_orders)
+    app.add_middleware(middleware)
+    service = FakeOrderService()
+    app.dependency_overrides[get_order_service] = lambda: service
+    app.dependency_overrides[get_idempotency_service] = lambda: None
+    app.dependency_overrides[get_db] = no_db
+    return app
+
+
+async def latencies(*apps: FastAPI) -> list:
+    """Задержки по каждому приложению; запросы чередуются, чтобы шум делился поровну"""
+    body = json.dumps(ORDER).encode()
+    headers = {"content-type": "application/json"}
+    clients = [
+        httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+        for app in apps
+    ]
+    result = [[] for _ in apps]
+    try:
+        for i in range(WARMUP + REQUESTS):
+            for client, samples in zip(clients, result):
+                started = time.perf_counter()
+                response = await client.post("/orders/", content=body, headers=headers)
+                elapsed = time.perf_counter() - started
+                assert response.status_code == 200
+                if i >= WARMUP:
+                    samples.append(elapsed)
+    finally:
+        for client in clients:
+            await client.aclose()
+    return result
+
+
+def percentiles(samples: list) -> tuple:
+    cuts = statistics.quantiles(samples, n=100)
+    return cuts[49], cuts[98]
+
+
+@pytest.mark.benchmark
+async def test_create_order_latency():
+    """p50/p99 POST /orders/ с прежним BaseHTTPMiddleware и с ASGI-middleware (без БД)"""
+    legacy, asgi = await latencies(
+        make_app(LegacyJSONErrorHandlerMiddleware), make_app(JSONErrorHandlerMiddleware)
+    )
+    (legacy_p50, legacy_p99), (asgi_p50, asgi_p99) = percentiles(legacy), percentiles(asgi)
+    print(f"\nPOST /orders/ x{REQUESTS}: "
+          f"BaseHTTPMiddleware p50 {legacy_p50 * 1e3:.3f}ms p99 {legacy_p99 * 1e3:.3f}ms; "
+          f"ASGI p50 {asgi_p50 * 1e3:.3f}ms p99 {asgi_p99 * 1e3:.3f}ms")
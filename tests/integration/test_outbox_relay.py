@@ -0,0 +1,126 @@
+import asyncio
+import uuid
+from collections import Counter
+
+import pytest
+from celery import Celery
+from sqlalchemy import delete, select
+
+from src.models import OutboxOrm
+from src.repositories.outbox import OutboxRepository
+from src.services.outbox import OutboxRelay
+from src.utils.database import async_session_maker
+
+# Задачи выполняются прямо в .delay(), брокер не нужен
+celery_app = Celery("outbox-test", broker="memory://")
+celery_app.conf.task_always_eager = True
+
+received = []
+
+
+@celery_app.task
+def record_event(event_type, payload):
+    received.append((event_type, payload))
+
+
+def dispatch(event_type, payload):
+    record_event.delay(event_type, payload)
+
+
+@pytest.fixture
+async def event_type(db_engine):
+    """Тип событий, уникальный для теста: чужие строки outbox не мешают проверкам"""
+    received.clear()
+    event_type = f"test.{uuid.uuid4().hex}"
+    yield event_type
+    async with async_session_maker() as db:
+        await db.execute(delete(OutboxOrm).where(OutboxOrm.event_type == event_type))
+        await db.commit()
+
+
+async def add_events(event_type, count):
+    async with async_session_maker() as db:
+        await OutboxRepository().add_many(db, [(event_type, {"n": n}) for n in range(count)])
+        await db.commit()
+
+
+def dispatched(event_type):
+    return Counter(payload["n"] for type_, payload in received if type_ == event_type)
+
+
+async def pending(event_type):
+    async with async_session_maker() as db:
+        result = await db.execute(
+            select(OutboxOrm.id)
+            .where(OutboxOrm.event_type == event_type)
+            .where(OutboxOrm.processed_at.is_(None))
+        )
+        return result.scalars().all()
+
+
+async def test_drain_dispatches_every_event_once(event_type):
+    await add_events(event_type, 25)
+    relay = OutboxRelay(dispatch, batch_size=10)
+
+    async with async_session_maker() as db:
+        await relay.drain(db)
+    async with async_session_maker() as db:
+        await relay.drain(db)
+
+    assert dispatched(event_type) == Counter(range(25))
+    assert await pending(event_type) == []
+
+
+async def test_failed_event_is_retried_up_to_max_attempts(event_type):
+    await add_events(event_type, 3)
+
+    def flaky(type_, payload):
+        if type_ == event_type and payload["n"] == 1:
+            raise RuntimeError("broker is down")
+        dispatch(type_, payload)
+
+    relay = OutboxRelay(flaky, batch_size=10, max_attempts=2)
+    for _ in range(3):
+        async with async_session_maker() as db:
+            await relay.drain(db)
+
+    assert dispatched(event_type) == Counter([0, 2])
+    async with async_session_maker() as db:
+        failed = await db.scalar(
+            select(OutboxOrm).where(OutboxOrm.event_type == event_type).where(OutboxOrm.processed_at.is_(None))
+        )
+    assert failed.attempts == 2
+    assert "broker is down" in failed.last_error
+
+
+async def test_drain_skips_rows_locked_by_another_relay(event_type):
+    await add_events(event_type, 5)
+    repository = OutboxRepository()
+
+    async with async_session_maker() as holder:
+        locked = await repository.claim_batch(holder, 100, 5)
+        locked_ids = {event.id for event in locked if event.event_type == event_type}
+        assert len(locked_ids) == 5
+
+        async with async_session_maker() as db:
+            await OutboxRelay(dispatch).drain(db)
+        assert dispatched(event_type) == Counter()
+
+        await holder.rollback()
+
+    async with async_session_maker() as db:
+        await OutboxRelay(dispatch).drain(db)
+    assert dispatched(event_type) == Counter(range(5))
+
+
+async def test_concurrent_drains_dispatch_each_event_once(event_type):
+    await add_events(event_type, 200)
+
+    async def drain():
+        async with async_session_maker() as db:
+            return await OutboxRelay(dispatch, batch_size=7).drain(db)
+
+    await asyncio.gather(drain(), drain(), drain())
+
+    assert dispatched(event_type) == Counter(range(200))
+    assert await pending(event_type) == []
@@ -0,0 +1,59 @@
+import json
+import time
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+from fastapi.encoders import jsonable_encoder
+
+from src.schemas.product import ProductResponse
+from src.utils.responses import ModelListResponse
+
+PRODUCTS = 1000
+ROUNDS = 5
+
+
+def make_products():
+    created_at = datetime(2026, 10, 17, tzinfo=timezone.utc)
+    return [
+        SimpleNamespace(
+            id=id, name=f"Bracelet {id}", description="Handmade bracelet " * 10,
+            short_description="Handmade bracelet", price=1500 + id, compare_at_price=None,
+            stock_quantity=id % 7, material="silver", color="blue", width=5, length="18 cm",
+            clasp_type="lobster", is_customizable=bool(id % 2),
+            customizable_options={"engraving": True} if id % 2 else {},
+            category_id=id % 10 + 1, in_stock=True, is_active=True,
+            created_at=created_at, updated_at=None,
+        )
+        for id in range(1, PRODUCTS + 1)
+    ]
+
+
+def serialize_default(products) -> bytes:
+    # Путь FastAPI по умолчанию: модели -> jsonable_encoder -> json.dumps
+    models = [ProductResponse.model_validate(p) for p in products]
+    return json.dumps(jsonable_encoder(models), ensure_ascii=False).encode()
+
+
+def serialize_adapter(products) -> bytes:
+    return ModelListResponse(products, ProductResponse).body
+
+
+def best_of(serialize, products) -> float:
+    timings = []
+    for _ in range(ROUNDS):
+        started = time.perf_counter()
+        serialize(products)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+@pytest.mark.benchmark
+def test_product_page_serialization():
+    products = make_products()
+    assert json.loads(serialize_adapter(products)) == json.loads(serialize_default(products))
+
+    default = best_of(serialize_default, products)
+    adapter = best_of(serialize_adapter, products)
+    print(f"\n{PRODUCTS} products: jsonable_encoder + json.dumps {default * 1e3:.1f}ms, "
+          f"TypeAdapter.dump_json {adapter * 1e3:.1f}ms ({default / adapter:.1f}x)")
@@ -0,0 +1,76 @@
+import asyncio
+import time
+import uuid
+from typing import Optional
+
+import pytest
+from sqlalchemy import delete, func, select
+
+from src.models import CategoriesOrm, OrdersItemsOrm, OrdersOrm, OutboxOrm, ProductsOrm
+from src.schemas.order import OrderCreate, OrderItemCreate
+from src.services.order import OrderService
+from src.utils.database import async_session_maker
+
+STOCK = 50
+ORDERS = 300
+
+
+async def test_hot_product_is_not_oversold(db_engine):
+    """Сотни параллельных заказов на один товар не уводят остаток в минус"""
+    async with async_session_maker() as db:
+        category = CategoriesOrm(name="Benchmark", slug=f"benchmark-{uuid.uuid4().hex}")
+        db.add(category)
+        await db.flush()
+        product = ProductsOrm(
+            name="Hot bracelet", price=1000, stock_quantity=STOCK, in_stock=True,
+            category_id=category.id,
+        )
+        db.add(product)
+        await db.commit()
+
+    service = OrderService()
+    order_in = OrderCreate(
+        customer_email="buyer@example.com",
+        customer_phone="+70000000000",
+        customer_name="Buyer",
+        shipping_method="courier",
+        shipping_address={"city": "Moscow"},
+        payment_method="card",
+        items=[OrderItemCreate(
+            product_id=product.id, product_name=product.name, product_price=product.price, quantity=1,
+        )],
+    )
+
+    async def place_order() -> Optional[int]:
+        async with async_session_maker() as db:
+            try:
+                return (await service.create(db, order_in)).id
+            except ValueError:
+                return None
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(place_order() for _ in range(ORDERS)))
+    elapsed = time.perf_counter() - started
+    order_ids = [id for id in results if id is not None]
+    print(f"\n{ORDERS} orders on one product: {elapsed:.2f}s, {ORDERS / elapsed:.0f} orders/s, "
+          f"{len(order_ids)} accepted")
+
+    try:
+        async with async_session_maker() as db:
+            stock = await db.scalar(
+                select(ProductsOrm.stock_quantity).where(ProductsOrm.id == product.id))
+            sold = await db.scalar(
+                select(func.coalesce(func.sum(OrdersItemsOrm.quantity), 0))
+                .where(OrdersItemsOrm.product_id == product.id))
+        assert len(order_ids) == STOCK
+        assert sold == STOCK
+        assert stock == 0
+    finally:
+        async with async_session_maker() as db:
+            await db.execute(delete(OutboxOrm).where(
+                OutboxOrm.payload["order_id"].as_integer().in_(order_ids)))
+            await db.execute(delete(OrdersItemsOrm).where(OrdersItemsOrm.product_id == product.id))
+            await db.execute(delete(OrdersOrm).where(OrdersOrm.id.in_(order_ids)))
+            await db.execute(delete(ProductsOrm).where(ProductsOrm.id == product.id))
+            await db.execute(delete(CategoriesOrm).where(CategoriesOrm.id == category.id))
+            await db.commit()
@@ -0,0 +1,105 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from src.schemas.category import CategoryResponse
+from src.services.category import CategoryService
+from src.services.category_tree import CategoryTree
+from src.utils.pagination import Cursor
+
+
+def category(id, parent_id=None, sort_order=0, is_active=True, name=None):
+    return CategoryResponse(
+        id=id,
+        parent_id=parent_id,
+        name=name or f"Category {id}",
+        slug=f"category-{id}",
+        sort_order=sort_order,
+        is_active=is_active,
+        created_at=datetime(2026, 10, 17, tzinfo=timezone.utc),
+    )
+
+
+@pytest.fixture
+def tree():
+    #   1 ── 3 ── 5
+    #   │    └─── 6 (inactive)
+    #   └─── 4
+    #   2
+    #   8 (родитель 99 не существует)
+    return CategoryTree([
+        category(1, sort_order=1),
+        category(2, sort_order=0),
+        category(3, parent_id=1, sort_order=1),
+        category(4, parent_id=1, sort_order=0),
+        category(5, parent_id=3),
+        category(6, parent_id=3, is_active=False),
+        category(8, parent_id=99),
+    ], version=3)
+
+
+def test_lookup_by_id_and_slug(tree):
+    assert tree.version == 3
+    assert tree.get(5).id == 5
+    assert tree.get_by_slug("category-4").id == 4
+    assert tree.get(100) is None
+    assert tree.get_by_slug("missing") is None
+
+
+def test_roots_are_sorted(tree):
+    assert [c.id for c in tree.roots()] == [2, 1]
+
+
+def test_children_are_sorted_and_filtered(tree):
+    assert [c.id for c in tree.children(1)] == [4, 3]
+    assert [c.id for c in tree.children(3)] == [5]
+    assert [c.id for c in tree.children(3, active_only=False)] == [5, 6]
+    assert tree.children(100) == []
+
+
+def test_ancestors_from_root(tree):
+    assert [c.id for c in tree.ancestors(5)] == [1, 3]
+    assert tree.ancestors(1) == []
+
+
+def test_descendant_ids(tree):
+    assert tree.descendant_ids(1) == {3, 4, 5, 6}
+    assert tree.descendant_ids(5) == frozenset()
+    assert tree.descendant_ids(100) == frozenset()
+
+
+def test_orphan_is_indexed_as_root(tree):
+    assert tree.get(8) is not None
+    assert tree.ancestors(8) == []
+
+
+def test_active_sorted_by_order_then_name(tree):
+    active = tree.active()
+    assert 6 not in {c.id for c in active}
+    assert [(c.sort_order, c.name) for c in active] == sorted((c.sort_order, c.name) for c in active)
+
+
+def test_cycle_does_not_recurse_forever():
+    tree = CategoryTree([category(1, parent_id=2), category(2, parent_id=1)])
+    assert tree.roots() == []
+
+
+def test_page_follows_repository_order(tree):
+    ids = [c.id for c in tree.page(limit=100)]
+    assert ids == [8, 6, 5, 4, 3, 2, 1]
+    assert [c.id for c in tree.page(skip=2, limit=2)] == [5, 4]
+    cursor = Cursor(created_at=tree.get(5).created_at, id=5)
+    assert [c.id for c in tree.page(limit=3, cursor=cursor)] == [4, 3, 2]
+
+
+async def test_list_uses_snapshot_products_count():
+    snapshot = CategoryTree([category(1).model_copy(update={"products_count": 7})])
+
+    class Manager:
+        async def get(self, db):
+            return snapshot
+
+    service = CategoryService(tree=Manager())
+    [listed] = await service.get_multi(None)
+    assert listed.products_count == 7
+    assert listed == await service.get(None, 1)
@@ -0,0 +1,66 @@
+from datetime import datetime, timezone
+
+import pytest
+from starlette.requests import Request
+
+from src.utils.conditional import ResourceVersion, is_not_modified, make_etag, not_modified
+
+LAST_MODIFIED = datetime(2026, 10, 17, 12, 0, 0, 500000, tzinfo=timezone.utc)
+VERSION = ResourceVersion(etag=make_etag(1, LAST_MODIFIED), last_modified=LAST_MODIFIED)
+
+
+def make_request(**headers) -> Request:
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "path": "/",
+        "headers": [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()],
+    })
+
+
+def test_make_etag_is_weak_and_stable():
+    assert make_etag(1, "a") == make_etag(1, "a")
+    assert make_etag(1, "a") != make_etag(1, "b")
+    assert make_etag(1).startswith('W/"')
+
+
+def test_no_validators_means_modified():
+    assert not is_not_modified(make_request(), VERSION)
+
+
+@pytest.mark.parametrize("if_none_match", [
+    VERSION.etag,
+    VERSION.etag.removeprefix("W/"),
+    f'"other", {VERSION.etag}',
+    "*",
+])
+def test_matching_etag(if_none_match):
+    assert is_not_modified(make_request(if_none_match=if_none_match), VERSION)
+
+
+def test_other_etag_wins_over_if_modified_since():
+    request = make_request(if_none_match='"other"', if_modified_since="Sat, 17 Oct 2026 13:00:00 GMT")
+    assert not is_not_modified(request, VERSION)
+
+
+@pytest.mark.parametrize("if_modified_since, expected", [
+    ("Sat, 17 Oct 2026 12:00:00 GMT", True),
+    ("Sat, 17 Oct 2026 13:00:00 GMT", True),
+    ("Sat, 17 Oct 2026 11:59:59 GMT", False),
+    ("not a date", False),
+])
+def test_if_modified_since(if_modified_since, expected):
+    assert is_not_modified(make_request(if_modified_since=if_modified_since), VERSION) is expected
+
+
+def test_if_modified_since_without_last_modified():
+    version = ResourceVersion(etag=VERSION.etag)
+    assert not is_not_modified(make_request(if_modified_since="Sat, 17 Oct 2026 13:00:00 GMT"), version)
+
+
+def test_not_modified_response_carries_validators():
+    response = not_modified(make_request(if_none_match=VERSION.etag), VERSION)
+    assert response.status_code == 304
+    assert response.headers["etag"] == VERSION.etag
+    assert response.headers["last-modified"] == "Sat, 17 Oct 2026 12:00:00 GMT"
+    assert not_modified(make_request(), VERSION) is None
@@ -0,0 +1,105 @@
+from datetime import datetime, timezone
+
+import pytest
+from pydantic import BaseModel
+
+from src.exceptions import IdempotencyKeyInProgressException, IdempotencyKeyLostException
+from src.services.idempotency import IdempotencyService
+
+LOCKED_AT = datetime(2026, 10, 17, 12, 0, tzinfo=timezone.utc)
+
+
+class Result(BaseModel):
+    id: int = 1
+
+
+class FakeRepository:
+    def __init__(self, lost: bool = False):
+        self.lost = lost
+        self.calls = []
+
+    async def claim(self, db, scope, key, request_hash, ttl, lock_timeout):
+        return LOCKED_AT
+
+    async def complete(self, db, scope, key, locked_at, response_status, response_body):
+        self.calls.append(("complete", locked_at))
+        if self.lost:
+            raise IdempotencyKeyLostException()
+
+    async def release(self, db, scope, key, locked_at):
+        self.calls.append(("release", locked_at))
+
+
+class FakeSession:
+    async def rollback(self):
+        pass
+
+
+async def handler(complete):
+    result = Result()
+    await complete(result)
+    return result
+
+
+async def test_owner_completes_key_with_its_claim():
+    repository = FakeRepository()
+    response = await IdempotencyService(repository).execute(
+        FakeSession(), "orders:create", "key", Result(), handler
+    )
+    assert response.body == '{"id":1}'
+    assert repository.calls == [("complete", LOCKED_AT)]
+
+
+async def test_lost_claim_fails_the_request_and_releases_only_own_claim():
+    repository = FakeRepository(lost=True)
+    with pytest.raises(IdempotencyKeyInProgressException):
+        await IdempotencyService(repository).execute(
+            FakeSession(), "orders:create", "key", Result(), handler
+        )
+    assert repository.calls == [("complete", LOCKED_AT), ("release", LOCKED_AT)]
+
+
+class BusyRepository(FakeRepository):
+    """Ключ занят другим запросом, который завершается на втором опросе"""
+
+    def __init__(self, session):
+        super().__init__()
+        self.session = session
+        self.polls = 0
+
+    async def claim(self, db, scope, key, request_hash, ttl, lock_timeout):
+        return None
+
+    async def get(self, db, scope, key):
+        self.session.in_transaction = True
+        self.polls += 1
+        status = "completed" if self.polls == 2 else "in_progress"
+        return type("Row", (), {
+            "request_hash": IdempotencyService.request_hash(Result()),
+            "status": status,
+            "response_status": 200,
+            "response_body": '{"id":1}',
+        })
+
+
+class TrackingSession(FakeSession):
+    def __init__(self):
+        self.in_transaction = False
+        self.idle_in_transaction_waits = 0
+
+    async def rollback(self):
+        self.in_transaction = False
+
+
+async def test_waiting_duplicate_does_not_hold_a_transaction(monkeypatch):
+    session = TrackingSession()
+    service = IdempotencyService(BusyRepository(session))
+
+    async def wait(scope, key, timeout):
+        if session.in_transaction:
+            session.idle_in_transaction_waits += 1
+
+    monkeypatch.setattr(service, "_wait", wait)
+    response = await service.execute(session, "orders:create", "key", Result(), handler)
+    assert response.replayed
+    assert session.idle_in_transaction_waits == 0
@@ -0,0 +1,72 @@
+import httpx
+import pytest
+from fastapi import APIRouter, FastAPI, Request
+
+from src.middleware.json_error_handler import (
+    JSON_BODY_SCOPE_KEY,
+    JSONBodyRoute,
+    JSONErrorHandlerMiddleware,
+)
+
+MAX_BODY_SIZE = 64
+
+
+def make_app() -> FastAPI:
+    router = APIRouter(route_class=JSONBodyRoute)
+
+    @router.post("/echo")
+    async def echo(payload: dict, request: Request):
+        return {"payload": payload, "parsed_once": JSON_BODY_SCOPE_KEY in request.scope}
+
+    app = FastAPI()
+    app.include_router(router)
+    app.add_middleware(JSONErrorHandlerMiddleware, max_body_size=MAX_BODY_SIZE)
+    return app
+
+
+@pytest.fixture
+async def client():
+    transport = httpx.ASGITransport(app=make_app())
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+
+
+async def test_valid_body_is_parsed_once(client):
+    response = await client.post("/echo", json={"a": 1})
+    assert response.status_code == 200
+    assert response.json() == {"payload": {"a": 1}, "parsed_once": True}
+
+
+@pytest.mark.parametrize("body, detail", [
+    (b'{"a": ', "Неверный формат JSON данных: отсутствует значение!"),
+    (b'{"a": "b', "Незавершенная строка в JSON данных!"),
+    (b'{"a": 1} 2', "Лишние данные в JSON!"),
+])
+async def test_invalid_json_is_422(client, body, detail):
+    response = await client.post("/echo", content=body, headers={"content-type": "application/json"})
+    assert response.status_code == 422
+    assert response.json() == {"detail": detail}
+
+
+async def test_declared_length_over_limit_is_413(client):
+    body = b'{"a": "' + b"x" * MAX_BODY_SIZE + b'"}'
+    response = await client.post("/echo", content=body, headers={"content-type": "application/json"})
+    assert response.status_code == 413
+
+
+async def test_streamed_body_over_limit_is_413(client):
+    async def chunks():
+        yield b'{"a": "'
+        yield b"x" * MAX_BODY_SIZE
+        yield b'"}'
+
+    response = await client.post("/echo", content=chunks(), headers={"content-type": "application/json"})
+    assert "content-length" not in response.request.headers
+    assert response.status_code == 413
+
+
+async def test_non_json_content_type_is_passed_through(client):
+    response = await client.post("/echo", content=b"{not json", headers={"content-type": "text/plain"})
+    # Ошибку отдаёт валидация FastAPI, а не middleware
+    assert response.status_code == 422
+    assert isinstance(response.json()["detail"], list)
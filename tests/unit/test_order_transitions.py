@@ -0,0 +1,114 @@
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from src.schemas.order import OrderUpdate
+from src.services.order import ORDER_STATUSES, ORDER_TRANSITIONS, OrderService, allowed_sources
+
+
+def test_transitions_cover_all_statuses():
+    assert set(ORDER_TRANSITIONS) == set(ORDER_STATUSES)
+    for targets in ORDER_TRANSITIONS.values():
+        assert targets <= set(ORDER_STATUSES)
+
+
+@pytest.mark.parametrize("status, sources", [
+    ("pending", []),
+    ("processing", ["pending"]),
+    ("shipped", ["processing"]),
+    ("delivered", ["shipped"]),
+    ("cancelled", ["pending", "processing"]),
+])
+def test_allowed_sources(status, sources):
+    assert sorted(allowed_sources(status)) == sources
+
+
+def test_terminal_statuses_have_no_targets():
+    assert not ORDER_TRANSITIONS["delivered"]
+    assert not ORDER_TRANSITIONS["cancelled"]
+
+
+class FakeOrderRepository:
+    def __init__(self, order):
+        self.order = order
+        self.updated = None
+
+    async def get(self, db, id):
+        return self.order
+
+    async def get_statuses(self, db, ids):
+        return {id: self.order.status for id in ids}
+
+    async def transition_status(self, db, ids, status, sources):
+        if self.order.status not in sources:
+            return set()
+        self.order.status = status
+        return set(ids)
+
+    async def update_payment_status(self, db, id, payment_status, payment_id):
+        self.order.payment_status = payment_status
+        return True
+
+    async def update(self, db, db_obj, data):
+        self.updated = data
+        for field, value in data.items():
+            setattr(db_obj, field, value)
+        return db_obj
+
+
+class FakeOutbox:
+    def __init__(self):
+        self.events = []
+
+    async def add_many(self, db, events):
+        self.events.extend(name for name, _ in events)
+
+
+class FakeSession:
+    def __init__(self):
+        self.rolled_back = False
+
+    async def commit(self):
+        pass
+
+    async def rollback(self):
+        self.rolled_back = True
+
+
+def make_order(status):
+    return SimpleNamespace(
+        id=1, status=status, order_number="ORD-20261017-00000001",
+        customer_email="buyer@example.com", customer_phone="+70000000000",
+        customer_name="Buyer", shipping_method="courier", shipping_address={},
+        payment_method="card", customer_comment=None, subtotal=100, shipping_cost=0,
+        total_amount=100, payment_status="pending", payment_id=None, admin_notes=None,
+        created_at=datetime(2026, 10, 17, tzinfo=timezone.utc), updated_at=None,
+    )
+
+
+def make_service(order):
+    repository, outbox = FakeOrderRepository(order), FakeOutbox()
+    service = OrderService(repository, outbox_repo=outbox, order_numbers=object())
+    return service, repository, outbox
+
+
+async def test_update_rejects_transition_outside_map():
+    service, repository, outbox = make_service(make_order("delivered"))
+    db = FakeSession()
+    with pytest.raises(ValueError):
+        await service.update(db, 1, OrderUpdate(status="pending", admin_notes="reopen"))
+    assert db.rolled_back
+    assert repository.updated is None
+    assert outbox.events == []
+
+
+async def test_update_writes_outbox_events_for_status_and_payment():
+    service, repository, outbox = make_service(make_order("pending"))
+    result = await service.update(
+        FakeSession(), 1, OrderUpdate(status="processing", payment_status="paid", admin_notes="ok")
+    )
+    assert result.status == "processing"
+    assert result.payment_status == "paid"
+    assert repository.updated == {"admin_notes": "ok"}
+    assert outbox.events == ["order.status_changed", "order.payment_status_changed"]
@@ -0,0 +1,65 @@
+import base64
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from src.config import settings
+from src.exceptions import InvalidCursorException
+from src.utils import pagination
+from src.utils.pagination import Cursor, decode_cursor, encode_cursor, next_cursor
+
+CREATED_AT = datetime(2026, 10, 17, 12, 30, 15, 123456, tzinfo=timezone.utc)
+SCOPE = "/products/"
+
+
+def test_cursor_round_trip():
+    assert decode_cursor(SCOPE, encode_cursor(SCOPE, CREATED_AT, 42)) == Cursor(created_at=CREATED_AT, id=42)
+
+
+def test_cursor_is_url_safe():
+    token = encode_cursor(SCOPE, CREATED_AT, 42)
+    assert "=" not in token and "+" not in token and "/" not in token
+
+
+def test_tampered_payload_is_rejected():
+    raw = base64.urlsafe_b64decode(encode_cursor(SCOPE, CREATED_AT, 42) + "==")
+    forged = raw[:12] + raw[12:].replace(b"|42", b"|43")
+    token = base64.urlsafe_b64encode(forged).rstrip(b"=").decode()
+    with pytest.raises(InvalidCursorException):
+        decode_cursor(SCOPE, token)
+
+
+def test_cursor_from_other_endpoint_is_rejected():
+    token = encode_cursor("/products/", CREATED_AT, 42)
+    with pytest.raises(InvalidCursorException):
+        decode_cursor("/orders/", token)
+
+
+def test_cursor_signed_with_other_secret_is_rejected(monkeypatch):
+    token = encode_cursor(SCOPE, CREATED_AT, 42)
+    monkeypatch.setattr(settings, "CURSOR_SECRET", (settings.CURSOR_SECRET or "") + "-rotated")
+    with pytest.raises(InvalidCursorException):
+        decode_cursor(SCOPE, token)
+
+
+def test_secret_falls_back_to_jwt_key(monkeypatch):
+    monkeypatch.setattr(settings, "CURSOR_SECRET", None)
+    pagination._derived_secret.cache_clear()
+    token = encode_cursor(SCOPE, CREATED_AT, 42)
+    assert decode_cursor(SCOPE, token) == Cursor(created_at=CREATED_AT, id=42)
+    monkeypatch.setattr(settings, "CURSOR_SECRET", "explicit")
+    with pytest.raises(InvalidCursorException):
+        decode_cursor(SCOPE, token)
+
+
+@pytest.mark.parametrize("token", ["", "abc", "not a cursor", "%%%"])
+def test_garbage_is_rejected(token):
+    with pytest.raises(InvalidCursorException):
+        decode_cursor(SCOPE, token)
+
+
+def test_next_cursor_only_for_full_page():
+    items = [SimpleNamespace(created_at=CREATED_AT, id=id) for id in (3, 2, 1)]
+    assert next_cursor(SCOPE, items, limit=4) is None
+    assert decode_cursor(SCOPE, next_cursor(SCOPE, items, limit=3)) == Cursor(created_at=CREATED_AT, id=1)
@@ -0,0 +1,83 @@
+import time
+
+import pytest
+
+from src.connectors.redis import redis_manager
+from src.utils.token_cache import VerifiedTokenCache
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+
+    async def exists(self, key):
+        return int(key in self.data)
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = (value, ex)
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    client = FakeRedis()
+    monkeypatch.setattr(redis_manager, "client", client)
+    return client
+
+
+@pytest.fixture
+def no_redis(monkeypatch):
+    monkeypatch.setattr(redis_manager, "client", None)
+
+
+def test_get_returns_cached_admin_id():
+    cache = VerifiedTokenCache()
+    cache.set("token", 7, time.time() + 60)
+    assert cache.get("token") == 7
+    assert cache.get("other") is None
+
+
+def test_expired_entry_is_dropped():
+    cache = VerifiedTokenCache()
+    cache.set("token", 7, time.time() - 1)
+    assert cache.get("token") is None
+    assert cache.get("token") is None
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = VerifiedTokenCache(maxsize=2)
+    exp = time.time() + 60
+    cache.set("a", 1, exp)
+    cache.set("b", 2, exp)
+    cache.get("a")
+    cache.set("c", 3, exp)
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+async def test_revoke_without_redis_is_process_local(no_redis):
+    cache = VerifiedTokenCache()
+    cache.set("token", 7, time.time() + 60)
+    await cache.revoke("token", time.time() + 60)
+    assert cache.get("token") is None
+    assert await cache.is_revoked("token")
+    cache.set("token", 7, time.time() + 60)
+    assert cache.get("token") is None
+    assert not await VerifiedTokenCache().is_revoked("token")
+
+
+async def test_revocation_is_shared_through_redis(redis):
+    worker_a, worker_b = VerifiedTokenCache(), VerifiedTokenCache()
+    worker_b.set("token", 7, time.time() + 60)
+    await worker_a.revoke("token", time.time() + 60)
+
+    assert await worker_b.is_revoked("token")
+    assert worker_b.get("token") is None
+    [(_, ttl)] = redis.data.values()
+    assert 0 < ttl <= 60
+
+
+async def test_revocation_ttl_is_at_least_one_second(redis):
+    await VerifiedTokenCache().revoke("token", time.time() - 5)
+    [(_, ttl)] = redis.data.values()
+    assert ttl == 1